@@ -0,0 +1,32 @@
+"""
+Benchmark reproduzível de todas as rotas de core/urls.py.
+
+Cria um banco SQLite equivalente ao loja_lingerie.sql (esquema e dados de
+exemplo), amplia os dados para a escala pedida e mede cada rota pelo test
+client do Django e, com --http, por HTTP contra um servidor threaded com
+vários processos clientes. Reporta p50/p95/p99, requisições por segundo e
+pico de RSS por rota, e grava JSON para comparar execuções:
+
+    python -m benchmark executar --escala 100 --saida antes.json
+    python -m benchmark executar --escala 100 --http --processos 8 --saida depois.json
+    python -m benchmark comparar antes.json depois.json
+
+No modo HTTP o RSS é o pico do processo servidor até o fim de cada rota.
+
+O subcomando orcamentos faz cada rota uma vez gravando as consultas e falha
+se alguma view passar do seu @orcamento ou repetir uma consulta (N+1):
+
+    python -m benchmark orcamentos
+
+O subcomando planos roda EXPLAIN QUERY PLAN nas consultas de todos os
+métodos das DAOs (pelas rotas e pelas operações sem rota) num banco
+ampliado e falha se alguma ler inteira uma tabela grande, ordenar fora do
+índice ou se algum método não tiver sido exercitado:
+
+    python -m benchmark planos
+
+O subcomando sessoes conta, em fluxos anônimos e logados, as consultas de
+sessão e autenticação com as sessões no banco e em cada PERFIL_BAIXO_IO:
+
+    python -m benchmark sessoes
+"""
@@ -0,0 +1,303 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def _configurar_django(banco, replica=None):
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmark.settings'
+    os.environ['BENCHMARK_BANCO'] = str(banco)
+    if replica:
+        os.environ['BENCHMARK_REPLICA'] = str(replica)
+    if str(RAIZ) not in sys.path:
+        sys.path.insert(0, str(RAIZ))
+    import django
+    from django.db.backends.signals import connection_created
+    from benchmark.sqlite import registrar_funcoes
+
+    def _funcoes_mysql(sender, connection, **kwargs):
+        registrar_funcoes(connection.connection)
+
+    connection_created.connect(_funcoes_mysql, weak=False)
+    django.setup()
+
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _esperar_porta(porta, processo, limite=30):
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        if processo.poll() is not None:
+            raise SystemExit('O servidor HTTP do benchmark terminou ao iniciar')
+        try:
+            socket.create_connection(('127.0.0.1', porta), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit('O servidor HTTP do benchmark não respondeu')
+
+
+def _imprimir(resultados):
+    print(f"{'modo':<8} {'rota':<28} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'RSS MB':>8} {'erros':>6}")
+    for r in resultados:
+        rss = '-' if r['rss_pico_mb'] is None else f"{r['rss_pico_mb']:.1f}"
+        print(f"{r['modo']:<8} {r['rota']:<28} {r['req_s']:>9.1f} {r['p50_ms']:>9.2f} "
+              f"{r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {rss:>8} {r['erros']:>6}")
+
+
+def executar(args):
+    banco = Path(args.banco) if args.banco else Path(tempfile.mkdtemp(prefix='benchmark-')) / 'loja.sqlite3'
+    # Réplica de leitura: cópia do banco depois da carga (sem replicação, como uma réplica atrasada)
+    replica = banco.with_name(f'{banco.stem}-replica{banco.suffix}') if args.replica else None
+    from benchmark.sqlite import criar_banco
+    if not (args.reusar and banco.exists()):
+        criar_banco(banco)
+        _configurar_django(banco, replica)
+        from benchmark.dados import ampliar
+        inicio = time.perf_counter()
+        ampliar(args.escala, args.semente)
+        print(f'Banco {banco} criado na escala {args.escala} em {time.perf_counter() - inicio:.1f}s')
+    else:
+        _configurar_django(banco, replica)
+    if replica and not (args.reusar and replica.exists()):
+        shutil.copyfile(banco, replica)
+
+    from benchmark import rotas
+    requisicoes = rotas.montar_requisicoes(args.rotas)
+    resultados = rotas.medir_cliente(requisicoes, args.requisicoes, args.aquecimento)
+
+    if args.http:
+        porta = _porta_livre()
+        servidor = subprocess.Popen(
+            [sys.executable, '-m', 'benchmark', 'servir', '--banco', str(banco), '--porta', str(porta)]
+            + (['--replica', str(replica)] if replica else []),
+            cwd=RAIZ, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            _esperar_porta(porta, servidor)
+            resultados += rotas.medir_http(requisicoes, args.requisicoes, args.aquecimento,
+                                           args.processos, f'http://127.0.0.1:{porta}', servidor.pid)
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+    _imprimir(resultados)
+    if args.saida:
+        import django
+        meta = {
+            'data': datetime.now().isoformat(timespec='seconds'),
+            'escala': args.escala,
+            'semente': args.semente,
+            'requisicoes': args.requisicoes,
+            'processos': args.processos if args.http else None,
+            'replica': args.replica,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'plataforma': platform.platform(),
+        }
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump({'meta': meta, 'resultados': resultados}, arquivo, indent=2, ensure_ascii=False)
+        print(f'Resultados gravados em {args.saida}')
+    if any(r['erros'] for r in resultados):
+        sys.exit(1)
+
+
+def orcamentos(args):
+    banco = Path(args.banco) if args.banco else Path(tempfile.mkdtemp(prefix='benchmark-')) / 'loja.sqlite3'
+    from benchmark.sqlite import criar_banco
+    if not (args.reusar and banco.exists()):
+        criar_banco(banco)
+        _configurar_django(banco)
+        from benchmark.dados import ampliar
+        ampliar(args.escala, args.semente)
+    else:
+        _configurar_django(banco)
+
+    from benchmark import rotas
+    resultados = rotas.verificar_orcamentos(rotas.montar_requisicoes(args.rotas))
+    print(f"{'rota':<28} {'status':>6} {'consultas':>10} {'orçamento':>10}")
+    falhas = 0
+    for nome, status, consultas, maximo, problemas in resultados:
+        print(f"{nome:<28} {status:>6} {consultas:>10} {'-' if maximo is None else maximo:>10}")
+        for problema in problemas:
+            print(f'    {problema}')
+        falhas += bool(problemas)
+    if falhas:
+        print(f'{falhas} rota(s) fora do orçamento')
+        sys.exit(1)
+
+
+def planos(args):
+    banco = Path(args.banco) if args.banco else Path(tempfile.mkdtemp(prefix='benchmark-')) / 'loja.sqlite3'
+    from benchmark.sqlite import criar_banco
+    if not (args.reusar and banco.exists()):
+        criar_banco(banco)
+        _configurar_django(banco)
+        from benchmark.dados import ampliar
+        ampliar(args.escala, args.semente)
+    else:
+        _configurar_django(banco)
+
+    from benchmark import planos as conferencia, rotas
+    resultados, sem_cobertura = conferencia.verificar(rotas.montar_requisicoes(args.rotas), args.minimo_linhas)
+    falhas = 0
+    for metodo, texto, plano, problemas in resultados:
+        if problemas or args.detalhes:
+            print(f"{metodo}: {' '.join(texto.split())[:120]}")
+            for detalhe in plano:
+                print(f'    {detalhe}')
+            for problema in problemas:
+                print(f'    ! {problema}')
+        falhas += bool(problemas)
+    for metodo in sem_cobertura:
+        print(f'{metodo}: nenhuma operação executou o método')
+    print(f'{len(resultados)} consulta(s) conferida(s), {falhas} com plano ruim, '
+          f'{len(sem_cobertura)} método(s) sem cobertura')
+    if falhas or (sem_cobertura and not args.rotas):
+        sys.exit(1)
+
+
+def sessoes(args):
+    banco = Path(args.banco) if args.banco else Path(tempfile.mkdtemp(prefix='benchmark-')) / 'loja.sqlite3'
+    from benchmark.sqlite import criar_banco
+    if not (args.reusar and banco.exists()):
+        criar_banco(banco)
+    _configurar_django(banco)
+
+    from django.conf import settings
+    from benchmark import sessoes as medicao
+    perfis = args.perfis or list(settings.PERFIS_BAIXO_IO)
+    desconhecidos = set(perfis) - set(settings.PERFIS_BAIXO_IO)
+    if desconhecidos:
+        raise SystemExit(f"Perfis inexistentes: {', '.join(sorted(desconhecidos))}")
+    medicao.preparar()
+    print(f"{'fluxo':<26} {'req':>4} {'banco':>12}" + ''.join(f' {perfil:>12}' for perfil in perfis)
+          + '  (consultas: total/sessão)')
+    resultados = medicao.comparar(perfis)
+    for nome, requisicoes, contagens in resultados:
+        linha = f'{nome:<26} {requisicoes:>4}'
+        for perfil in [None, *perfis]:
+            total, da_sessao = contagens[perfil]
+            linha += f" {f'{total}/{da_sessao}':>12}"
+        print(linha)
+    requisicoes = sum(r[1] for r in resultados)
+    for perfil in perfis:
+        removidas = sum(r[2][None][0] - r[2][perfil][0] for r in resultados)
+        print(f'{perfil}: {removidas} consultas a menos em {requisicoes} requisições '
+              f'({removidas / requisicoes:.2f} por requisição)')
+
+
+def comparar(args):
+    with open(args.antes, encoding='utf-8') as arquivo:
+        antes = {(r['modo'], r['rota']): r for r in json.load(arquivo)['resultados']}
+    with open(args.depois, encoding='utf-8') as arquivo:
+        depois = {(r['modo'], r['rota']): r for r in json.load(arquivo)['resultados']}
+
+    def variacao(a, b):
+        return f'{(b - a) / a * 100:+.1f}%' if a else '-'
+
+    print(f"{'modo':<8} {'rota':<28} {'p50 ms':>17} {'Δ':>8} {'p95 ms':>17} {'Δ':>8} {'req/s Δ':>8}")
+    regressoes = 0
+    for chave in sorted(antes.keys() & depois.keys()):
+        a, b = antes[chave], depois[chave]
+        print(f"{chave[0]:<8} {chave[1]:<28} {a['p50_ms']:>8.2f}→{b['p50_ms']:<8.2f} "
+              f"{variacao(a['p50_ms'], b['p50_ms']):>8} {a['p95_ms']:>8.2f}→{b['p95_ms']:<8.2f} "
+              f"{variacao(a['p95_ms'], b['p95_ms']):>8} {variacao(a['req_s'], b['req_s']):>8}")
+        if a['p95_ms'] and (b['p95_ms'] - a['p95_ms']) / a['p95_ms'] * 100 > args.limite:
+            regressoes += 1
+    for chave in sorted(antes.keys() ^ depois.keys()):
+        print(f'{chave[0]:<8} {chave[1]:<28} presente só em um dos arquivos')
+    if regressoes:
+        print(f'{regressoes} rota(s) com p95 pior que {args.limite}%')
+        sys.exit(1)
+
+
+def servir(args):
+    _configurar_django(args.banco, args.replica)
+    from django.core.servers.basehttp import run
+    from django.core.wsgi import get_wsgi_application
+    run('127.0.0.1', args.porta, get_wsgi_application(), threading=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmark', description=__doc__)
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    p = subcomandos.add_parser('executar', help='Mede todas as rotas de core/urls.py')
+    p.add_argument('--escala', type=int, default=1, help='Multiplicador dos dados de loja_lingerie.sql')
+    p.add_argument('--semente', type=int, default=42)
+    p.add_argument('--requisicoes', type=int, default=50, help='Requisições medidas por rota')
+    p.add_argument('--aquecimento', type=int, default=5, help='Requisições descartadas por rota')
+    p.add_argument('--rotas', nargs='*', default=None, help='Só as rotas cujo nome contém um destes trechos')
+    p.add_argument('--http', action='store_true',
+                   help='Também mede por HTTP, com um servidor threaded e vários processos clientes')
+    p.add_argument('--processos', type=int, default=4, help='Processos clientes no modo --http')
+    p.add_argument('--banco', default=None, help='Arquivo SQLite (padrão: diretório temporário)')
+    p.add_argument('--reusar', action='store_true', help='Reaproveita o --banco existente sem recriar')
+    p.add_argument('--replica', action='store_true',
+                   help='Lê das DAOs numa cópia SQLite do banco (BANCO_LEITURA) e grava no principal')
+    p.add_argument('--saida', default=None, help='Grava os resultados neste arquivo JSON')
+    p.set_defaults(funcao=executar)
+
+    p = subcomandos.add_parser('orcamentos',
+                               help='Confere as consultas de cada rota com o @orcamento da view e procura N+1')
+    p.add_argument('--escala', type=int, default=1, help='Multiplicador dos dados de loja_lingerie.sql')
+    p.add_argument('--semente', type=int, default=42)
+    p.add_argument('--rotas', nargs='*', default=None, help='Só as rotas cujo nome contém um destes trechos')
+    p.add_argument('--banco', default=None, help='Arquivo SQLite (padrão: diretório temporário)')
+    p.add_argument('--reusar', action='store_true', help='Reaproveita o --banco existente sem recriar')
+    p.set_defaults(funcao=orcamentos)
+
+    p = subcomandos.add_parser('planos',
+                               help='EXPLAIN das consultas das DAOs: varreduras completas e filesort')
+    p.add_argument('--escala', type=int, default=200, help='Multiplicador dos dados de loja_lingerie.sql')
+    p.add_argument('--semente', type=int, default=42)
+    p.add_argument('--rotas', nargs='*', default=None, help='Só as rotas cujo nome contém um destes trechos')
+    p.add_argument('--minimo-linhas', type=int, default=1000,
+                   help='Linhas a partir das quais uma tabela conta como grande')
+    p.add_argument('--detalhes', action='store_true', help='Imprime o plano de todas as consultas')
+    p.add_argument('--banco', default=None, help='Arquivo SQLite (padrão: diretório temporário)')
+    p.add_argument('--reusar', action='store_true', help='Reaproveita o --banco existente sem recriar')
+    p.set_defaults(funcao=planos)
+
+    p = subcomandos.add_parser('sessoes',
+                               help='Conta as consultas de sessão e autenticação com e sem PERFIL_BAIXO_IO')
+    p.add_argument('--perfis', nargs='*', default=None, help='Perfis de PERFIS_BAIXO_IO (padrão: todos)')
+    p.add_argument('--banco', default=None, help='Arquivo SQLite (padrão: diretório temporário)')
+    p.add_argument('--reusar', action='store_true', help='Reaproveita o --banco existente sem recriar')
+    p.set_defaults(funcao=sessoes)
+
+    p = subcomandos.add_parser('comparar', help='Compara dois arquivos JSON de resultados')
+    p.add_argument('antes')
+    p.add_argument('depois')
+    p.add_argument('--limite', type=float, default=10.0,
+                   help='Falha se o p95 de alguma rota piorar mais que este percentual')
+    p.set_defaults(funcao=comparar)
+
+    p = subcomandos.add_parser('servir', help=argparse.SUPPRESS)
+    p.add_argument('--banco', required=True)
+    p.add_argument('--porta', type=int, required=True)
+    p.add_argument('--replica', default=None)
+    p.set_defaults(funcao=servir)
+
+    args = parser.parse_args(argv)
+    args.funcao(args)
+
+
+if __name__ == '__main__':
+    main()
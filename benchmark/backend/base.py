@@ -0,0 +1,14 @@
+"""
+Backend SQLite do benchmark: transações começam com BEGIN IMMEDIATE.
+
+Com o BEGIN padrão (DEFERRED), duas transações que leem e depois tentam
+escrever recebem "database is locked" na hora, sem esperar o timeout, e o
+checkout concorrente do modo --http falharia por causa do SQLite, não da
+aplicação. O MySQL bloqueia a linha e espera.
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
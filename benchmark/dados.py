@@ -0,0 +1,20 @@
+"""
+Amplia os dados de exemplo de loja_lingerie.sql para o tamanho pedido:
+escala N acrescenta (N - 1) vezes o volume do script em produtos (com a
+grade de estoque), clientes e vendas, usando o gerador de core/gerador.py
+(escala 1 = só os dados do script). Determinístico pela semente.
+"""
+from core import gerador
+
+# Linhas de loja_lingerie.sql que cada unidade de escala acrescenta
+PRODUTOS, CLIENTES, VENDAS = 16, 10, 15
+
+
+def ampliar(escala, semente=42):
+    """Acrescenta produtos, estoque, clientes e vendas até escala × o script"""
+    if escala <= 1:
+        return
+    parametros = gerador.preparar(semente, 0, 0, PRODUTOS * (escala - 1), CLIENTES * (escala - 1),
+                                  VENDAS * (escala - 1), dias=365)
+    gerador.executar_fases(parametros, (('produtos', 'clientes'), ('vendas',)))
+    gerador.finalizar()
@@ -0,0 +1,206 @@
+"""
+EXPLAIN de cada consulta das DAOs no banco ampliado do benchmark.
+
+Grava as consultas de todas as rotas de core/urls.py e das operações que
+nenhuma rota faz (comandos de manutenção, trabalhador de tarefas, análise
+de margens) e roda EXPLAIN QUERY PLAN numa consulta de cada forma
+(core.orcamento.forma) de cada método. Um plano é problema quando:
+
+- lê inteira uma tabela grande (SCAN sem índice; o type=ALL do MySQL);
+- ordena fora do índice (USE TEMP B-TREE FOR ORDER BY; o filesort do MySQL)
+  numa consulta que lê alguma tabela grande.
+
+Tabela grande é a que tem pelo menos `minimo_linhas` linhas no banco. Os
+métodos que percorrem a tabela por natureza (exportações, recálculo dos
+resumos) estão em VARREDURAS_ESPERADAS com o motivo. Um método das DAOs que
+nenhuma operação exercitou também é problema: ele não teve o plano conferido.
+"""
+import inspect
+import re
+from datetime import date, datetime, timedelta
+
+from django.db import connection
+
+from core import dao, orcamento
+from core.dao import (
+    CategoriaDAO, ClienteDAO, CompraDAO, ProdutoDAO, ResumoDAO, ResumoDiarioDAO, TarefaDAO, VendaDAO,
+)
+
+# Classe.metodo -> por que ler a tabela inteira é o esperado
+VARREDURAS_ESPERADAS = {
+    'ProdutoDAO.iterar': 'exportação: percorre todos os produtos pela chave primária',
+    'ProdutoDAO.iterar_precos': 'análise de margens: percorre o catálogo inteiro',
+    'ProdutoDAO.buscar_texto': 'sem FULLTEXT: o índice de trigramas em memória lê o catálogo ao ser montado',
+    'ProdutoDAO.contar': 'total de linhas para o progresso da exportação',
+    'ClienteDAO.iterar': 'exportação: percorre todos os clientes pela chave primária',
+    'ClienteDAO.contar': 'total de linhas para o progresso da exportação',
+    'VendaDAO.iterar': 'exportação: percorre todas as vendas pela chave primária',
+    'VendaDAO.contar': 'total de linhas para o progresso da exportação',
+    'ResumoDAO.reconstruir': 'reconstrução completa dos resumos a partir do histórico',
+    'ResumoDiarioDAO.reconstruir': 'reconstrução completa do resumo diário a partir das vendas',
+    'ResumoDiarioDAO._recalcular': 'recálculo do resumo diário a partir das vendas',
+}
+
+_TABELAS_SQL = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+_VARREDURA = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?$')
+_ORDENACAO = re.compile(r'USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY')
+_PALAVRAS = {'WHERE', 'ON', 'SET', 'LEFT', 'INNER', 'RIGHT', 'JOIN', 'ORDER', 'GROUP', 'LIMIT',
+             'VALUES', 'SELECT', 'USING', 'HAVING', 'UNION'}
+
+
+def _operacoes_extras():
+    """[(descrição, função)] das operações das DAOs que nenhuma rota faz"""
+    hoje = date.today()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT MAX(id_venda) FROM vendas')
+        ultima_venda = cursor.fetchone()[0]
+        cursor.execute('SELECT MAX(id_compra) FROM compras')
+        ultima_compra = cursor.fetchone()[0]
+        cursor.execute('SELECT cpf FROM clientes ORDER BY id_cliente LIMIT 3')
+        cpfs = [linha[0] for linha in cursor.fetchall()]
+
+    def cadastros():
+        id_categoria = CategoriaDAO.criar('Conferência de planos')
+        CategoriaDAO.atualizar(id_categoria, 'Conferência de planos', 'editada')
+        CategoriaDAO.deletar(id_categoria)
+        CategoriaDAO.deletar_em_lote([CategoriaDAO.criar('Conferência de planos')])
+        id_produto = ProdutoDAO.criar('Conferência de planos', 'Planos', 10, 20)
+        ProdutoDAO.atualizar(id_produto, 'Conferência de planos', 'Planos', 10, 25)
+        ProdutoDAO.deletar(id_produto)
+        ProdutoDAO.criar_em_lote([{'nome_produto': 'Conferência de planos', 'marca': 'Planos',
+                                   'preco_custo': 10, 'preco_venda': 20, 'ativo': True}])
+        ProdutoDAO.deletar_em_lote([ProdutoDAO.criar('Conferência de planos', 'Planos', 10, 20)])
+        id_cliente = ClienteDAO.criar('Conferência de planos', '000.000.001-91')
+        ClienteDAO.atualizar(id_cliente, 'Conferência de planos', '000.000.001-91', 'planos@exemplo.com')
+        ClienteDAO.deletar(id_cliente)
+        ClienteDAO.criar_em_lote([{'nome_cliente': 'Conferência de planos', 'cpf': '000.000.002-72',
+                                   'email': '', 'telefone': '', 'ativo': True}])
+        ClienteDAO.deletar_em_lote([ClienteDAO.criar('Conferência de planos', '000.000.003-53')])
+
+    def tarefa():
+        id_tarefa = TarefaDAO.criar('relatorio_receita', '{}')
+        TarefaDAO.reservar('planos', {'relatorio_receita': 1}, 1)
+        TarefaDAO.sinalizar('planos', {id_tarefa: 50})
+        TarefaDAO.falhar(id_tarefa, 'planos', 'conferência de planos', datetime.now())
+        TarefaDAO.reservar('planos', {'relatorio_receita': 1}, 1)
+        TarefaDAO.concluir(id_tarefa, 'planos', 'planos.json')
+        TarefaDAO.recuperar_abandonadas(datetime.now() - timedelta(hours=1))
+
+    return [
+        ('cadastros', cadastros),
+        ('totais das exportações', lambda: [dao.contar() for dao in (ProdutoDAO, ClienteDAO, VendaDAO)]),
+        ('compra', lambda: CompraDAO.buscar(ultima_compra)),
+        ('categorias ativas', lambda: CategoriaDAO.listar()),
+        ('produtos', lambda: ProdutoDAO.listar()),
+        ('clientes', lambda: ClienteDAO.listar()),
+        ('cpfs da importação', lambda: ClienteDAO.buscar_por_cpfs(cpfs)),
+        ('cpf', lambda: ClienteDAO.buscar_por_cpf(cpfs[0])),
+        ('marcas', lambda: ProdutoDAO.listar_marcas()),
+        ('preços do catálogo', lambda: [lote for lote in ProdutoDAO.iterar_precos()]),
+        ('volumes vendidos', lambda: VendaDAO.volumes_por_produto(datetime.now() - timedelta(days=90))),
+        ('cancelamento', lambda: VendaDAO.cancelar(ultima_venda)),
+        ('resumo diário pendente', lambda: ResumoDiarioDAO.atualizar_pendentes()),
+        ('resumo diário desde ontem', lambda: ResumoDiarioDAO.reconstruir(hoje - timedelta(days=1))),
+        ('resumos', lambda: ResumoDAO.reconstruir()),
+        ('tarefas', tarefa),
+    ]
+
+
+def _gravar_rotas(requisicoes):
+    from benchmark.rotas import _requisitar
+    from django.test import Client
+
+    cliente = Client(raise_request_exception=False)
+    with orcamento.gravar(guardar_parametros=True) as gravacao:
+        for nome, metodo, caminho, dados in requisicoes:
+            resposta = _requisitar(cliente, metodo, caminho, dados)
+            if resposta.streaming:
+                b''.join(resposta.streaming_content)
+        for _, funcao in _operacoes_extras():
+            funcao()
+    return gravacao
+
+
+def metodos_das_daos():
+    """Nomes Classe.metodo de todos os métodos estáticos das DAOs"""
+    return {
+        f'{nome}.{metodo}'
+        for nome, classe in vars(dao).items()
+        if inspect.isclass(classe) and nome.endswith('DAO') and classe.__module__ == dao.__name__
+        for metodo, atributo in vars(classe).items()
+        if isinstance(atributo, staticmethod)
+    }
+
+
+def _linhas_por_tabela():
+    with connection.cursor() as cursor:
+        tabelas = connection.introspection.table_names(cursor)
+        contagens = {}
+        for tabela in tabelas:
+            cursor.execute(f'SELECT COUNT(*) FROM {tabela}')
+            contagens[tabela] = cursor.fetchone()[0]
+    return contagens
+
+
+def _apelidos(sql):
+    """apelido (ou nome) -> tabela, para os FROM/JOIN/UPDATE/INTO da consulta"""
+    apelidos = {}
+    for tabela, apelido in _TABELAS_SQL.findall(sql):
+        apelidos[tabela] = tabela
+        if apelido and apelido.upper() not in _PALAVRAS:
+            apelidos[apelido] = tabela
+    return apelidos
+
+
+def explicar(sql, params):
+    """Linhas de detalhe do EXPLAIN QUERY PLAN da consulta"""
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return [linha[-1] for linha in cursor.fetchall()]
+
+
+def problemas_do_plano(sql, plano, linhas, minimo_linhas):
+    """Varreduras completas de tabelas grandes e ordenações fora do índice"""
+    apelidos = _apelidos(sql)
+    encontrados = []
+    # Ordenar poucas linhas (formas de pagamento, categorias) não pesa:
+    # o filesort só conta quando a consulta lê alguma tabela grande
+    grande = any(linhas.get(tabela, 0) >= minimo_linhas for tabela in apelidos.values())
+    for detalhe in plano:
+        varredura = _VARREDURA.match(detalhe)
+        if varredura:
+            tabela = apelidos.get(varredura.group(1), varredura.group(1))
+            if linhas.get(tabela, 0) >= minimo_linhas:
+                encontrados.append(f'varredura completa de {tabela} ({linhas[tabela]} linhas)')
+        elif grande and _ORDENACAO.search(detalhe):
+            encontrados.append('ordenação fora do índice (filesort)')
+    return encontrados
+
+
+def verificar(requisicoes, minimo_linhas=1000):
+    """
+    Planos das consultas das DAOs: (lista de (método, forma, plano,
+    problemas) por consulta distinta, métodos sem cobertura)
+    """
+    gravacao = _gravar_rotas(requisicoes)
+    linhas = _linhas_por_tabela()
+    vistos = {}
+    for (sql, metodo), params in zip(gravacao.consultas, gravacao.parametros):
+        if metodo == 'fora_dao':
+            continue
+        chave = (metodo, orcamento.forma(sql))
+        if chave not in vistos:
+            # executemany: o plano é o mesmo para todas as linhas
+            if params and isinstance(params[0], (list, tuple)):
+                params = params[0]
+            vistos[chave] = (sql, params)
+
+    resultados = []
+    for (metodo, texto), (sql, params) in sorted(vistos.items()):
+        plano = explicar(sql, params)
+        problemas = problemas_do_plano(sql, plano, linhas, minimo_linhas)
+        if metodo in VARREDURAS_ESPERADAS:
+            problemas = []
+        resultados.append((metodo, texto, plano, problemas))
+    sem_cobertura = sorted(metodos_das_daos() - {metodo for metodo, _ in vistos})
+    return resultados, sem_cobertura
@@ -0,0 +1,267 @@
+"""
+Execução das rotas de core/urls.py e cálculo das estatísticas.
+
+Cada rota vira uma requisição concreta: os parâmetros <int:id> recebem um
+registro existente da entidade da rota, <str:formato> recebe 'csv' e as
+rotas que precisam de query string ou de POST têm a sua entrada em
+REQUISICOES. As rotas de tarefas recebem uma tarefa executada na hora.
+Rotas novas entram sozinhas no benchmark.
+"""
+import http.cookiejar
+import json
+import os
+import resource
+import statistics
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from multiprocessing import Pool
+
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from core.urls import urlpatterns
+
+# nome da rota -> (método, query string ou corpo JSON); 'FORM' é um POST de formulário
+REQUISICOES = {
+    'produto_busca': ('GET', {'q': 'renda'}),
+    'cliente_autocompletar': ('GET', {'q': 'Ma'}),
+    'relatorio_receita': ('GET', {'inicio': '2025-01-01', 'fim': '2026-12-31', 'agrupamento': 'semana'}),
+    'venda_checkout': ('POST', None),  # corpo montado em montar_requisicoes
+    'compra_criar': ('POST', {'id_fornecedor': 1, 'itens': [
+        {'id_produto': 1, 'tamanho': '38', 'cor': 'Preto', 'quantidade': 10, 'preco_unitario': '25.00'},
+        {'id_produto': 1, 'tamanho': '44', 'cor': 'Preto', 'quantidade': 5, 'preco_unitario': '25.00'},
+    ]}),
+    'compra_receber': ('POST', None),
+    'categoria_acao_lote': ('FORM', {'acao': 'ativar', 'ids': [1, 2, 3]}),
+    'produto_acao_lote': ('FORM', {'acao': 'ativar', 'ids': [1, 2, 3]}),
+    'cliente_acao_lote': ('FORM', {'acao': 'ativar', 'ids': [1, 2, 3]}),
+    'produto_reajustar': ('FORM', {'percentual': '0', 'marca': 'Hope'}),
+    'api_produto_lista': ('GET', {'campos': 'nome_produto,preco_venda', 'formato': 'linhas'}),
+    'api_categoria_lote': ('GET', {'ids': '1,2,3'}),
+    'api_produto_lote': ('POST', {'ids': list(range(1, 201))}),
+    'api_cliente_lote': ('GET', {'ids': ','.join(map(str, range(1, 51))), 'campos': 'nome_cliente,email'}),
+    'tarefa_criar': ('POST', {'tipo': 'exportar_produtos', 'parametros': {'formato': 'csv'}}),
+}
+
+# Entidade do nome da rota (produto_editar, api_produto_detalhe) -> (tabela,
+# coluna de id) usados para preencher <int:id>
+ENTIDADES = {
+    'categoria': ('categorias', 'id_categoria'),
+    'produto': ('produtos', 'id_produto'),
+    'cliente': ('clientes', 'id_cliente'),
+    'venda': ('vendas', 'id_venda'),
+    'compra': ('compras', 'id_compra'),
+}
+
+
+def _primeiro_id(tabela, coluna):
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN({coluna}) FROM {tabela}')
+        return cursor.fetchone()[0]
+
+
+def _corpo_checkout():
+    # A variação com mais estoque, para o checkout não esgotar durante a medição
+    with connection.cursor() as cursor:
+        cursor.execute('UPDATE estoque SET quantidade = 1000000 WHERE id_estoque = '
+                       '(SELECT MIN(id_estoque) FROM estoque)')
+        cursor.execute('SELECT MIN(id_estoque) FROM estoque')
+        id_estoque = cursor.fetchone()[0]
+    return {'id_cliente': _primeiro_id('clientes', 'id_cliente'), 'forma_pagamento': 'PIX',
+            'itens': [{'id_estoque': id_estoque, 'quantidade': 1}]}
+
+
+def _tarefa_concluida():
+    # Executada agora, para o status e o download terem um arquivo pronto
+    from core import tarefas
+    id_tarefa = tarefas.enfileirar('relatorio_receita', {'inicio': '2025-01-01', 'fim': '2026-12-31'})
+    tarefas.Trabalhador(tipos=['relatorio_receita']).rodar(ate_esvaziar=True)
+    return id_tarefa
+
+
+def montar_requisicoes(filtro=None):
+    """Lista de (nome, método, caminho, dados) para todas as rotas de core/urls.py"""
+    requisicoes = []
+    id_tarefa = None
+    for padrao in urlpatterns:
+        nome = padrao.name
+        if filtro and not any(trecho in nome for trecho in filtro):
+            continue
+        argumentos = {}
+        for parametro in padrao.pattern.converters:
+            if parametro == 'formato':
+                argumentos[parametro] = 'csv'
+            elif nome.startswith('tarefa_'):
+                id_tarefa = id_tarefa or _tarefa_concluida()
+                argumentos[parametro] = id_tarefa
+            else:
+                entidade = next(parte for parte in nome.split('_') if parte in ENTIDADES)
+                argumentos[parametro] = _primeiro_id(*ENTIDADES[entidade])
+        metodo, dados = REQUISICOES.get(nome, ('GET', None))
+        if nome == 'venda_checkout':
+            dados = _corpo_checkout()
+        requisicoes.append((nome, metodo, reverse(nome, kwargs=argumentos), dados))
+    return requisicoes
+
+
+def verificar_orcamentos(requisicoes):
+    """
+    Faz cada requisição uma vez, gravando as consultas, e confere com o
+    @orcamento da view. Lista de (nome, status, consultas, orçamento, problemas).
+    """
+    from django.urls import resolve
+    from core import orcamento
+
+    cliente = Client(raise_request_exception=False)
+    resultados = []
+    for nome, metodo, caminho, dados in requisicoes:
+        view = resolve(caminho).func
+        with orcamento.gravar() as gravacao:
+            resposta = _requisitar(cliente, metodo, caminho, dados)
+            if resposta.streaming:
+                b''.join(resposta.streaming_content)
+        problemas = orcamento.problemas(view, gravacao, exigir=True)
+        if resposta.status_code >= 500:
+            problemas.append(f'status {resposta.status_code}')
+        resultados.append((nome, resposta.status_code, len(gravacao),
+                           getattr(view, 'orcamento_consultas', None), problemas))
+    return resultados
+
+
+def rss_atual():
+    """RSS atual do processo em bytes (pico do processo se /proc não existir)"""
+    try:
+        with open('/proc/self/statm') as arquivo:
+            return int(arquivo.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def rss_processo(pid):
+    """(RSS atual, pico de RSS) de outro processo em bytes, pelo /proc"""
+    valores = {}
+    try:
+        with open(f'/proc/{pid}/status') as arquivo:
+            for linha in arquivo:
+                if linha.startswith(('VmRSS:', 'VmHWM:')):
+                    chave, valor = linha.split(':', 1)
+                    valores[chave] = int(valor.split()[0]) * 1024
+    except OSError:
+        return None, None
+    return valores.get('VmRSS'), valores.get('VmHWM')
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def estatisticas(nome, modo, caminho, latencias, status, duracao, rss_pico):
+    erros = sum(1 for codigo in status if codigo >= 400)
+    return {
+        'rota': nome,
+        'modo': modo,
+        'caminho': caminho,
+        'requisicoes': len(latencias),
+        'erros': erros,
+        'status': sorted(set(status)),
+        'req_s': round(len(latencias) / duracao, 2) if duracao else 0.0,
+        'p50_ms': round(statistics.median(latencias) * 1000, 3),
+        'p95_ms': round(_percentil(latencias, 0.95) * 1000, 3),
+        'p99_ms': round(_percentil(latencias, 0.99) * 1000, 3),
+        'rss_pico_mb': round(rss_pico / 2 ** 20, 1) if rss_pico else None,
+    }
+
+
+def _requisitar(cliente, metodo, caminho, dados):
+    if metodo == 'FORM':
+        return cliente.post(caminho, dados)
+    if metodo == 'POST':
+        return cliente.post(caminho, json.dumps(dados), content_type='application/json')
+    return cliente.get(caminho, dados or {})
+
+
+def medir_cliente(requisicoes, quantidade, aquecimento):
+    """Executa cada rota pelo test client do Django, no próprio processo"""
+    cliente = Client(raise_request_exception=False)
+    resultados = []
+    for nome, metodo, caminho, dados in requisicoes:
+        for _ in range(aquecimento):
+            resposta = _requisitar(cliente, metodo, caminho, dados)
+            if resposta.streaming:
+                b''.join(resposta.streaming_content)
+        latencias, status, rss_pico = [], [], rss_atual()
+        inicio = time.perf_counter()
+        for _ in range(quantidade):
+            t0 = time.perf_counter()
+            resposta = _requisitar(cliente, metodo, caminho, dados)
+            if resposta.streaming:
+                b''.join(resposta.streaming_content)
+            latencias.append(time.perf_counter() - t0)
+            status.append(resposta.status_code)
+            rss_pico = max(rss_pico, rss_atual())
+        duracao = time.perf_counter() - inicio
+        resultados.append(estatisticas(nome, 'cliente', caminho, latencias, status, duracao, rss_pico))
+    return resultados
+
+
+def _url(base, caminho, metodo, dados):
+    if metodo == 'GET' and dados:
+        return base + caminho + '?' + urllib.parse.urlencode(dados)
+    return base + caminho
+
+
+# Página com formulário, usada para obter o cookie CSRF antes dos POSTs
+PAGINA_CSRF = '/clientes/criar/'
+
+
+def _trabalhador_http(argumentos):
+    """Processo gerador de carga: faz `quantidade` requisições e devolve (latência, status)"""
+    base, url, metodo, dados, quantidade = argumentos
+    cookies = http.cookiejar.CookieJar()
+    abridor = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(cookies))
+    cabecalhos = {'Content-Type': 'application/json'}
+    corpo = None
+    if metodo in ('POST', 'FORM'):
+        abridor.open(base + PAGINA_CSRF).read()
+        cabecalhos['X-CSRFToken'] = next(c.value for c in cookies if c.name == 'csrftoken')
+        corpo = json.dumps(dados).encode()
+    if metodo == 'FORM':
+        cabecalhos['Content-Type'] = 'application/x-www-form-urlencoded'
+        corpo = urllib.parse.urlencode(dados, doseq=True).encode()
+    medidas = []
+    for _ in range(quantidade):
+        pedido = urllib.request.Request(url, data=corpo, method='POST' if metodo == 'FORM' else metodo,
+                                        headers=cabecalhos)
+        t0 = time.perf_counter()
+        try:
+            with abridor.open(pedido) as resposta:
+                resposta.read()
+                codigo = resposta.status
+        except urllib.error.HTTPError as erro:
+            erro.read()
+            codigo = erro.code
+        medidas.append((time.perf_counter() - t0, codigo))
+    return medidas
+
+
+def medir_http(requisicoes, quantidade, aquecimento, processos, base, pid_servidor):
+    """Executa cada rota por HTTP com `processos` clientes simultâneos contra o servidor em base"""
+    resultados = []
+    with Pool(processos) as pool:
+        for nome, metodo, caminho, dados in requisicoes:
+            url = _url(base, caminho, metodo, dados)
+            pool.map(_trabalhador_http, [(base, url, metodo, dados, aquecimento)] * processos)
+            por_processo = [quantidade // processos + (i < quantidade % processos) for i in range(processos)]
+            inicio = time.perf_counter()
+            lotes = pool.map(_trabalhador_http, [(base, url, metodo, dados, n) for n in por_processo if n])
+            duracao = time.perf_counter() - inicio
+            medidas = [medida for lote in lotes for medida in lote]
+            _, rss_pico = rss_processo(pid_servidor)
+            resultados.append(estatisticas(
+                nome, 'http', caminho, [m[0] for m in medidas], [m[1] for m in medidas], duracao, rss_pico
+            ))
+    return resultados
@@ -0,0 +1,89 @@
+"""
+Consultas de sessão e autenticação por requisição em cada PERFIL_BAIXO_IO.
+
+Faz os mesmos fluxos (criar categoria com mensagem e redirect, lista de
+produtos e, logado, o admin) com as sessões em django_session e em cada
+perfil de PERFIS_BAIXO_IO, gravando as consultas. As de django_session,
+auth_* e django_admin_log são as que o perfil pode tirar do banco; as das
+DAOs não mudam. O login fica de fora das contagens, só o que vem depois.
+"""
+from django.core.management import call_command
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core import orcamento, versoes
+
+USUARIO = 'benchmark'
+SENHA = 'benchmark-sessoes'
+_TABELAS_CACHE = ('categorias', 'produtos', 'clientes')
+_TABELAS_SESSAO = ('django_session', 'auth_', 'django_admin_log', 'django_content_type')
+
+
+def _fluxos():
+    """[(nome, logado, [(método, caminho, dados)])]"""
+    criar = ('POST', reverse('categoria_criar'), {'nome_categoria': 'Benchmark sessões', 'ativo': 'on'})
+    lista = ('GET', reverse('produto_lista'), None)
+    return [
+        ('anônimo: criar categoria', False, [criar]),
+        ('anônimo: lista produtos', False, [lista]),
+        ('logado: criar categoria', True, [criar]),
+        ('logado: lista produtos', True, [lista]),
+        ('logado: admin', True, [('GET', reverse('admin:index'), None)]),
+    ]
+
+
+def preparar():
+    """Cria as tabelas das apps do Django (sessões, auth, admin) e o usuário do benchmark"""
+    call_command('migrate', verbosity=0)
+    from django.contrib.auth.models import User
+    if not User.objects.filter(username=USUARIO).exists():
+        User.objects.create_superuser(USUARIO, 'benchmark@example.com', SENHA)
+
+
+def _da_sessao(sql):
+    return any(tabela in sql for tabela in _TABELAS_SESSAO)
+
+
+def medir(perfil, fluxos):
+    """
+    {nome do fluxo: (requisições, consultas, consultas de sessão)} com as
+    configurações do perfil (None = sessões no banco)
+    """
+    from django.conf import settings
+    configuracoes = settings.PERFIS_BAIXO_IO[perfil] if perfil else {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'MESSAGE_STORAGE': 'django.contrib.messages.storage.fallback.FallbackStorage',
+    }
+    resultados = {}
+    with override_settings(**configuracoes):
+        for nome, logado, requisicoes in fluxos:
+            # Versões novas: todo perfil faz as mesmas consultas nas DAOs, sem cache
+            for tabela in _TABELAS_CACHE:
+                versoes.incrementar(tabela)
+            cliente = Client(raise_request_exception=False)
+            if logado and not cliente.login(username=USUARIO, password=SENHA):
+                raise RuntimeError('Login do usuário do benchmark falhou')
+            consultas = []
+            for metodo, caminho, dados in requisicoes:
+                with orcamento.gravar() as gravacao:
+                    if metodo == 'POST':
+                        resposta = cliente.post(caminho, dados, follow=True)
+                    else:
+                        resposta = cliente.get(caminho, dados)
+                if resposta.status_code >= 400:
+                    raise RuntimeError(f'{nome}: {caminho} respondeu {resposta.status_code}')
+                consultas += [sql for sql, metodo_dao in gravacao.consultas]
+            # O POST segue o redirect: duas requisições
+            total = sum(2 if metodo == 'POST' else 1 for metodo, _, _ in requisicoes)
+            resultados[nome] = (total, len(consultas), sum(map(_da_sessao, consultas)))
+    return resultados
+
+
+def comparar(perfis):
+    """[(fluxo, requisições, {perfil: (consultas, consultas de sessão)})], perfil None primeiro"""
+    fluxos = _fluxos()
+    medicoes = {perfil: medir(perfil, fluxos) for perfil in [None, *perfis]}
+    return [
+        (nome, medicoes[None][nome][0], {perfil: medicao[nome][1:] for perfil, medicao in medicoes.items()})
+        for nome, _, _ in fluxos
+    ]
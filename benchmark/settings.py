@@ -0,0 +1,31 @@
+"""
+Configurações usadas pelo benchmark: as do projeto com o banco SQLite
+indicado em BENCHMARK_BANCO (e a réplica de leitura em BENCHMARK_REPLICA,
+se houver) e DEBUG desligado (com DEBUG o Django guarda todas as consultas
+na memória e distorce tempo e RSS).
+"""
+import os
+from pathlib import Path
+
+from loja_lingerie.settings import *  # noqa: F401,F403
+
+DEBUG = False
+# A gravação das consultas fica só no subcomando orcamentos
+ORCAMENTO_CONSULTAS = None
+# Um único processo serve as rotas (test client ou servidor threaded)
+VERSOES_PROCESSO_UNICO = True
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'benchmark.backend',
+        'NAME': os.environ.get('BENCHMARK_BANCO', 'benchmark.sqlite3'),
+        'OPTIONS': {'timeout': 30},
+    }
+}
+
+# Arquivos das tarefas em segundo plano ao lado do banco do benchmark
+TAREFAS_DIRETORIO = Path(DATABASES['default']['NAME']).resolve().parent / 'tarefas'
+
+if os.environ.get('BENCHMARK_REPLICA'):
+    DATABASES['replica'] = dict(DATABASES['default'], NAME=os.environ['BENCHMARK_REPLICA'])
+    BANCO_LEITURA = 'replica'
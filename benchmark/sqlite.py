@@ -0,0 +1,119 @@
+"""
+Banco SQLite equivalente ao loja_lingerie.sql, para rodar os benchmarks sem
+um servidor MySQL.
+
+O DDL do script é convertido por algumas regras (AUTO_INCREMENT, ENUM,
+índices declarados dentro do CREATE TABLE, os índices que o InnoDB cria
+para as chaves estrangeiras, ENGINE) e o DML da PARTE 2 roda
+como está, com NOW() e REGEXP_REPLACE registradas como funções. Assim o
+banco do benchmark acompanha o script sem uma cópia do esquema para manter.
+"""
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+SCRIPT = Path(__file__).resolve().parent.parent / 'loja_lingerie.sql'
+
+_IGNORAR = re.compile(r'^(DROP DATABASE|CREATE DATABASE|USE|SELECT)\b', re.IGNORECASE)
+_INDICE = re.compile(r'^(FULLTEXT\s+)?(INDEX|KEY)\s+(\w+)\s*(\(.*\))$', re.IGNORECASE)
+_UNICO = re.compile(r'^UNIQUE\s+KEY\s+(\w+)\s*(\(.*\))$', re.IGNORECASE)
+_TABELA = re.compile(r'^CREATE TABLE\s+(\w+)', re.IGNORECASE)
+_CHAVE_ESTRANGEIRA = re.compile(r'^FOREIGN KEY\s*\(([^)]*)\)', re.IGNORECASE)
+_CHAVE_PRIMARIA = re.compile(r'^PRIMARY KEY\s*\(([^)]*)\)', re.IGNORECASE)
+
+
+def registrar_funcoes(conexao):
+    """Funções do MySQL usadas pelo script e pelas DAOs"""
+    conexao.create_function('NOW', 0, lambda: datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    conexao.create_function(
+        'REGEXP_REPLACE', 3,
+        lambda texto, padrao, novo: None if texto is None else re.sub(padrao, novo, texto)
+    )
+
+
+def _comandos(script):
+    sem_comentarios = '\n'.join(
+        linha for linha in script.splitlines() if not linha.lstrip().startswith('--')
+    )
+    for comando in re.split(r';\s*\n', sem_comentarios):
+        comando = comando.strip().rstrip(';')
+        if comando and not _IGNORAR.match(comando):
+            yield comando
+
+
+def _converter_tabela(comando):
+    """CREATE TABLE do MySQL -> (CREATE TABLE do SQLite, CREATE INDEX separados)"""
+    tabela = _TABELA.match(comando).group(1)
+    cabecalho, corpo = comando.split('(', 1)
+    corpo = corpo.rsplit(')', 1)[0]
+    colunas, indices = [], []
+    # Colunas iniciais de cada índice e as das chaves estrangeiras
+    chaves, estrangeiras = [], []
+    for linha in corpo.split('\n'):
+        linha = linha.strip().rstrip(',')
+        if not linha:
+            continue
+        indice = _INDICE.match(linha)
+        if indice:
+            # FULLTEXT não existe no SQLite; a busca usa o índice de trigramas
+            if not indice.group(1):
+                indices.append(f'CREATE INDEX {indice.group(3)} ON {tabela} {indice.group(4)}')
+                chaves.append(_nomes_colunas(indice.group(4)))
+            continue
+        unico = _UNICO.match(linha)
+        if unico:
+            linha = f'CONSTRAINT {unico.group(1)} UNIQUE {unico.group(2)}'
+            chaves.append(_nomes_colunas(unico.group(2)))
+        elif _CHAVE_ESTRANGEIRA.match(linha):
+            estrangeiras.append(_nomes_colunas(_CHAVE_ESTRANGEIRA.match(linha).group(1)))
+        elif _CHAVE_PRIMARIA.match(linha):
+            chaves.append(_nomes_colunas(_CHAVE_PRIMARIA.match(linha).group(1)))
+        elif re.search(r'\b(PRIMARY KEY|UNIQUE)\b', linha):
+            chaves.append((linha.split()[0],))
+        linha = re.sub(r'\bINT AUTO_INCREMENT PRIMARY KEY\b', 'INTEGER PRIMARY KEY AUTOINCREMENT', linha)
+        linha = re.sub(r'\bENUM\([^)]*\)', 'TEXT', linha)
+        linha = re.sub(r'\s+ON UPDATE CURRENT_TIMESTAMP\b', '', linha)
+        colunas.append(linha)
+    # O InnoDB cria um índice para cada FOREIGN KEY que não é o começo de
+    # outro índice; o SQLite não, e os JOINs e filtros pela chave
+    # estrangeira leriam a tabela inteira
+    for estrangeira in estrangeiras:
+        if not any(chave[:len(estrangeira)] == estrangeira for chave in chaves):
+            indices.append(f"CREATE INDEX fk_{tabela}_{'_'.join(estrangeira)} ON {tabela} ({', '.join(estrangeira)})")
+            chaves.append(estrangeira)
+    return f"{cabecalho.strip()} (\n    " + ',\n    '.join(colunas) + '\n)', indices
+
+
+def _nomes_colunas(lista):
+    """'(a, b(10) DESC)' -> ('a', 'b')"""
+    return tuple(re.match(r'\w+', coluna.strip()).group(0) for coluna in lista.strip('() ').split(','))
+
+
+def converter(script):
+    """Lista de comandos SQLite equivalentes ao script MySQL (DDL e DML)"""
+    comandos = []
+    for comando in _comandos(script):
+        comando = re.sub(r'\)\s*ENGINE=\w+\s*$', ')', comando)
+        if _TABELA.match(comando):
+            tabela, indices = _converter_tabela(comando)
+            comandos.append(tabela)
+            comandos.extend(indices)
+        else:
+            comandos.append(comando)
+    return comandos
+
+
+def criar_banco(caminho, script=SCRIPT):
+    """Cria (ou recria) o banco SQLite com o esquema e os dados de loja_lingerie.sql"""
+    caminho = Path(caminho)
+    if caminho.exists():
+        caminho.unlink()
+    conexao = sqlite3.connect(caminho)
+    registrar_funcoes(conexao)
+    try:
+        for comando in converter(Path(script).read_text(encoding='utf-8')):
+            conexao.execute(comando)
+        conexao.commit()
+    finally:
+        conexao.close()
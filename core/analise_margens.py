@@ -0,0 +1,217 @@
+"""
+Análise de margens do catálogo inteiro com NumPy (dependência opcional).
+
+O catálogo é lido numa única consulta em streaming (ProdutoDAO.iterar_precos)
+para arrays de centavos, e as distribuições por marca/categoria e as
+simulações de reajuste são calculadas sem laço em Python por produto:
+agrupamentos por bincount e percentis por uma ordenação por valor e outra
+estável por grupo, com os índices de início de cada grupo.
+
+A margem segue Produto.calcular_margem: (venda - custo) / custo * 100, e 0
+quando o custo é zero. O reajuste simulado arredonda o preço em centavos
+como o UPDATE de ProdutoDAO.reajustar_precos.
+"""
+from datetime import datetime, timedelta
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .dao import CategoriaDAO, ProdutoDAO, VendaDAO
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependência opcional
+    np = None
+
+# Linhas por fetchmany: lotes maiores que os da exportação, o custo por lote é fixo
+TAMANHO_LOTE = 20000
+PERCENTIS = (10, 50, 90)
+SEM_MARCA = '(sem marca)'
+
+
+def _exigir_numpy():
+    if np is None:
+        raise ImproperlyConfigured('A análise de margens precisa do NumPy: pip install numpy')
+
+
+class Catalogo:
+    """Preços do catálogo em arrays paralelos (um elemento por produto, ordenados por id)"""
+
+    def __init__(self, ids, categorias, marcas, nomes_marcas, custo, venda):
+        self.ids = ids
+        self.categorias = categorias
+        self.marcas = marcas
+        self.nomes_marcas = nomes_marcas
+        self.custo = custo
+        self.venda = venda
+
+    def __len__(self):
+        return len(self.ids)
+
+    def indice_marca(self, marca):
+        """Código da marca nos arrays (-1 se não houver produto dela)"""
+        try:
+            return self.nomes_marcas.index(marca or SEM_MARCA)
+        except ValueError:
+            return -1
+
+
+def carregar_catalogo(apenas_ativos=True):
+    """Lê o catálogo numa consulta em streaming e monta os arrays"""
+    _exigir_numpy()
+    ids, categorias, marcas, custo, venda = [], [], [], [], []
+    codigos = {}
+    for lote in ProdutoDAO.iterar_precos(apenas_ativos, TAMANHO_LOTE):
+        colunas = list(zip(*lote))
+        ids.append(np.array(colunas[0], dtype=np.int64))
+        categorias.append(np.array(colunas[1], dtype=np.int64))
+        marcas.append(np.array([codigos.setdefault(m or SEM_MARCA, len(codigos)) for m in colunas[2]],
+                               dtype=np.int64))
+        custo.append(np.array(colunas[3], dtype=np.int64))
+        venda.append(np.array(colunas[4], dtype=np.int64))
+
+    def juntar(partes):
+        return np.concatenate(partes) if partes else np.empty(0, dtype=np.int64)
+    return Catalogo(juntar(ids), juntar(categorias), juntar(marcas), list(codigos),
+                    juntar(custo), juntar(venda))
+
+
+def carregar_volumes(catalogo, dias=90):
+    """Unidades vendidas de cada produto do catálogo nos últimos `dias` dias (array paralelo)"""
+    _exigir_numpy()
+    volumes = np.zeros(len(catalogo), dtype=np.float64)
+    linhas = VendaDAO.volumes_por_produto(datetime.now() - timedelta(days=dias))
+    if not linhas or not len(catalogo):
+        return volumes
+    ids, quantidades = (np.array(coluna, dtype=np.int64) for coluna in zip(*linhas))
+    posicoes = np.searchsorted(catalogo.ids, ids)
+    # Produtos vendidos que não estão no catálogo carregado (ex.: inativos) ficam de fora
+    validos = posicoes < len(catalogo)
+    validos[validos] &= catalogo.ids[posicoes[validos]] == ids[validos]
+    volumes[posicoes[validos]] = quantidades[validos]
+    return volumes
+
+
+# ============================================
+# MARGENS E DISTRIBUIÇÕES
+# ============================================
+
+def margens(custo, venda):
+    """Margem percentual de cada produto (0 quando o custo é zero)"""
+    custo = custo.astype(np.float64)
+    return np.divide((venda - custo) * 100.0, custo, out=np.zeros_like(custo), where=custo > 0)
+
+
+def _por_grupo(grupos, valores, pesos=None):
+    """
+    Estatísticas de `valores` por código de grupo: quantidade, média, média
+    ponderada por `pesos`, mínimo, máximo e PERCENTIS, todas vetorizadas.
+    """
+    # Códigos de grupo são inteiros pequenos (marca) ou ids (categoria): contagem direta
+    contagens_por_codigo = np.bincount(grupos)
+    presentes = np.flatnonzero(contagens_por_codigo)
+    contagens = contagens_por_codigo[presentes]
+    mapa = np.zeros(len(contagens_por_codigo), dtype=np.int64)
+    mapa[presentes] = np.arange(len(presentes))
+    densos = mapa[grupos]
+    medias = np.bincount(densos, weights=valores) / contagens
+    # Ordena por valor e depois, de forma estável (radix), por grupo: cada
+    # grupo vira uma faixa contígua e ordenada
+    ordem = np.argsort(valores)
+    ordenados = valores[ordem[np.argsort(densos[ordem], kind='stable')]]
+    inicios = np.concatenate(([0], np.cumsum(contagens)[:-1]))
+    resultado = {
+        'grupos': presentes,
+        'quantidade': contagens,
+        'media': medias,
+        'minimo': ordenados[inicios],
+        'maximo': ordenados[inicios + contagens - 1],
+    }
+    for p in PERCENTIS:
+        resultado[f'p{p}'] = ordenados[inicios + (contagens - 1) * p // 100]
+    if pesos is not None:
+        soma_pesos = np.bincount(densos, weights=pesos, minlength=len(presentes))
+        ponderada = np.bincount(densos, weights=valores * pesos, minlength=len(presentes))
+        resultado['media_ponderada'] = np.divide(ponderada, soma_pesos, out=np.full(len(presentes), np.nan),
+                                                 where=soma_pesos > 0)
+    return resultado
+
+
+def distribuicao(catalogo, por='marca', volumes=None):
+    """
+    Distribuição das margens por 'marca' ou 'categoria': lista de dicionários
+    com nome, quantidade de produtos, média, percentis, mínimo e máximo (e a
+    média ponderada pelas unidades vendidas, se houver volumes)
+    """
+    _exigir_numpy()
+    if not len(catalogo):
+        return []
+    if por == 'marca':
+        grupos = catalogo.marcas
+        nomes = dict(enumerate(catalogo.nomes_marcas))
+    elif por == 'categoria':
+        grupos = catalogo.categorias
+        nomes = {c.id_categoria: c.nome_categoria for c in CategoriaDAO.listar()}
+    else:
+        raise ValueError("Agrupe por 'marca' ou 'categoria'")
+    estatisticas = _por_grupo(grupos, margens(catalogo.custo, catalogo.venda), volumes)
+    linhas = []
+    for i, grupo in enumerate(estatisticas['grupos'].tolist()):
+        linha = {por: nomes.get(grupo, str(grupo))}
+        linha['quantidade'] = int(estatisticas['quantidade'][i])
+        for chave, valores in estatisticas.items():
+            if chave not in ('grupos', 'quantidade'):
+                # Sem vendas no período a média ponderada não existe (None no JSON)
+                linha[chave] = None if np.isnan(valores[i]) else round(float(valores[i]), 2)
+        linhas.append(linha)
+    return sorted(linhas, key=lambda linha: -linha['quantidade'])
+
+
+# ============================================
+# SIMULAÇÃO DE REAJUSTE
+# ============================================
+
+def _resumo(custo, venda, volumes):
+    """Margem média simples, margem ponderada por volume, unidades, receita e lucro bruto projetados (R$)"""
+    margem = margens(custo, venda)
+    unidades = volumes.sum()
+    receita = float(np.dot(volumes, venda))
+    lucro = float(np.dot(volumes, venda - custo))
+    return {
+        'margem_media': round(float(margem.mean()), 2) if len(margem) else 0.0,
+        'margem_ponderada': round(float(np.dot(volumes, margem) / unidades), 2) if unidades else 0.0,
+        'unidades': round(float(unidades), 1),
+        'receita': round(receita / 100, 2),
+        'lucro_bruto': round(lucro / 100, 2),
+    }
+
+
+def simular_reajuste(catalogo, volumes, percentual, marca=None, id_categoria=None, elasticidade=0.0):
+    """
+    E se o preço de venda dos produtos filtrados mudasse `percentual` %?
+
+    Compara margem média, margem ponderada pelas vendas e receita/lucro
+    projetados para o mesmo período dos volumes, antes e depois. Com
+    elasticidade > 0 o volume dos produtos reajustados varia na proporção
+    (1 + percentual/100) ** -elasticidade; com 0 o volume não muda.
+    """
+    _exigir_numpy()
+    if percentual <= -100:
+        raise ValueError('O reajuste deve ser um percentual maior que -100%')
+    afetados = np.ones(len(catalogo), dtype=bool)
+    if marca:
+        afetados &= catalogo.marcas == catalogo.indice_marca(marca)
+    if id_categoria:
+        afetados &= catalogo.categorias == int(id_categoria)
+    fator = 1 + float(percentual) / 100
+    # Centavos arredondados (meio para longe do zero), como o ROUND(..., 2) do banco
+    nova_venda = np.where(afetados, np.floor(catalogo.venda * fator + 0.5).astype(np.int64), catalogo.venda)
+    novos_volumes = np.where(afetados, volumes * fator ** -elasticidade, volumes) if elasticidade else volumes
+    antes = _resumo(catalogo.custo, catalogo.venda, volumes)
+    depois = _resumo(catalogo.custo, nova_venda, novos_volumes)
+    return {
+        'produtos_afetados': int(afetados.sum()),
+        'produtos_catalogo': len(catalogo),
+        'antes': antes,
+        'depois': depois,
+        'variacao': {chave: round(depois[chave] - antes[chave], 2) for chave in antes},
+    }
@@ -1,7 +1,30 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
     verbose_name = 'Sistema de Gestão'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from . import metricas, orcamento, roteamento
+        checks.register(verificar_versoes)
+        connection_created.connect(metricas.instalar_wrapper)
+        connection_created.connect(orcamento.instalar_wrapper)
+        connection_created.connect(roteamento.instalar_wrapper)
+
+
+def verificar_versoes(app_configs, **kwargs):
+    """Avisa quando os caches versionados e o ETag das listas estão desligados"""
+    from . import versoes
+    if versoes.compartilhadas():
+        return []
+    return [checks.Warning(
+        'As versões das tabelas estão num cache local do processo: caches versionados '
+        'e GET condicional das listas desligados.',
+        hint='Aponte CACHES[VERSOES_CACHE_ALIAS] para Redis/Memcached ou, com um só processo, '
+             'defina VERSOES_PROCESSO_UNICO = True.',
+        id='core.W001',
+    )]
@@ -0,0 +1,133 @@
+"""
+Índice invertido de trigramas para a busca textual de produtos.
+
+No MySQL a busca usa o índice FULLTEXT da tabela produtos; este índice em
+memória é o substituto para bancos sem FULLTEXT (ex.: SQLite em
+desenvolvimento e testes). Ele é reconstruído sob demanda quando a versão
+da tabela produtos muda (ver core.versoes) ou, se as versões não são
+compartilhadas entre os workers, depois de BUSCA_INDICE_TTL segundos.
+"""
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+
+from django.conf import settings
+
+from . import roteamento, versoes
+
+_NAO_ALFANUMERICO = re.compile(r'[^0-9a-z]+')
+
+# Fração mínima dos trigramas da busca que um produto precisa conter
+LIMIAR_SIMILARIDADE = 0.6
+
+
+def normalizar(texto):
+    """Remove acentos, caixa e pontuação: 'Sutiã Push-up' -> 'sutia push up'"""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return _NAO_ALFANUMERICO.sub(' ', texto.casefold()).strip()
+
+
+def palavras(texto):
+    return normalizar(texto).split()
+
+
+def _trigramas_documento(texto):
+    trigramas = set()
+    for palavra in palavras(texto):
+        palavra = f'  {palavra} '
+        trigramas.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return trigramas
+
+
+def _trigramas_busca(texto):
+    # Sem o espaço final, 'suti' também encontra 'sutia' (busca por prefixo/parcial)
+    trigramas = set()
+    for palavra in palavras(texto):
+        palavra = f'  {palavra}'
+        trigramas.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return trigramas
+
+
+class IndiceTrigramas:
+    """
+    Índice invertido trigrama -> ids dos documentos
+    """
+
+    def __init__(self):
+        self._postagens = defaultdict(set)
+        self._nomes = {}
+
+    def adicionar(self, id_documento, nome, *outros_campos):
+        self._nomes[id_documento] = normalizar(nome)
+        texto = ' '.join(campo for campo in (nome, *outros_campos) if campo)
+        for trigrama in _trigramas_documento(texto):
+            self._postagens[trigrama].add(id_documento)
+
+    def __len__(self):
+        return len(self._nomes)
+
+    def buscar(self, termo, limite=20):
+        """Retorna os ids mais relevantes para o termo, do melhor para o pior"""
+        trigramas = _trigramas_busca(termo)
+        if not trigramas:
+            return []
+        postagens = sorted((self._postagens.get(t, set()) for t in trigramas), key=len)
+        minimo = math.ceil(len(postagens) * LIMIAR_SIMILARIDADE)
+
+        # Quem tem ao menos `minimo` trigramas contém obrigatoriamente um dos
+        # (total - minimo + 1) mais raros: só eles geram candidatos.
+        candidatos = set().union(*postagens[:len(postagens) - minimo + 1])
+        termo_normalizado = normalizar(termo)
+        palavras_termo = set(termo_normalizado.split())
+        pontuados = []
+        for id_documento in candidatos:
+            acertos = sum(1 for ids in postagens if id_documento in ids)
+            if acertos < minimo:
+                continue
+            nome = self._nomes[id_documento]
+            # Desempate: palavras inteiras no nome, depois o termo como trecho do nome
+            pontuados.append((
+                -acertos,
+                -len(palavras_termo.intersection(nome.split())),
+                0 if termo_normalizado in nome else 1,
+                nome,
+                id_documento,
+            ))
+        pontuados.sort()
+        return [item[-1] for item in pontuados[:limite]]
+
+
+_indice = None
+_versao_indice = None
+_montado_em = 0.0
+_lock = threading.Lock()
+
+
+def indice_produtos(carregar):
+    """
+    Retorna o índice de produtos do processo, reconstruindo-o se a tabela
+    mudou. Sem versões compartilhadas entre os workers (a escrita pode ter
+    sido em outro processo) ele também é refeito a cada BUSCA_INDICE_TTL
+    segundos.
+
+    carregar() deve produzir lotes de linhas (id, nome, marca, descricao).
+    """
+    global _indice, _versao_indice, _montado_em
+    versao = versoes.versao('produtos')
+    compartilhadas = versoes.compartilhadas()
+    with _lock:
+        vencido = (not compartilhadas
+                   and time.monotonic() - _montado_em >= getattr(settings, 'BUSCA_INDICE_TTL', 5))
+        if _indice is None or _versao_indice != versao or vencido:
+            indice = IndiceTrigramas()
+            # Do principal: guardado sob a versão nova, não pode vir de réplica atrasada
+            with roteamento.no_principal():
+                for lote in carregar():
+                    for id_produto, nome, marca, descricao in lote:
+                        indice.adicionar(id_produto, nome, marca, descricao)
+            _indice, _versao_indice, _montado_em = indice, versao, time.monotonic()
+        return _indice
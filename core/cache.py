@@ -0,0 +1,128 @@
+"""
+Cache de leitura (read-through) versionado para as DAOs.
+
+O cache pode ficar na memória do processo (LRU) ou no framework de cache do
+Django. As chaves levam a versão da tabela (ver core.versoes), então as
+escritas da DAO invalidam tudo de uma vez apenas incrementando a versão.
+Sem versões compartilhadas entre os workers o cache não é usado. As
+leituras que preenchem o cache vão sempre ao banco principal: um valor lido
+de uma réplica atrasada ficaria guardado sob a versão nova da tabela.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import roteamento, versoes
+
+_AUSENTE = object()
+
+
+class CacheLRU:
+    """
+    Cache em memória do processo com limite de entradas e tempo de vida
+    """
+
+    def __init__(self, tamanho=256, ttl=300):
+        self.tamanho = tamanho
+        self.ttl = ttl
+        self._dados = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, chave, padrao=None):
+        with self._lock:
+            item = self._dados.get(chave)
+            if item is None:
+                return padrao
+            expira, valor = item
+            if expira < time.monotonic():
+                del self._dados[chave]
+                return padrao
+            self._dados.move_to_end(chave)
+            return valor
+
+    def set(self, chave, valor):
+        with self._lock:
+            self._dados[chave] = (time.monotonic() + self.ttl, valor)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.tamanho:
+                self._dados.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._dados.clear()
+
+
+class CacheDjango:
+    """
+    Adaptador para um alias de settings.CACHES
+    """
+
+    def __init__(self, alias='default', ttl=300):
+        self.alias = alias
+        self.ttl = ttl
+
+    def get(self, chave, padrao=None):
+        return caches[self.alias].get(chave, padrao)
+
+    def set(self, chave, valor):
+        caches[self.alias].set(chave, valor, self.ttl)
+
+    def clear(self):
+        caches[self.alias].clear()
+
+
+class CacheVersionado:
+    """
+    Cache read-through de uma tabela, invalidado pela versão da tabela
+    """
+
+    def __init__(self, tabela, backend):
+        self.tabela = tabela
+        self.backend = backend
+        self.acertos = 0
+        self.falhas = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def configurar(cls, tabela, nome_configuracao):
+        """Cria o cache a partir de um dicionário em settings (BACKEND, TAMANHO, TTL, ALIAS)"""
+        config = getattr(settings, nome_configuracao, {})
+        ttl = config.get('TTL', 300)
+        if config.get('BACKEND', 'lru') == 'django':
+            backend = CacheDjango(config.get('ALIAS', 'default'), ttl)
+        else:
+            backend = CacheLRU(config.get('TAMANHO', 256), ttl)
+        return cls(tabela, backend)
+
+    def obter(self, chave, carregar):
+        """Retorna o valor em cache ou chama carregar() e guarda o resultado"""
+        if not versoes.compartilhadas():
+            # Outro worker não saberia da escrita: nada é guardado
+            return carregar()
+        chave = f'{self.tabela}:{versoes.versao(self.tabela)}:{chave}'
+        valor = self.backend.get(chave, _AUSENTE)
+        if valor is not _AUSENTE:
+            with self._lock:
+                self.acertos += 1
+            return valor
+        with self._lock:
+            self.falhas += 1
+        with roteamento.no_principal():
+            valor = carregar()
+        self.backend.set(chave, valor)
+        return valor
+
+    def invalidar(self):
+        """Incrementa a versão da tabela quando a transação atual for confirmada"""
+        versoes.incrementar_no_commit(self.tabela)
+
+    def estatisticas(self):
+        total = self.acertos + self.falhas
+        return {
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'taxa_acerto': self.acertos / total if total else 0.0,
+        }
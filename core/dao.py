@@ -1,11 +1,185 @@
-from django.db import connection
+import re
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
 from .models import Categoria, Produto, Cliente
+from . import busca, metricas, paginacao, registros, versoes
+from .cache import CacheVersionado
+# Conexão do banco escolhido para o método em andamento (réplica nas leituras)
+from .roteamento import conexao as connection, leitura
+
+
+def _cursor_streaming():
+    """
+    Cursor que não carrega o resultado inteiro na memória do cliente.
+
+    No MySQL o cursor padrão armazena todas as linhas antes de devolver a
+    primeira; o SSCursor lê do servidor conforme o fetchmany avança.
+    """
+    if connection.vendor == 'mysql':
+        from MySQLdb.cursors import SSCursor
+        connection.ensure_connection()
+        return connection.connection.cursor(SSCursor)
+    return connection.cursor()
+
+
+def _iterar_consulta(sql, params=None, tamanho_lote=None):
+    """Gerador que produz o resultado da consulta em lotes de tamanho fixo"""
+    if tamanho_lote is None:
+        tamanho_lote = getattr(settings, 'EXPORTACAO_TAMANHO_LOTE', 1000)
+    cursor = _cursor_streaming()
+    try:
+        if connection.vendor == 'mysql':
+            # O SSCursor é do driver e não passa pelos execute_wrappers do Django
+            metricas.medir(cursor.execute, sql, params or [])
+        else:
+            cursor.execute(sql, params or [])
+        while True:
+            lote = cursor.fetchmany(tamanho_lote)
+            if not lote:
+                break
+            metricas.contar_linhas(len(lote))
+            yield lote
+    finally:
+        cursor.close()
+
+
+def _termo_fulltext(termo):
+    """
+    Converte o texto digitado numa busca booleana do FULLTEXT do MySQL:
+    cada palavra vira obrigatória e com prefixo ('sutia push' -> '+sutia* +push*').
+    Palavras menores que innodb_ft_min_token_size (3) seriam ignoradas pelo
+    índice e por isso não entram na busca.
+    """
+    termos = [palavra for palavra in re.findall(r'\w+', termo or '') if len(palavra) >= 3]
+    return ' '.join(f'+{palavra}*' for palavra in termos)
+
+
+def _executar_em_lote(sql, params, ids):
+    """
+    Executa um comando com "IN ({})" preenchido pelos ids, num único
+    statement. Retorna o número de linhas afetadas.
+    """
+    # Ordenados: transações concorrentes travam as linhas na mesma ordem
+    ids = sorted({int(i) for i in ids})
+    if not ids:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(sql.format(', '.join(['%s'] * len(ids))), list(params) + ids)
+        return cursor.rowcount
+
+
+def _selecionar_colunas(permitidas, campos=None, obrigatorias=()):
+    """
+    Colunas de uma consulta com campos esparsos, na ordem de `permitidas`.
+    As obrigatórias (chaves do cursor e do registro) entram sempre; um campo
+    fora de `permitidas` lança ValueError.
+    """
+    if not campos:
+        return tuple(permitidas)
+    desconhecidos = set(campos) - set(permitidas)
+    if desconhecidos:
+        raise ValueError(f"Campos inválidos: {', '.join(sorted(desconhecidos))}")
+    pedidos = set(campos) | set(obrigatorias)
+    return tuple(coluna for coluna in permitidas if coluna in pedidos)
+
+
+def _buscar_muitos(colunas, tabela, coluna_id, ids):
+    """
+    Registros de vários ids, ordenados por id, com uma consulta IN a cada
+    BUSCA_LOTE_IDS ids (listas enormes não estouram o limite de parâmetros)
+    """
+    ids = sorted({int(i) for i in ids})
+    tamanho = getattr(settings, 'BUSCA_LOTE_IDS', 1000)
+    resultado = []
+    with connection.cursor() as cursor:
+        for inicio in range(0, len(ids), tamanho):
+            lote = ids[inicio:inicio + tamanho]
+            cursor.execute(
+                f"SELECT {', '.join(colunas)} FROM {tabela} "
+                f"WHERE {coluna_id} IN ({', '.join(['%s'] * len(lote))}) ORDER BY {coluna_id}",
+                lote
+            )
+            resultado += registros.mapear_linhas(cursor)
+    return resultado
 
+
+def _listar_pagina(colunas, tabela, coluna_nome, coluna_id,
+                   apos=None, antes=None, limite=None, contar_total=None):
+    """
+    Consulta paginada por cursor (keyset) ordenada por (coluna_nome, coluna_id).
+
+    Em vez de OFFSET, a página parte da chave do cursor recebido, então o
+    custo de qualquer página é o mesmo da primeira. Busca limite + 1 linhas
+    para saber se existe uma página seguinte sem precisar de outra consulta.
+    """
+    limite = paginacao.normalizar_limite(limite)
+    if contar_total is None:
+        contar_total = paginacao.contar_total_padrao()
+
+    sql = f"SELECT {colunas} FROM {tabela}"
+    params = []
+    if antes:
+        nome, id_registro = paginacao.decodificar_cursor(antes)
+        sql += f"""
+            WHERE {coluna_nome} < %s OR ({coluna_nome} = %s AND {coluna_id} < %s)
+            ORDER BY {coluna_nome} DESC, {coluna_id} DESC
+        """
+        params += [nome, nome, id_registro]
+    elif apos:
+        nome, id_registro = paginacao.decodificar_cursor(apos)
+        sql += f"""
+            WHERE {coluna_nome} > %s OR ({coluna_nome} = %s AND {coluna_id} > %s)
+            ORDER BY {coluna_nome}, {coluna_id}
+        """
+        params += [nome, nome, id_registro]
+    else:
+        sql += f" ORDER BY {coluna_nome}, {coluna_id}"
+    sql += " LIMIT %s"
+    params.append(limite + 1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        itens = registros.mapear_linhas(cursor)
+
+        total = None
+        if contar_total:
+            cursor.execute(f"SELECT COUNT(*) FROM {tabela}")
+            total = cursor.fetchone()[0]
+
+    tem_mais = len(itens) > limite
+    del itens[limite:]
+    if antes:
+        itens.reverse()
+
+    def cursor_de(item):
+        return paginacao.codificar_cursor(item[coluna_nome], item[coluna_id])
+
+    proximo = anterior = None
+    if itens:
+        if antes:
+            proximo = cursor_de(itens[-1])
+            anterior = cursor_de(itens[0]) if tem_mais else None
+        else:
+            proximo = cursor_de(itens[-1]) if tem_mais else None
+            anterior = cursor_de(itens[0]) if apos else None
+
+    return paginacao.Pagina(itens, limite, proximo, anterior, total)
+
+
+@metricas.rotular_dao
 class CategoriaDAO:
     """
     Data Access Object para operações SQL da entidade Categoria
+    
+    As leituras passam por um cache versionado (settings.CACHE_CATEGORIAS);
+    criar, atualizar e deletar incrementam a versão e invalidam o cache.
     """
     
+    cache = CacheVersionado.configurar('categorias', 'CACHE_CATEGORIAS')
+    
     @staticmethod
     def criar(nome_categoria, descricao='', ativo=True):
         """Cria uma nova categoria no banco"""
@@ -17,39 +191,73 @@ class CategoriaDAO:
                 """,
                 [nome_categoria, descricao, ativo]
             )
+            CategoriaDAO.cache.invalidar()
             return cursor.lastrowid
     
     @staticmethod
+    @leitura
     def listar():
         """Retorna todas as categorias"""
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT id_categoria, nome_categoria, descricao, ativo
-                FROM categorias
-                ORDER BY nome_categoria
-                """
+        def carregar():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id_categoria, nome_categoria, descricao, ativo
+                    FROM categorias
+                    ORDER BY nome_categoria
+                    """
+                )
+                return registros.mapear_linhas(cursor)
+        
+        return CategoriaDAO.cache.obter('listar', carregar)
+    
+    COLUNAS_API = ('id_categoria', 'nome_categoria', 'descricao', 'ativo')
+    
+    @staticmethod
+    @leitura
+    def listar_pagina(apos=None, antes=None, limite=None, contar_total=None, campos=None):
+        """
+        Retorna uma página de categorias ordenadas por nome (paginação por cursor).
+        `campos` restringe as colunas a um subconjunto de COLUNAS_API.
+        """
+        colunas = _selecionar_colunas(CategoriaDAO.COLUNAS_API, campos, ('id_categoria', 'nome_categoria'))
+        
+        def carregar():
+            return _listar_pagina(
+                ', '.join(colunas), 'categorias', 'nome_categoria', 'id_categoria',
+                apos, antes, limite, contar_total
             )
-            columns = [col[0] for col in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+        
+        return CategoriaDAO.cache.obter(
+            f"pagina:{apos}:{antes}:{limite}:{contar_total}:{','.join(colunas)}", carregar
+        )
     
     @staticmethod
+    @leitura
+    def buscar_muitos(ids, campos=None):
+        """Busca várias categorias por ID (ordenadas por id; ids inexistentes ficam de fora)"""
+        return _buscar_muitos(
+            _selecionar_colunas(CategoriaDAO.COLUNAS_API, campos, ('id_categoria',)),
+            'categorias', 'id_categoria', ids
+        )
+    
+    @staticmethod
+    @leitura
     def buscar(id_categoria):
         """Busca uma categoria específica por ID"""
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT id_categoria, nome_categoria, descricao, ativo
-                FROM categorias
-                WHERE id_categoria = %s
-                """,
-                [id_categoria]
-            )
-            row = cursor.fetchone()
-            if row:
-                columns = [col[0] for col in cursor.description]
-                return dict(zip(columns, row))
-            return None
+        def carregar():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id_categoria, nome_categoria, descricao, ativo
+                    FROM categorias
+                    WHERE id_categoria = %s
+                    """,
+                    [id_categoria]
+                )
+                return registros.mapear_linha(cursor, cursor.fetchone())
+        
+        return CategoriaDAO.cache.obter(f'buscar:{id_categoria}', carregar)
     
     @staticmethod
     def atualizar(id_categoria, nome_categoria, descricao='', ativo=True):
@@ -63,6 +271,7 @@ class CategoriaDAO:
                 """,
                 [nome_categoria, descricao, ativo, id_categoria]
             )
+            CategoriaDAO.cache.invalidar()
             return cursor.rowcount > 0
     
     @staticmethod
@@ -73,9 +282,25 @@ class CategoriaDAO:
                 "DELETE FROM categorias WHERE id_categoria = %s",
                 [id_categoria]
             )
+            CategoriaDAO.cache.invalidar()
             return cursor.rowcount > 0
+    
+    @staticmethod
+    def definir_ativo_em_lote(ids, ativo):
+        """Ativa ou desativa várias categorias num único UPDATE"""
+        alteradas = _executar_em_lote('UPDATE categorias SET ativo = %s WHERE id_categoria IN ({})', [ativo], ids)
+        CategoriaDAO.cache.invalidar()
+        return alteradas
+    
+    @staticmethod
+    def deletar_em_lote(ids):
+        """Remove várias categorias num único DELETE"""
+        removidas = _executar_em_lote('DELETE FROM categorias WHERE id_categoria IN ({})', [], ids)
+        CategoriaDAO.cache.invalidar()
+        return removidas
 
 
+@metricas.rotular_dao
 class ProdutoDAO:
     """
     Data Access Object para operações SQL da entidade Produto
@@ -96,9 +321,31 @@ class ProdutoDAO:
                 """,
                 [nome_produto, marca, preco_custo, preco_venda, ativo]
             )
+            versoes.incrementar_no_commit('produtos')
             return cursor.lastrowid
     
     @staticmethod
+    def criar_em_lote(produtos):
+        """Insere vários produtos de uma vez (executemany gera um INSERT multi-linha)"""
+        with connection.cursor() as cursor:
+            # O driver só junta as linhas num único INSERT quando o VALUES tem
+            # apenas marcadores %s; data_cadastro fica com o DEFAULT da tabela.
+            cursor.executemany(
+                """
+                INSERT INTO produtos (nome_produto, marca, preco_custo, preco_venda, 
+                                     ativo, id_categoria, id_fornecedor)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                """,
+                [
+                    [p['nome_produto'], p['marca'], p['preco_custo'], p['preco_venda'], p['ativo'], 1, 1]
+                    for p in produtos
+                ]
+            )
+            versoes.incrementar_no_commit('produtos')
+            return cursor.rowcount
+    
+    @staticmethod
+    @leitura
     def listar():
         """Retorna todos os produtos"""
         with connection.cursor() as cursor:
@@ -110,10 +357,80 @@ class ProdutoDAO:
                 ORDER BY nome_produto
                 """
             )
-            columns = [col[0] for col in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            return registros.mapear_linhas(cursor)
+    
+    COLUNAS_API = (
+        'id_produto', 'id_categoria', 'nome_produto', 'marca', 'preco_custo', 'preco_venda',
+        'margem_lucro', 'ativo',
+    )
+    
+    @staticmethod
+    @leitura
+    def listar_pagina(apos=None, antes=None, limite=None, contar_total=None, campos=None):
+        """
+        Retorna uma página de produtos ordenados por nome (paginação por cursor).
+        `campos` restringe as colunas a um subconjunto de COLUNAS_API.
+        """
+        colunas = 'id_produto, nome_produto, marca, preco_custo, preco_venda, ativo, margem_lucro'
+        if campos:
+            colunas = ', '.join(_selecionar_colunas(ProdutoDAO.COLUNAS_API, campos, ('id_produto', 'nome_produto')))
+        return _listar_pagina(
+            colunas, 'produtos', 'nome_produto', 'id_produto',
+            apos, antes, limite, contar_total
+        )
+    
+    @staticmethod
+    @leitura
+    def buscar_muitos(ids, campos=None):
+        """Busca vários produtos por ID (ordenados por id; ids inexistentes ficam de fora)"""
+        return _buscar_muitos(
+            _selecionar_colunas(ProdutoDAO.COLUNAS_API, campos, ('id_produto',)),
+            'produtos', 'id_produto', ids
+        )
+    
+    COLUNAS_EXPORTACAO = (
+        'id_produto', 'nome_produto', 'marca', 'preco_custo', 'preco_venda',
+        'margem_lucro', 'ativo',
+    )
+    
+    @staticmethod
+    @leitura
+    def iterar(tamanho_lote=None):
+        """Percorre todos os produtos em lotes, sem carregar a tabela na memória"""
+        return _iterar_consulta(
+            f"SELECT {', '.join(ProdutoDAO.COLUNAS_EXPORTACAO)} FROM produtos ORDER BY id_produto",
+            tamanho_lote=tamanho_lote
+        )
+    
+    @staticmethod
+    @leitura
+    def contar():
+        """Total de produtos (o que iterar percorre), para o progresso das exportações"""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM produtos")
+            return cursor.fetchone()[0]
     
     @staticmethod
+    @leitura
+    def iterar_precos(apenas_ativos=True, tamanho_lote=None):
+        """
+        Percorre (id_produto, id_categoria, marca, custo, venda) de todo o
+        catálogo em lotes, com os preços em centavos inteiros (conversão
+        barata para arrays; ver core.analise_margens)
+        """
+        return _iterar_consulta(
+            f"""
+            SELECT id_produto, id_categoria, marca,
+                   CAST(ROUND(preco_custo * 100) AS SIGNED), CAST(ROUND(preco_venda * 100) AS SIGNED)
+            FROM produtos
+            {'WHERE ativo = TRUE' if apenas_ativos else ''}
+            ORDER BY id_produto
+            """,
+            tamanho_lote=tamanho_lote
+        )
+    
+    @staticmethod
+    @leitura
     def buscar(id_produto):
         """Busca um produto específico por ID"""
         with connection.cursor() as cursor:
@@ -126,11 +443,55 @@ class ProdutoDAO:
                 """,
                 [id_produto]
             )
-            row = cursor.fetchone()
-            if row:
-                columns = [col[0] for col in cursor.description]
-                return dict(zip(columns, row))
-            return None
+            return registros.mapear_linha(cursor, cursor.fetchone())
+    
+    @staticmethod
+    @leitura
+    def buscar_texto(termo, limite=20):
+        """
+        Busca produtos por nome, marca ou descrição, ignorando acentos e caixa,
+        ordenados por relevância
+        """
+        limite = max(1, min(int(limite), 100))
+        if connection.vendor == 'mysql':
+            termo_booleano = _termo_fulltext(termo)
+            if not termo_booleano:
+                return []
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT id_produto, nome_produto, marca, preco_custo, preco_venda,
+                           ativo, margem_lucro,
+                           MATCH(nome_produto, marca, descricao)
+                               AGAINST (%s IN BOOLEAN MODE) AS relevancia
+                    FROM produtos
+                    WHERE MATCH(nome_produto, marca, descricao) AGAINST (%s IN BOOLEAN MODE)
+                    ORDER BY relevancia DESC, nome_produto
+                    LIMIT %s
+                    """,
+                    [termo_booleano, termo_booleano, limite]
+                )
+                return registros.mapear_linhas(cursor)
+        
+        # Bancos sem FULLTEXT: índice de trigramas em memória
+        indice = busca.indice_produtos(lambda: _iterar_consulta(
+            "SELECT id_produto, nome_produto, marca, descricao FROM produtos"
+        ))
+        ids = indice.buscar(termo, limite)
+        if not ids:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT id_produto, nome_produto, marca, preco_custo, preco_venda,
+                       ativo, margem_lucro
+                FROM produtos
+                WHERE id_produto IN ({', '.join(['%s'] * len(ids))})
+                """,
+                ids
+            )
+            por_id = {produto['id_produto']: produto for produto in registros.mapear_linhas(cursor)}
+        return [por_id[i] for i in ids if i in por_id]
     
     @staticmethod
     def atualizar(id_produto, nome_produto, marca, preco_custo, preco_venda, ativo=True):
@@ -145,6 +506,7 @@ class ProdutoDAO:
                 """,
                 [nome_produto, marca, preco_custo, preco_venda, ativo, id_produto]
             )
+            versoes.incrementar_no_commit('produtos')
             return cursor.rowcount > 0
     
     @staticmethod
@@ -155,9 +517,66 @@ class ProdutoDAO:
                 "DELETE FROM produtos WHERE id_produto = %s",
                 [id_produto]
             )
+            versoes.incrementar_no_commit('produtos')
             return cursor.rowcount > 0
+    
+    @staticmethod
+    def definir_ativo_em_lote(ids, ativo):
+        """Ativa ou desativa vários produtos num único UPDATE"""
+        alterados = _executar_em_lote('UPDATE produtos SET ativo = %s WHERE id_produto IN ({})', [ativo], ids)
+        versoes.incrementar_no_commit('produtos')
+        return alterados
+    
+    @staticmethod
+    def deletar_em_lote(ids):
+        """Remove vários produtos num único DELETE"""
+        removidos = _executar_em_lote('DELETE FROM produtos WHERE id_produto IN ({})', [], ids)
+        versoes.incrementar_no_commit('produtos')
+        return removidos
+    
+    @staticmethod
+    @leitura
+    def listar_marcas():
+        """Marcas cadastradas, para os filtros de reajuste"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT DISTINCT marca FROM produtos WHERE marca IS NOT NULL AND marca <> '' ORDER BY marca"
+            )
+            return [row[0] for row in cursor.fetchall()]
+    
+    @staticmethod
+    def reajustar_precos(percentual, marca=None, id_categoria=None):
+        """
+        Reajusta em `percentual` % o preço de venda dos produtos da marca e/ou
+        categoria num único UPDATE (margem_lucro é recalculada pelo banco).
+        Retorna o número de produtos alterados.
+        """
+        percentual = Decimal(str(percentual))
+        if not percentual.is_finite() or percentual <= -100:
+            raise ValueError('O reajuste deve ser um percentual maior que -100%')
+        filtros, params = [], [percentual]
+        if marca:
+            filtros.append('marca = %s')
+            params.append(marca)
+        if id_categoria:
+            filtros.append('id_categoria = %s')
+            params.append(int(id_categoria))
+        if not filtros:
+            raise ValueError('Informe a marca ou a categoria do reajuste')
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE produtos
+                SET preco_venda = ROUND(preco_venda * (100 + %s) / 100, 2)
+                WHERE {' AND '.join(filtros)}
+                """,
+                params
+            )
+            versoes.incrementar_no_commit('produtos')
+            return cursor.rowcount
 
 
+@metricas.rotular_dao
 class ClienteDAO:
     """
     Data Access Object para operações SQL da entidade Cliente
@@ -169,14 +588,35 @@ class ClienteDAO:
         with connection.cursor() as cursor:
             cursor.execute(
                 """
-                INSERT INTO clientes (nome_cliente, cpf, email, telefone, ativo, data_cadastro)
-                VALUES (%s, %s, %s, %s, %s, NOW())
+                INSERT INTO clientes (nome_cliente, cpf, cpf_numerico, email, telefone, ativo, data_cadastro)
+                VALUES (%s, %s, %s, %s, %s, %s, NOW())
                 """,
-                [nome_cliente, cpf, email if email else None, telefone if telefone else None, ativo]
+                [nome_cliente, cpf, Cliente.normalizar_cpf(cpf), email if email else None, telefone if telefone else None, ativo]
             )
+            versoes.incrementar_no_commit('clientes')
             return cursor.lastrowid
     
     @staticmethod
+    def criar_em_lote(clientes):
+        """Insere vários clientes de uma vez (executemany gera um INSERT multi-linha)"""
+        with connection.cursor() as cursor:
+            # Só marcadores %s no VALUES, para o driver gerar um INSERT multi-linha
+            cursor.executemany(
+                """
+                INSERT INTO clientes (nome_cliente, cpf, cpf_numerico, email, telefone, ativo)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                [
+                    [c['nome_cliente'], c['cpf'], Cliente.normalizar_cpf(c['cpf']),
+                     c['email'] or None, c['telefone'] or None, c['ativo']]
+                    for c in clientes
+                ]
+            )
+            versoes.incrementar_no_commit('clientes')
+            return cursor.rowcount
+    
+    @staticmethod
+    @leitura
     def listar():
         """Retorna todos os clientes"""
         with connection.cursor() as cursor:
@@ -187,10 +627,52 @@ class ClienteDAO:
                 ORDER BY nome_cliente
                 """
             )
-            columns = [col[0] for col in cursor.description]
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            return registros.mapear_linhas(cursor)
+    
+    COLUNAS_EXPORTACAO = ('id_cliente', 'nome_cliente', 'cpf', 'email', 'telefone', 'ativo')
+    COLUNAS_API = COLUNAS_EXPORTACAO
     
     @staticmethod
+    @leitura
+    def listar_pagina(apos=None, antes=None, limite=None, contar_total=None, campos=None):
+        """
+        Retorna uma página de clientes ordenados por nome (paginação por cursor).
+        `campos` restringe as colunas a um subconjunto de COLUNAS_API.
+        """
+        colunas = _selecionar_colunas(ClienteDAO.COLUNAS_API, campos, ('id_cliente', 'nome_cliente'))
+        return _listar_pagina(
+            ', '.join(colunas), 'clientes', 'nome_cliente', 'id_cliente',
+            apos, antes, limite, contar_total
+        )
+    
+    @staticmethod
+    @leitura
+    def buscar_muitos(ids, campos=None):
+        """Busca vários clientes por ID (ordenados por id; ids inexistentes ficam de fora)"""
+        return _buscar_muitos(
+            _selecionar_colunas(ClienteDAO.COLUNAS_API, campos, ('id_cliente',)),
+            'clientes', 'id_cliente', ids
+        )
+    
+    @staticmethod
+    @leitura
+    def iterar(tamanho_lote=None):
+        """Percorre todos os clientes em lotes, sem carregar a tabela na memória"""
+        return _iterar_consulta(
+            f"SELECT {', '.join(ClienteDAO.COLUNAS_EXPORTACAO)} FROM clientes ORDER BY id_cliente",
+            tamanho_lote=tamanho_lote
+        )
+    
+    @staticmethod
+    @leitura
+    def contar():
+        """Total de clientes (o que iterar percorre), para o progresso das exportações"""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM clientes")
+            return cursor.fetchone()[0]
+    
+    @staticmethod
+    @leitura
     def buscar(id_cliente):
         """Busca um cliente específico por ID"""
         with connection.cursor() as cursor:
@@ -202,11 +684,7 @@ class ClienteDAO:
                 """,
                 [id_cliente]
             )
-            row = cursor.fetchone()
-            if row:
-                columns = [col[0] for col in cursor.description]
-                return dict(zip(columns, row))
-            return None
+            return registros.mapear_linha(cursor, cursor.fetchone())
     
     @staticmethod
     def atualizar(id_cliente, nome_cliente, cpf, email='', telefone='', ativo=True):
@@ -215,11 +693,12 @@ class ClienteDAO:
             cursor.execute(
                 """
                 UPDATE clientes
-                SET nome_cliente = %s, cpf = %s, email = %s, telefone = %s, ativo = %s
+                SET nome_cliente = %s, cpf = %s, cpf_numerico = %s, email = %s, telefone = %s, ativo = %s
                 WHERE id_cliente = %s
                 """,
-                [nome_cliente, cpf, email if email else None, telefone if telefone else None, ativo, id_cliente]
+                [nome_cliente, cpf, Cliente.normalizar_cpf(cpf), email if email else None, telefone if telefone else None, ativo, id_cliente]
             )
+            versoes.incrementar_no_commit('clientes')
             return cursor.rowcount > 0
     
     @staticmethod
@@ -230,22 +709,1015 @@ class ClienteDAO:
                 "DELETE FROM clientes WHERE id_cliente = %s",
                 [id_cliente]
             )
+            versoes.incrementar_no_commit('clientes')
             return cursor.rowcount > 0
     
+    @staticmethod
+    def definir_ativo_em_lote(ids, ativo):
+        """Ativa ou desativa vários clientes num único UPDATE"""
+        alterados = _executar_em_lote('UPDATE clientes SET ativo = %s WHERE id_cliente IN ({})', [ativo], ids)
+        versoes.incrementar_no_commit('clientes')
+        return alterados
+    
+    @staticmethod
+    def deletar_em_lote(ids):
+        """Remove vários clientes num único DELETE"""
+        removidos = _executar_em_lote('DELETE FROM clientes WHERE id_cliente IN ({})', [], ids)
+        versoes.incrementar_no_commit('clientes')
+        return removidos
+    
     @staticmethod
     def buscar_por_cpf(cpf):
-        """Busca um cliente pelo CPF"""
+        """Busca um cliente pelo CPF (com ou sem pontuação)"""
         with connection.cursor() as cursor:
             cursor.execute(
                 """
                 SELECT id_cliente, nome_cliente, cpf, email, telefone, ativo
                 FROM clientes
-                WHERE cpf = %s
+                WHERE cpf_numerico = %s
+                """,
+                [Cliente.normalizar_cpf(cpf)]
+            )
+            return registros.mapear_linha(cursor, cursor.fetchone())
+    
+    @staticmethod
+    def buscar_por_cpfs(cpfs):
+        """
+        Busca vários clientes pelo CPF numa única consulta.
+        Retorna um dicionário {cpf somente dígitos: cliente} com os encontrados.
+        """
+        cpfs = list({Cliente.normalizar_cpf(cpf) for cpf in cpfs})
+        if not cpfs:
+            return {}
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT id_cliente, nome_cliente, cpf, cpf_numerico, email, telefone, ativo
+                FROM clientes
+                WHERE cpf_numerico IN ({', '.join(['%s'] * len(cpfs))})
+                """,
+                cpfs
+            )
+            return {cliente['cpf_numerico']: cliente for cliente in registros.mapear_linhas(cursor)}
+    
+    @staticmethod
+    @leitura
+    def autocompletar(prefixo, limite=10):
+        """Clientes cujo nome começa com o prefixo, em ordem alfabética (usa idx_clientes_nome)"""
+        prefixo = prefixo.replace('!', '!!').replace('%', '!%').replace('_', '!_')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id_cliente, nome_cliente, cpf
+                FROM clientes
+                WHERE nome_cliente LIKE %s ESCAPE '!'
+                ORDER BY nome_cliente, id_cliente
+                LIMIT %s
+                """,
+                [prefixo + '%', limite]
+            )
+            return registros.mapear_linhas(cursor)
+
+
+@metricas.rotular_dao
+class EstoqueDAO:
+    """
+    Data Access Object para operações SQL da entidade Estoque
+    
+    estoque_baixo é uma coluna gerada (quantidade <= estoque_minimo) com
+    índice próprio: as consultas de estoque baixo não leem a tabela inteira.
+    """
+    
+    COLUNAS_GRADE = ('id_estoque', 'id_produto', 'tamanho', 'cor', 'quantidade', 'estoque_minimo', 'estoque_baixo')
+    
+    @staticmethod
+    @leitura
+    def listar_por_produtos(ids_produtos):
+        """Todas as variações dos produtos informados, numa consulta (ordenadas por produto)"""
+        return _buscar_muitos(EstoqueDAO.COLUNAS_GRADE, 'estoque', 'id_produto', ids_produtos)
+    
+    @staticmethod
+    @leitura
+    def contar_estoque_baixo():
+        """Quantidade de variações com estoque no mínimo ou abaixo dele"""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM estoque WHERE estoque_baixo = TRUE")
+            return cursor.fetchone()[0]
+    
+    @staticmethod
+    @leitura
+    def listar_estoque_baixo(limite=None):
+        """Variações no mínimo ou abaixo dele, das menores quantidades para as maiores"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT e.id_estoque, e.id_produto, p.nome_produto, p.marca, e.tamanho, e.cor,
+                       e.quantidade, e.estoque_minimo
+                FROM estoque e
+                INNER JOIN produtos p ON p.id_produto = e.id_produto
+                WHERE e.estoque_baixo = TRUE
+                ORDER BY e.quantidade, e.id_estoque
+                LIMIT %s
+                """,
+                [paginacao.normalizar_limite(limite)]
+            )
+            return registros.mapear_linhas(cursor)
+
+
+class VendaInvalida(ValueError):
+    """Carrinho ou dados da venda inválidos"""
+
+
+class CompraInvalida(ValueError):
+    """Itens ou situação da compra inválidos"""
+
+
+class EstoqueInsuficiente(Exception):
+    """Um dos itens do carrinho não tem quantidade suficiente em estoque"""
+    
+    def __init__(self, id_estoque=None, disponivel=None, pedido=None):
+        if id_estoque is None:
+            mensagem = 'Estoque insuficiente para um dos itens do carrinho'
+        else:
+            mensagem = (f'Estoque insuficiente para o item {id_estoque}: '
+                        f'disponível {disponivel}, pedido {pedido}')
+        super().__init__(mensagem)
+        self.id_estoque = id_estoque
+        self.disponivel = disponivel
+        self.pedido = pedido
+
+
+def _quantidade(valor, erro):
+    """Quantidade inteira e positiva; lança erro(mensagem) para 1.7, '2,5', NaN..."""
+    try:
+        numero = Decimal(str(valor))
+    except InvalidOperation:
+        raise erro('Quantidade inválida')
+    if not numero.is_finite() or numero != numero.to_integral_value():
+        raise erro('Quantidade deve ser um número inteiro')
+    if numero <= 0:
+        raise erro('Quantidade deve ser maior que zero')
+    return int(numero)
+
+
+def _sufixo_for_update(tabela=None):
+    """FOR UPDATE (restrito à tabela, se o banco suportar) ou nada em bancos sem bloqueio de linha"""
+    features = connection.features
+    if tabela and features.has_select_for_update_of:
+        return f' FOR UPDATE OF {tabela}'
+    if features.has_select_for_update:
+        return ' FOR UPDATE'
+    return ''
+
+
+def _clausula_somando(tabela, chaves, colunas):
+    """Cláusula do upsert que soma os valores novos aos das chaves já existentes"""
+    if connection.vendor == 'mysql':
+        # Qualificado pela tabela: num INSERT ... SELECT a coluna pode existir também na origem
+        return ' ON DUPLICATE KEY UPDATE ' + ', '.join(
+            f'{tabela}.{c} = {tabela}.{c} + VALUES({c})' for c in colunas
+        )
+    return (f" ON CONFLICT ({', '.join(chaves)}) DO UPDATE SET "
+            + ', '.join(f'{c} = {c} + excluded.{c}' for c in colunas))
+
+
+def _upsert_somando(cursor, tabela, chaves, colunas, linhas):
+    """
+    INSERT multi-linha que, para chaves já existentes, soma os valores nas
+    colunas (ON DUPLICATE KEY UPDATE no MySQL, ON CONFLICT nos demais).
+    Cada linha traz os valores das chaves seguidos dos das colunas.
+    """
+    if not linhas:
+        return
+    todas = list(chaves) + list(colunas)
+    sql = f"INSERT INTO {tabela} ({', '.join(todas)}) VALUES ({', '.join(['%s'] * len(todas))})"
+    cursor.executemany(sql + _clausula_somando(tabela, chaves, colunas), linhas)
+
+
+def _upsert_somando_consulta(cursor, tabela, chaves, colunas, consulta, params):
+    """
+    Como _upsert_somando, mas com as linhas produzidas por um SELECT no
+    próprio banco: um único INSERT ... SELECT, sem trazer as linhas para a
+    aplicação. A consulta vai numa tabela derivada: no MySQL o ON DUPLICATE
+    KEY UPDATE não pode usar VALUES() de um SELECT com GROUP BY, e o WHERE
+    de fora evita a ambiguidade do upsert do SQLite.
+    """
+    todas = list(chaves) + list(colunas)
+    cursor.execute(
+        f"INSERT INTO {tabela} ({', '.join(todas)}) SELECT * FROM ({consulta}) AS novos WHERE 1 = 1"
+        + _clausula_somando(tabela, chaves, colunas),
+        params
+    )
+
+
+@metricas.rotular_dao
+class VendaDAO:
+    """
+    Data Access Object para operações SQL da entidade Venda
+    """
+    
+    FORMAS_PAGAMENTO = ('Dinheiro', 'Débito', 'Crédito', 'PIX', 'Boleto')
+    
+    @staticmethod
+    def criar(id_cliente, itens, forma_pagamento, desconto=0, observacoes=''):
+        """
+        Registra uma venda concluída e baixa o estoque de forma atômica.
+        
+        itens é uma lista de (id_estoque, quantidade). Todas as linhas de
+        estoque do carrinho são bloqueadas com um único SELECT ... FOR UPDATE
+        em ordem de id_estoque (a ordem fixa evita deadlock entre vendas
+        concorrentes), a baixa é um único UPDATE e os itens entram num INSERT
+        multi-linha. Lança EstoqueInsuficiente ou VendaInvalida sem gravar nada.
+        """
+        if forma_pagamento not in VendaDAO.FORMAS_PAGAMENTO:
+            raise VendaInvalida('Forma de pagamento inválida')
+        
+        carrinho = {}
+        for id_estoque, quantidade in itens:
+            id_estoque, quantidade = int(id_estoque), _quantidade(quantidade, VendaInvalida)
+            carrinho[id_estoque] = carrinho.get(id_estoque, 0) + quantidade
+        if not carrinho:
+            raise VendaInvalida('Carrinho vazio')
+        try:
+            desconto = Decimal(str(desconto or 0))
+        except InvalidOperation:
+            raise VendaInvalida('Desconto inválido')
+        if not desconto.is_finite():
+            raise VendaInvalida('Desconto inválido')
+        ids = sorted(carrinho)
+        marcadores = ', '.join(['%s'] * len(ids))
+        
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT e.id_estoque, e.quantidade, p.preco_venda
+                FROM estoque e
+                INNER JOIN produtos p ON e.id_produto = p.id_produto
+                WHERE e.id_estoque IN ({marcadores})
+                ORDER BY e.id_estoque
+                """ + _sufixo_for_update('e'),
+                ids
+            )
+            estoque = {row[0]: (row[1], Decimal(str(row[2]))) for row in cursor.fetchall()}
+            
+            for id_estoque in ids:
+                if id_estoque not in estoque:
+                    raise VendaInvalida(f'Item de estoque {id_estoque} não encontrado')
+                disponivel = estoque[id_estoque][0]
+                if disponivel < carrinho[id_estoque]:
+                    raise EstoqueInsuficiente(id_estoque, disponivel, carrinho[id_estoque])
+            
+            # Baixa de todas as linhas num único UPDATE. A condição de
+            # quantidade protege também bancos sem FOR UPDATE.
+            caso = 'CASE id_estoque ' + ' '.join(['WHEN %s THEN %s'] * len(ids)) + ' END'
+            pares = [valor for id_estoque in ids for valor in (id_estoque, carrinho[id_estoque])]
+            cursor.execute(
+                f"""
+                UPDATE estoque
+                SET quantidade = quantidade - {caso}
+                WHERE id_estoque IN ({marcadores}) AND quantidade >= {caso}
+                """,
+                pares + ids + pares
+            )
+            if cursor.rowcount != len(ids):
+                raise EstoqueInsuficiente()
+            
+            subtotal = sum(estoque[i][1] * carrinho[i] for i in ids)
+            if desconto < 0 or desconto > subtotal:
+                raise VendaInvalida('Desconto inválido')
+            cursor.execute(
+                """
+                INSERT INTO vendas (id_cliente, data_venda, valor_subtotal, desconto,
+                                    valor_total, forma_pagamento, status_venda, observacoes)
+                VALUES (%s, NOW(), %s, %s, %s, %s, 'Concluída', %s)
+                """,
+                [id_cliente, subtotal, desconto, subtotal - desconto, forma_pagamento,
+                 observacoes if observacoes else None]
+            )
+            id_venda = cursor.lastrowid
+            cursor.executemany(
+                """
+                INSERT INTO itens_venda (id_venda, id_estoque, quantidade, preco_unitario)
+                VALUES (%s, %s, %s, %s)
                 """,
-                [cpf]
+                [[id_venda, i, carrinho[i], estoque[i][1]] for i in ids]
+            )
+            ResumoDAO.aplicar_venda(cursor, id_venda, 1)
+            ResumoDiarioDAO.marcar_pendente(cursor, id_venda)
+            return id_venda
+    
+    @staticmethod
+    def cancelar(id_venda):
+        """
+        Cancela uma venda concluída: devolve os itens ao estoque e retira a
+        venda dos resumos. Retorna False se a venda não existe ou não está concluída.
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT status_venda FROM vendas WHERE id_venda = %s" + _sufixo_for_update(),
+                [id_venda]
             )
             row = cursor.fetchone()
-            if row:
-                columns = [col[0] for col in cursor.description]
-                return dict(zip(columns, row))
-            return None
+            if not row or row[0] != 'Concluída':
+                return False
+            
+            # Retira dos resumos antes de mudar o status (os resumos só contam vendas concluídas)
+            ResumoDAO.aplicar_venda(cursor, id_venda, -1)
+            ResumoDiarioDAO.marcar_pendente(cursor, id_venda)
+            cursor.execute(
+                """
+                UPDATE estoque
+                SET quantidade = quantidade + (
+                    SELECT SUM(iv.quantidade) FROM itens_venda iv
+                    WHERE iv.id_venda = %s AND iv.id_estoque = estoque.id_estoque
+                )
+                WHERE id_estoque IN (SELECT id_estoque FROM itens_venda WHERE id_venda = %s)
+                """,
+                [id_venda, id_venda]
+            )
+            cursor.execute(
+                "UPDATE vendas SET status_venda = 'Cancelada' WHERE id_venda = %s",
+                [id_venda]
+            )
+            return True
+    
+    COLUNAS_EXPORTACAO = (
+        'id_venda', 'data_venda', 'id_cliente', 'nome_cliente', 'valor_subtotal',
+        'desconto', 'valor_total', 'forma_pagamento', 'status_venda',
+    )
+    
+    @staticmethod
+    @leitura
+    def iterar(tamanho_lote=None):
+        """Percorre todas as vendas em lotes, sem carregar a tabela na memória"""
+        return _iterar_consulta(
+            """
+            SELECT v.id_venda, v.data_venda, v.id_cliente, c.nome_cliente,
+                   v.valor_subtotal, v.desconto, v.valor_total,
+                   v.forma_pagamento, v.status_venda
+            FROM vendas v
+            LEFT JOIN clientes c ON v.id_cliente = c.id_cliente
+            ORDER BY v.id_venda
+            """,
+            tamanho_lote=tamanho_lote
+        )
+    
+    @staticmethod
+    @leitura
+    def contar():
+        """Total de vendas (o que iterar percorre), para o progresso das exportações"""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT COUNT(*) FROM vendas")
+            return cursor.fetchone()[0]
+    
+    @staticmethod
+    @leitura
+    def volumes_por_produto(desde):
+        """Unidades vendidas por produto em vendas concluídas a partir de desde"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT e.id_produto, SUM(iv.quantidade)
+                FROM vendas v
+                INNER JOIN itens_venda iv ON iv.id_venda = v.id_venda
+                INNER JOIN estoque e ON e.id_estoque = iv.id_estoque
+                WHERE v.data_venda >= %s AND v.status_venda = 'Concluída'
+                GROUP BY e.id_produto
+                """,
+                [desde]
+            )
+            return cursor.fetchall()
+
+
+@metricas.rotular_dao
+class CompraDAO:
+    """
+    Data Access Object para operações SQL da entidade Compra (pedidos a
+    fornecedores)
+    """
+    
+    @staticmethod
+    def criar(id_fornecedor, itens, observacoes=''):
+        """
+        Registra uma compra pendente. itens é uma lista de
+        (id_produto, tamanho, cor, quantidade, preco_unitario), gravados num
+        INSERT multi-linha. Lança CompraInvalida sem gravar nada.
+        """
+        linhas = []
+        for id_produto, tamanho, cor, quantidade, preco_unitario in itens:
+            quantidade = _quantidade(quantidade, CompraInvalida)
+            try:
+                preco_unitario = Decimal(str(preco_unitario))
+            except InvalidOperation:
+                raise CompraInvalida('Preço unitário inválido')
+            if not preco_unitario.is_finite() or preco_unitario < 0:
+                raise CompraInvalida('Preço unitário inválido')
+            tamanho, cor = str(tamanho).strip(), str(cor).strip()
+            if not tamanho or not cor:
+                raise CompraInvalida('Informe tamanho e cor de cada item')
+            linhas.append([int(id_produto), tamanho, cor, quantidade, preco_unitario])
+        if not linhas:
+            raise CompraInvalida('Compra sem itens')
+        
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO compras (id_fornecedor, data_compra, valor_total, status_compra, observacoes)
+                VALUES (%s, NOW(), %s, 'Pendente', %s)
+                """,
+                [id_fornecedor, sum(linha[3] * linha[4] for linha in linhas), observacoes or None]
+            )
+            id_compra = cursor.lastrowid
+            cursor.executemany(
+                """
+                INSERT INTO itens_compra (id_compra, id_produto, tamanho, cor, quantidade, preco_unitario)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                """,
+                [[id_compra] + linha for linha in linhas]
+            )
+            return id_compra
+    
+    @staticmethod
+    @leitura
+    def buscar(id_compra):
+        """Busca uma compra específica por ID"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT id_compra, id_fornecedor, data_compra, valor_total, status_compra,
+                       data_recebimento, observacoes
+                FROM compras
+                WHERE id_compra = %s
+                """,
+                [id_compra]
+            )
+            return registros.mapear_linha(cursor, cursor.fetchone())
+    
+    @staticmethod
+    def receber(id_compra):
+        """
+        Marca a compra como recebida e soma todos os itens ao estoque.
+        
+        A troca de status só acontece a partir de 'Pendente' (UPDATE
+        condicional), e a entrada no estoque é um único INSERT ... SELECT
+        com upsert pela chave (id_produto, tamanho, cor), que cria as
+        variações novas. Tudo numa transação: receber de novo, inclusive em
+        paralelo, não soma duas vezes.
+        
+        Retorna True se a compra foi recebida agora, False se já estava
+        recebida e None se não existe. Lança CompraInvalida se cancelada.
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE compras SET status_compra = 'Recebida', data_recebimento = %s
+                WHERE id_compra = %s AND status_compra = 'Pendente'
+                """,
+                [date.today(), id_compra]
+            )
+            if cursor.rowcount == 0:
+                cursor.execute("SELECT status_compra FROM compras WHERE id_compra = %s", [id_compra])
+                linha = cursor.fetchone()
+                if linha is None:
+                    return None
+                if linha[0] == 'Cancelada':
+                    raise CompraInvalida('Compra cancelada não pode ser recebida')
+                return False
+            _upsert_somando_consulta(
+                cursor, 'estoque', ('id_produto', 'tamanho', 'cor'), ('quantidade',),
+                """
+                SELECT id_produto, tamanho, cor, SUM(quantidade)
+                FROM itens_compra
+                WHERE id_compra = %s
+                GROUP BY id_produto, tamanho, cor
+                ORDER BY id_produto, tamanho, cor
+                """,
+                [id_compra]
+            )
+            return True
+
+
+@metricas.rotular_dao
+class ResumoDAO:
+    """
+    Data Access Object das tabelas de resumo de vendas (resumo_produtos,
+    resumo_clientes, resumo_categorias e resumo_pagamentos).
+    
+    Os resumos são atualizados incrementalmente a cada venda concluída ou
+    cancelada, então o painel lê poucas linhas já agregadas em vez de
+    refazer os GROUP BY sobre todo o histórico de itens_venda.
+    
+    O custo fica na transação da venda: a linha de resumo_pagamentos da
+    forma de pagamento é a mesma para todas as vendas, então os checkouts
+    com a mesma forma esperam uns pelos outros entre o upsert dela e o
+    commit. Por isso ela é a última gravada por aplicar_venda; se isso
+    limitar a vazão, o painel pode somar resumo_diario (atualizado fora da
+    venda pelo comando atualizar_resumo_diario) no lugar dela.
+    """
+    
+    @staticmethod
+    def aplicar_venda(cursor, id_venda, sinal):
+        """
+        Soma (sinal=1) ou subtrai (sinal=-1) uma venda concluída dos resumos.
+        
+        As linhas de cada tabela são gravadas em ordem de chave primária e
+        as tabelas sempre na mesma ordem: duas vendas com os mesmos produtos
+        em outra ordem pegam os bloqueios na mesma sequência, sem deadlock.
+        """
+        cursor.execute(
+            "SELECT id_cliente, valor_total, forma_pagamento FROM vendas WHERE id_venda = %s",
+            [id_venda]
+        )
+        id_cliente, valor_total, forma_pagamento = cursor.fetchone()
+        cursor.execute(
+            """
+            SELECT e.id_produto, p.id_categoria, SUM(iv.quantidade), SUM(iv.subtotal)
+            FROM itens_venda iv
+            INNER JOIN estoque e ON iv.id_estoque = e.id_estoque
+            INNER JOIN produtos p ON e.id_produto = p.id_produto
+            WHERE iv.id_venda = %s
+            GROUP BY e.id_produto, p.id_categoria
+            """,
+            [id_venda]
+        )
+        por_produto = sorted(cursor.fetchall())
+        
+        por_categoria = {}
+        for _, id_categoria, _, receita in por_produto:
+            por_categoria[id_categoria] = por_categoria.get(id_categoria, 0) + receita
+        
+        _upsert_somando(
+            cursor, 'resumo_produtos', ['id_produto'], ['total_vendido', 'receita_total'],
+            [[id_produto, sinal * quantidade, sinal * receita]
+             for id_produto, _, quantidade, receita in por_produto]
+        )
+        _upsert_somando(
+            cursor, 'resumo_categorias', ['id_categoria'], ['num_vendas', 'receita_total'],
+            [[id_categoria, sinal, sinal * receita] for id_categoria, receita in sorted(por_categoria.items())]
+        )
+        if id_cliente is not None:
+            _upsert_somando(
+                cursor, 'resumo_clientes', ['id_cliente'], ['total_compras', 'total_gasto'],
+                [[id_cliente, sinal, sinal * valor_total]]
+            )
+        _upsert_somando(
+            cursor, 'resumo_pagamentos', ['forma_pagamento'], ['quantidade_vendas', 'total_faturado'],
+            [[forma_pagamento, sinal, sinal * valor_total]]
+        )
+    
+    @staticmethod
+    def reconstruir():
+        """Recalcula todos os resumos a partir das vendas concluídas (carga inicial ou reparo)"""
+        with transaction.atomic(), connection.cursor() as cursor:
+            for tabela in ('resumo_produtos', 'resumo_categorias', 'resumo_clientes', 'resumo_pagamentos'):
+                cursor.execute(f"DELETE FROM {tabela}")
+            cursor.execute(
+                """
+                INSERT INTO resumo_produtos (id_produto, total_vendido, receita_total)
+                SELECT e.id_produto, SUM(iv.quantidade), SUM(iv.subtotal)
+                FROM itens_venda iv
+                INNER JOIN estoque e ON iv.id_estoque = e.id_estoque
+                INNER JOIN vendas v ON iv.id_venda = v.id_venda
+                WHERE v.status_venda = 'Concluída'
+                GROUP BY e.id_produto
+                """
+            )
+            cursor.execute(
+                """
+                INSERT INTO resumo_categorias (id_categoria, num_vendas, receita_total)
+                SELECT p.id_categoria, COUNT(DISTINCT iv.id_venda), SUM(iv.subtotal)
+                FROM itens_venda iv
+                INNER JOIN estoque e ON iv.id_estoque = e.id_estoque
+                INNER JOIN produtos p ON e.id_produto = p.id_produto
+                INNER JOIN vendas v ON iv.id_venda = v.id_venda
+                WHERE v.status_venda = 'Concluída'
+                GROUP BY p.id_categoria
+                """
+            )
+            cursor.execute(
+                """
+                INSERT INTO resumo_clientes (id_cliente, total_compras, total_gasto)
+                SELECT id_cliente, COUNT(*), SUM(valor_total)
+                FROM vendas
+                WHERE status_venda = 'Concluída' AND id_cliente IS NOT NULL
+                GROUP BY id_cliente
+                """
+            )
+            cursor.execute(
+                """
+                INSERT INTO resumo_pagamentos (forma_pagamento, quantidade_vendas, total_faturado)
+                SELECT forma_pagamento, COUNT(*), SUM(valor_total)
+                FROM vendas
+                WHERE status_venda = 'Concluída'
+                GROUP BY forma_pagamento
+                """
+            )
+    
+    @staticmethod
+    @leitura
+    def contagens():
+        """Produtos e clientes ativos"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT (SELECT COUNT(*) FROM produtos WHERE ativo = TRUE) AS produtos_ativos,
+                       (SELECT COUNT(*) FROM clientes WHERE ativo = TRUE) AS clientes_ativos
+                """
+            )
+            return registros.mapear_linha(cursor, cursor.fetchone())
+    
+    @staticmethod
+    @leitura
+    def faturamento():
+        """Número de vendas concluídas e faturamento total"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT COALESCE(SUM(quantidade_vendas), 0) AS num_vendas,
+                       COALESCE(SUM(total_faturado), 0) AS total_faturado
+                FROM resumo_pagamentos
+                """
+            )
+            return registros.mapear_linha(cursor, cursor.fetchone())
+    
+    @staticmethod
+    @leitura
+    def top_produtos(limite=5):
+        """Produtos mais vendidos"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT r.id_produto, p.nome_produto, r.total_vendido, r.receita_total
+                FROM resumo_produtos r
+                INNER JOIN produtos p ON r.id_produto = p.id_produto
+                WHERE r.total_vendido > 0
+                ORDER BY r.total_vendido DESC
+                LIMIT %s
+                """,
+                [limite]
+            )
+            return registros.mapear_linhas(cursor)
+    
+    @staticmethod
+    @leitura
+    def top_clientes(limite=5):
+        """Clientes que mais compraram"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT r.id_cliente, c.nome_cliente, r.total_compras, r.total_gasto
+                FROM resumo_clientes r
+                INNER JOIN clientes c ON r.id_cliente = c.id_cliente
+                WHERE r.total_compras > 0
+                ORDER BY r.total_gasto DESC
+                LIMIT %s
+                """,
+                [limite]
+            )
+            return registros.mapear_linhas(cursor)
+    
+    @staticmethod
+    @leitura
+    def por_categoria():
+        """Receita e número de vendas por categoria"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT r.id_categoria, c.nome_categoria, r.num_vendas, r.receita_total
+                FROM resumo_categorias r
+                INNER JOIN categorias c ON r.id_categoria = c.id_categoria
+                WHERE r.num_vendas > 0
+                ORDER BY r.receita_total DESC
+                """
+            )
+            return registros.mapear_linhas(cursor)
+    
+    @staticmethod
+    @leitura
+    def por_forma_pagamento():
+        """Quantidade de vendas e faturamento por forma de pagamento"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT forma_pagamento, quantidade_vendas, total_faturado
+                FROM resumo_pagamentos
+                WHERE quantidade_vendas > 0
+                ORDER BY total_faturado DESC
+                """
+            )
+            return registros.mapear_linhas(cursor)
+
+
+def _como_data(valor):
+    """DATE() volta como date no MySQL e como texto no SQLite"""
+    if isinstance(valor, str):
+        return date.fromisoformat(valor[:10])
+    if isinstance(valor, datetime):
+        return valor.date()
+    return valor
+
+
+def _intervalos_de_dias(dias):
+    """Agrupa dias em intervalos [inicio, fim) de dias consecutivos"""
+    intervalos = []
+    for dia in sorted(set(dias)):
+        if intervalos and intervalos[-1][1] == dia:
+            intervalos[-1][1] = dia + timedelta(days=1)
+        else:
+            intervalos.append([dia, dia + timedelta(days=1)])
+    return [(inicio, fim) for inicio, fim in intervalos]
+
+
+@metricas.rotular_dao
+class ResumoDiarioDAO:
+    """
+    Data Access Object da tabela resumo_diario (uma linha por dia e forma
+    de pagamento com os totais das vendas concluídas).
+    
+    Cada venda criada ou cancelada marca o seu dia em
+    resumo_diario_pendentes; atualizar_pendentes recalcula apenas esses dias.
+    Enquanto um dia está pendente, os relatórios o leem direto de vendas.
+    """
+    
+    COLUNAS = ('dia', 'forma_pagamento', 'num_vendas', 'valor_subtotal', 'desconto', 'valor_total')
+    
+    @staticmethod
+    def marcar_pendente(cursor, id_venda):
+        """Marca o dia da venda para ser recalculado (chamado dentro da transação da venda)"""
+        cursor.execute("SELECT DATE(data_venda) FROM vendas WHERE id_venda = %s", [id_venda])
+        dia = _como_data(cursor.fetchone()[0])
+        if connection.vendor == 'mysql':
+            sql = "INSERT IGNORE INTO resumo_diario_pendentes (dia) VALUES (%s)"
+        else:
+            sql = "INSERT INTO resumo_diario_pendentes (dia) VALUES (%s) ON CONFLICT (dia) DO NOTHING"
+        cursor.execute(sql, [dia])
+    
+    @staticmethod
+    @leitura
+    def dias_pendentes(dia_inicio=None, dia_fim=None):
+        """Dias marcados e ainda não recalculados, opcionalmente dentro de [dia_inicio, dia_fim)"""
+        sql = "SELECT dia FROM resumo_diario_pendentes"
+        params = []
+        if dia_inicio is not None and dia_fim is not None:
+            sql += " WHERE dia >= %s AND dia < %s"
+            params = [dia_inicio, dia_fim]
+        with connection.cursor() as cursor:
+            cursor.execute(sql + " ORDER BY dia", params)
+            return [_como_data(row[0]) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _recalcular(cursor, inicio=None, fim=None):
+        """Regrava as linhas de [inicio, fim) a partir de vendas (tudo, se não houver limites)"""
+        limites = [('>=', inicio), ('<', fim)]
+        params = [valor for _, valor in limites if valor is not None]
+        filtro_dia = ''.join(f" AND dia {op} %s" for op, valor in limites if valor is not None)
+        filtro_venda = ''.join(f" AND data_venda {op} %s" for op, valor in limites if valor is not None)
+        cursor.execute("DELETE FROM resumo_diario WHERE 1 = 1" + filtro_dia, params)
+        cursor.execute(
+            f"""
+            INSERT INTO resumo_diario ({', '.join(ResumoDiarioDAO.COLUNAS)})
+            SELECT DATE(data_venda), forma_pagamento, COUNT(*),
+                   SUM(valor_subtotal), SUM(desconto), SUM(valor_total)
+            FROM vendas
+            WHERE status_venda = 'Concluída'{filtro_venda}
+            GROUP BY DATE(data_venda), forma_pagamento
+            """,
+            params
+        )
+    
+    @staticmethod
+    def atualizar_pendentes():
+        """Recalcula só os dias pendentes. Retorna a lista de dias atualizados"""
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SELECT dia FROM resumo_diario_pendentes" + _sufixo_for_update())
+            dias = sorted(_como_data(row[0]) for row in cursor.fetchall())
+            if not dias:
+                return []
+            # Os marcadores saem antes do recálculo: uma venda que chegar no
+            # meio do caminho marca o dia de novo e ele volta na próxima rodada.
+            cursor.execute(
+                f"DELETE FROM resumo_diario_pendentes WHERE dia IN ({', '.join(['%s'] * len(dias))})",
+                dias
+            )
+            for inicio, fim in _intervalos_de_dias(dias):
+                ResumoDiarioDAO._recalcular(cursor, inicio, fim)
+            return dias
+    
+    @staticmethod
+    def reconstruir(desde=None):
+        """Recalcula todo o resumo diário (ou a partir do dia desde), para carga inicial ou reparo"""
+        with transaction.atomic(), connection.cursor() as cursor:
+            if desde is None:
+                cursor.execute("DELETE FROM resumo_diario_pendentes")
+            else:
+                cursor.execute("DELETE FROM resumo_diario_pendentes WHERE dia >= %s", [desde])
+            ResumoDiarioDAO._recalcular(cursor, desde)
+    
+    @staticmethod
+    @leitura
+    def linhas(dia_inicio, dia_fim, forma_pagamento=None):
+        """Linhas do resumo entre [dia_inicio, dia_fim)"""
+        sql = f"SELECT {', '.join(ResumoDiarioDAO.COLUNAS)} FROM resumo_diario WHERE dia >= %s AND dia < %s"
+        params = [dia_inicio, dia_fim]
+        if forma_pagamento:
+            sql += " AND forma_pagamento = %s"
+            params.append(forma_pagamento)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return [(_como_data(row[0]),) + tuple(row[1:]) for row in cursor.fetchall()]
+    
+    @staticmethod
+    @leitura
+    def linhas_de_vendas(intervalos, forma_pagamento=None):
+        """
+        As mesmas colunas do resumo, calculadas direto de vendas para uma
+        lista de intervalos [inicio, fim) de data/hora (numa única consulta)
+        """
+        if not intervalos:
+            return []
+        condicoes = ' OR '.join(['(data_venda >= %s AND data_venda < %s)'] * len(intervalos))
+        params = [limite for intervalo in intervalos for limite in intervalo]
+        filtro_pagamento = ''
+        if forma_pagamento:
+            filtro_pagamento = " AND forma_pagamento = %s"
+            params.append(forma_pagamento)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT DATE(data_venda), forma_pagamento, COUNT(*),
+                       SUM(valor_subtotal), SUM(desconto), SUM(valor_total)
+                FROM vendas
+                WHERE status_venda = 'Concluída' AND ({condicoes}){filtro_pagamento}
+                GROUP BY DATE(data_venda), forma_pagamento
+                """,
+                params
+            )
+            return [(_como_data(row[0]),) + tuple(row[1:]) for row in cursor.fetchall()]
+
+
+
+@metricas.rotular_dao
+class TarefaDAO:
+    """
+    Data Access Object da fila de tarefas em segundo plano (ver core.tarefas).
+    
+    As leituras não usam a réplica: quem acompanha uma tarefa precisa ver o
+    progresso e o status gravados agora pelo trabalhador.
+    """
+    
+    COLUNAS = (
+        'id_tarefa', 'tipo', 'parametros', 'status_tarefa', 'progresso', 'tentativas',
+        'max_tentativas', 'executar_apos', 'trabalhador', 'arquivo', 'erro',
+        'data_criacao', 'data_inicio', 'data_atualizacao', 'data_fim',
+    )
+    
+    @staticmethod
+    def criar(tipo, parametros, max_tentativas=3):
+        """Enfileira uma tarefa (parametros já serializado em JSON). Retorna o id"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                INSERT INTO tarefas (tipo, parametros, status_tarefa, max_tentativas, executar_apos, data_criacao)
+                VALUES (%s, %s, 'Pendente', %s, %s, NOW())
+                """,
+                [tipo, parametros, max_tentativas, datetime.now()]
+            )
+            return cursor.lastrowid
+    
+    @staticmethod
+    def buscar(id_tarefa):
+        """Busca uma tarefa específica por ID"""
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {', '.join(TarefaDAO.COLUNAS)} FROM tarefas WHERE id_tarefa = %s",
+                [id_tarefa]
+            )
+            return registros.mapear_linha(cursor, cursor.fetchone())
+    
+    @staticmethod
+    def reservar(trabalhador, vagas, limite):
+        """
+        Reserva para o trabalhador as pendentes mais antigas, em ordem de
+        chegada entre todos os tipos, até vagas[tipo] de cada e `limite` no
+        total. Cada reserva é um UPDATE condicional a partir de 'Pendente':
+        trabalhadores concorrentes nunca pegam a mesma tarefa. Retorna as
+        tarefas reservadas, já com a tentativa contada.
+        """
+        agora = datetime.now()
+        vagas = {tipo: min(quantidade, limite) for tipo, quantidade in vagas.items() if quantidade > 0}
+        if not vagas or limite <= 0:
+            return []
+        # As `vagas[tipo]` mais antigas de cada tipo (idx_tarefas_fila) e,
+        # entre elas, as `limite` mais antigas: nenhum tipo fica esperando
+        # só por vir depois no dicionário
+        candidatas = ' UNION ALL '.join(
+            f"""
+            SELECT id_tarefa FROM (
+                SELECT id_tarefa FROM tarefas
+                WHERE status_tarefa = 'Pendente' AND tipo = %s AND executar_apos <= %s
+                ORDER BY id_tarefa
+                LIMIT %s
+            ) AS tipo_{posicao}
+            """
+            for posicao in range(len(vagas))
+        )
+        params = [valor for tipo, quantidade in vagas.items() for valor in (tipo, agora, quantidade)]
+        ids = []
+        with connection.cursor() as cursor:
+            cursor.execute(candidatas + ' ORDER BY id_tarefa LIMIT %s', params + [limite])
+            for (id_tarefa,) in cursor.fetchall():
+                cursor.execute(
+                    """
+                    UPDATE tarefas
+                    SET status_tarefa = 'Executando', trabalhador = %s, tentativas = tentativas + 1,
+                        progresso = 0, data_inicio = %s, data_atualizacao = %s
+                    WHERE id_tarefa = %s AND status_tarefa = 'Pendente'
+                    """,
+                    [trabalhador, agora, agora, id_tarefa]
+                )
+                if cursor.rowcount:
+                    ids.append(id_tarefa)
+        return _buscar_muitos(TarefaDAO.COLUNAS, 'tarefas', 'id_tarefa', ids) if ids else []
+    
+    @staticmethod
+    def sinalizar(trabalhador, progressos):
+        """
+        Sinal de vida do trabalhador com o progresso ({id_tarefa: percentual})
+        das tarefas que ele está executando, num único executemany
+        """
+        if not progressos:
+            return
+        agora = datetime.now()
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                """
+                UPDATE tarefas SET progresso = %s, data_atualizacao = %s
+                WHERE id_tarefa = %s AND trabalhador = %s AND status_tarefa = 'Executando'
+                """,
+                [[progresso, agora, id_tarefa, trabalhador] for id_tarefa, progresso in sorted(progressos.items())]
+            )
+    
+    @staticmethod
+    def concluir(id_tarefa, trabalhador, arquivo):
+        """Marca a tarefa como concluída com o arquivo gerado (caminho relativo a TAREFAS_DIRETORIO)"""
+        agora = datetime.now()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE tarefas
+                SET status_tarefa = 'Concluída', progresso = 100, arquivo = %s, erro = NULL,
+                    data_atualizacao = %s, data_fim = %s
+                WHERE id_tarefa = %s AND trabalhador = %s AND status_tarefa = 'Executando'
+                """,
+                [arquivo, agora, agora, id_tarefa, trabalhador]
+            )
+            return cursor.rowcount > 0
+    
+    @staticmethod
+    def falhar(id_tarefa, trabalhador, erro, repetir_em=None):
+        """
+        Registra a falha. Com repetir_em (datetime) a tarefa volta para a
+        fila e só é reservada de novo a partir dali; sem, falha de vez.
+        """
+        agora = datetime.now()
+        with connection.cursor() as cursor:
+            if repetir_em is None:
+                cursor.execute(
+                    """
+                    UPDATE tarefas SET status_tarefa = 'Falhou', erro = %s, data_atualizacao = %s, data_fim = %s
+                    WHERE id_tarefa = %s AND trabalhador = %s AND status_tarefa = 'Executando'
+                    """,
+                    [erro, agora, agora, id_tarefa, trabalhador]
+                )
+            else:
+                cursor.execute(
+                    """
+                    UPDATE tarefas
+                    SET status_tarefa = 'Pendente', trabalhador = NULL, erro = %s, executar_apos = %s,
+                        data_atualizacao = %s
+                    WHERE id_tarefa = %s AND trabalhador = %s AND status_tarefa = 'Executando'
+                    """,
+                    [erro, repetir_em, agora, id_tarefa, trabalhador]
+                )
+            return cursor.rowcount > 0
+    
+    @staticmethod
+    def recuperar_abandonadas(sem_sinal_desde):
+        """
+        Tarefas em execução sem sinal do trabalhador desde sem_sinal_desde
+        (processo morto) voltam para a fila, ou falham se já esgotaram as
+        tentativas. Retorna quantas foram recuperadas.
+        """
+        agora = datetime.now()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                UPDATE tarefas
+                SET status_tarefa = CASE WHEN tentativas < max_tentativas THEN 'Pendente' ELSE 'Falhou' END,
+                    data_fim = CASE WHEN tentativas < max_tentativas THEN NULL ELSE %s END,
+                    trabalhador = NULL, erro = 'O trabalhador parou de responder', data_atualizacao = %s
+                WHERE status_tarefa = 'Executando' AND data_atualizacao < %s
+                """,
+                [agora, agora, sem_sinal_desde]
+            )
+            return cursor.rowcount
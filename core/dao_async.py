@@ -0,0 +1,100 @@
+"""
+Versões assíncronas das DAOs, para uso nas views async.
+
+As DAOs usam o cursor síncrono do Django; aqui cada chamada roda num pool
+de threads de tamanho fixo (DAO_ASYNC_THREADS). O pool limita quantas
+conexões o processo abre, mesmo com centenas de requisições simultâneas, e
+permite que uma view dispare consultas independentes ao mesmo tempo com
+asyncio.gather.
+
+    produto = await dao_async.ProdutoDAO.buscar(1)
+"""
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import close_old_connections
+
+from . import dao
+
+_executor = None
+_trava = threading.Lock()
+
+# Requisições iniciadas no processo; cada thread do pool guarda a última
+# que viu, para conferir as suas conexões uma vez por requisição
+_requisicoes = 0
+_thread = threading.local()
+
+
+def _nova_requisicao(**kwargs):
+    global _requisicoes
+    _requisicoes += 1
+
+
+request_started.connect(_nova_requisicao, dispatch_uid='dao_async_nova_requisicao')
+
+
+def executor():
+    """Pool de threads compartilhado pelas chamadas assíncronas às DAOs"""
+    global _executor
+    if _executor is None:
+        with _trava:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'DAO_ASYNC_THREADS', 8),
+                    thread_name_prefix='dao',
+                )
+    return _executor
+
+
+def _chamar(funcao, args, kwargs):
+    # Cada thread do pool tem a sua conexão; descarta as quebradas ou
+    # vencidas (CONN_MAX_AGE) na fronteira das requisições, como o Django
+    # faz na thread da requisição. Conferir a cada chamada fecharia, com o
+    # CONN_MAX_AGE=0 padrão, a conexão depois de toda consulta.
+    if getattr(_thread, 'requisicao', None) != _requisicoes:
+        _thread.requisicao = _requisicoes
+        close_old_connections()
+    return funcao(*args, **kwargs)
+
+
+async def executar(funcao, *args, **kwargs):
+    """Executa uma função síncrona de acesso ao banco no pool das DAOs"""
+    return await sync_to_async(_chamar, thread_sensitive=False, executor=executor())(funcao, args, kwargs)
+
+
+class _DAOAssincrona:
+    """
+    Expõe os métodos de uma DAO como corrotinas. iterar (que devolve um
+    gerador) não tem versão assíncrona: use a DAO síncrona numa
+    StreamingHttpResponse.
+    """
+
+    def __init__(self, dao_sincrona):
+        self._dao = dao_sincrona
+
+    def __getattr__(self, nome):
+        atributo = getattr(self._dao, nome)
+        if not callable(atributo) or inspect.isclass(atributo):
+            return atributo
+        if nome == 'iterar':
+            raise AttributeError(f'{self._dao.__name__}.{nome} é um gerador e não tem versão assíncrona')
+
+        async def metodo(*args, **kwargs):
+            return await executar(atributo, *args, **kwargs)
+
+        metodo.__name__ = metodo.__qualname__ = nome
+        metodo.__doc__ = atributo.__doc__
+        return metodo
+
+
+CategoriaDAO = _DAOAssincrona(dao.CategoriaDAO)
+ProdutoDAO = _DAOAssincrona(dao.ProdutoDAO)
+ClienteDAO = _DAOAssincrona(dao.ClienteDAO)
+EstoqueDAO = _DAOAssincrona(dao.EstoqueDAO)
+VendaDAO = _DAOAssincrona(dao.VendaDAO)
+ResumoDAO = _DAOAssincrona(dao.ResumoDAO)
+ResumoDiarioDAO = _DAOAssincrona(dao.ResumoDiarioDAO)
@@ -0,0 +1,51 @@
+"""
+Geração de arquivos de exportação (CSV e NDJSON) em streaming.
+
+Os geradores recebem os lotes produzidos pelas DAOs e devolvem cada lote
+já serializado, então a memória usada não depende do tamanho da tabela e o
+cabeçalho sai antes mesmo de a consulta terminar.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import Http404, StreamingHttpResponse
+
+
+class _Eco:
+    """Arquivo falso: o csv.writer devolve a linha em vez de gravá-la"""
+
+    def write(self, valor):
+        return valor
+
+
+def gerar_csv(colunas, lotes):
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(colunas)
+    for lote in lotes:
+        yield ''.join([escritor.writerow(linha) for linha in lote])
+
+
+def gerar_ndjson(colunas, lotes):
+    codificador = DjangoJSONEncoder(ensure_ascii=False)
+    for lote in lotes:
+        yield ''.join([
+            codificador.encode(dict(zip(colunas, linha))) + '\n'
+            for linha in lote
+        ])
+
+
+FORMATOS = {
+    'csv': (gerar_csv, 'text/csv; charset=utf-8', 'csv'),
+    'ndjson': (gerar_ndjson, 'application/x-ndjson; charset=utf-8', 'ndjson'),
+}
+
+
+def resposta_exportacao(nome_arquivo, colunas, lotes, formato):
+    """Monta a StreamingHttpResponse no formato pedido (csv ou ndjson)"""
+    if formato not in FORMATOS:
+        raise Http404('Formato de exportação não suportado')
+    gerador, content_type, extensao = FORMATOS[formato]
+    response = StreamingHttpResponse(gerador(colunas, lotes), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}.{extensao}"'
+    return response
@@ -0,0 +1,534 @@
+"""
+Gerador de dados sintéticos para todo o esquema da loja.
+
+Os dados são divididos em blocos de TAMANHO_BLOCO linhas e cada bloco usa
+o seu próprio random.Random semeado por (semente, tabela, bloco), com ids
+explícitos. Por isso o resultado é o mesmo com 1 ou N processos, e cada
+bloco pode ser gerado por qualquer processo sem coordenação.
+
+As distribuições imitam uma loja real: poucos produtos e clientes
+concentram a maior parte das vendas (lei de potência), há mais vendas no
+fim de semana, em junho (Dia dos Namorados) e em dezembro, e a loja cresce
+ao longo do período.
+
+A gravação é feita por INSERTs multi-linha ou em arquivos TSV com um
+script de LOAD DATA LOCAL INFILE (para cargas na casa das dezenas de
+milhões de linhas).
+"""
+import bisect
+import itertools
+import os
+import random
+from array import array
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from multiprocessing import get_context
+
+import django
+from django.db import connection, connections, transaction
+
+from . import versoes
+from .dao import CategoriaDAO, ResumoDAO, ResumoDiarioDAO
+from .models import Cliente
+
+TAMANHO_BLOCO = 10_000
+
+TAMANHOS_NUMERICOS = ('38', '40', '42', '44', '46', '48')
+TAMANHOS_LETRAS = ('PP', 'P', 'M', 'G', 'GG', 'XG')
+CORES = ('Preto', 'Branco', 'Nude', 'Rosa', 'Vermelho', 'Vinho', 'Azul Marinho', 'Lilás', 'Verde', 'Estampado')
+MAX_CORES = 5
+# Espaço de ids reservado por produto na tabela estoque (maior grade possível)
+MAX_GRADE = len(TAMANHOS_NUMERICOS) * MAX_CORES
+
+CATEGORIAS = (
+    ('Sutiãs', 'Sutiã'), ('Calcinhas', 'Calcinha'), ('Conjuntos', 'Conjunto'),
+    ('Camisolas', 'Camisola'), ('Bodies', 'Body'), ('Pijamas', 'Pijama'),
+    ('Robes', 'Robe'), ('Cintas', 'Cinta'), ('Tops', 'Top'), ('Meias', 'Meia'),
+)
+MARCAS = ('Valisere', 'Hope', 'Triumph', 'Lupo', 'Zee Rucci', 'DeMillus', 'Liz', 'Marcyn', 'Scalina', 'Duloren')
+ESTILOS = ('Renda', 'Microfibra', 'Algodão', 'Cetim', 'Tule', 'Básico', 'Strappy', 'Push-up',
+           'Sem Costura', 'Floral', 'Poá', 'Listrado', 'Conforto', 'Modelador', 'Luxo')
+NOMES = ('Ana', 'Maria', 'Juliana', 'Fernanda', 'Patrícia', 'Camila', 'Amanda', 'Beatriz', 'Larissa',
+         'Gabriela', 'Mariana', 'Letícia', 'Carolina', 'Renata', 'Vanessa', 'Aline', 'Bruna', 'Luciana',
+         'Sandra', 'Cristina', 'Paula', 'Rafaela', 'Isabela', 'Natália', 'Débora', 'João', 'Carlos', 'Pedro')
+SOBRENOMES = ('Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira',
+              'Lima', 'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Almeida', 'Lopes', 'Soares',
+              'Fernandes', 'Vieira', 'Barbosa', 'Rocha', 'Dias', 'Nascimento', 'Andrade', 'Moreira')
+CIDADES = (
+    ('São Paulo', 'SP', 30), ('Rio de Janeiro', 'RJ', 15), ('Belo Horizonte', 'MG', 8),
+    ('Curitiba', 'PR', 6), ('Porto Alegre', 'RS', 6), ('Salvador', 'BA', 6), ('Recife', 'PE', 5),
+    ('Fortaleza', 'CE', 5), ('Campinas', 'SP', 5), ('Santo André', 'SP', 4), ('Goiânia', 'GO', 4),
+    ('Brasília', 'DF', 6),
+)
+FORMAS_PAGAMENTO = (('PIX', 35), ('Crédito', 35), ('Débito', 15), ('Dinheiro', 10), ('Boleto', 5))
+HORAS = tuple(range(8, 22))
+PESOS_HORAS = (1, 2, 4, 5, 5, 4, 4, 5, 6, 7, 8, 8, 6, 3)
+
+COLUNAS = {
+    'categorias': ('id_categoria', 'nome_categoria', 'descricao'),
+    'fornecedores': ('id_fornecedor', 'nome_fornecedor', 'cnpj', 'email', 'telefone', 'cidade', 'estado'),
+    'produtos': ('id_produto', 'id_categoria', 'id_fornecedor', 'nome_produto', 'descricao', 'marca',
+                 'preco_custo', 'preco_venda', 'ativo'),
+    'estoque': ('id_estoque', 'id_produto', 'tamanho', 'cor', 'quantidade', 'estoque_minimo'),
+    'clientes': ('id_cliente', 'nome_cliente', 'cpf', 'cpf_numerico', 'email', 'telefone',
+                 'data_nascimento', 'cidade', 'estado', 'ativo'),
+    'vendas': ('id_venda', 'id_cliente', 'data_venda', 'valor_subtotal', 'desconto', 'valor_total',
+               'forma_pagamento', 'status_venda'),
+    'itens_venda': ('id_venda', 'id_estoque', 'quantidade', 'preco_unitario'),
+}
+
+_catalogo = None
+
+
+# ============================================
+# DOCUMENTOS
+# ============================================
+
+def cpf(id_cliente):
+    """CPF válido e único por id (id * 7919 é uma bijeção módulo 10^9)"""
+    base = f'{(id_cliente * 7919 + 123456789) % 10 ** 9:09d}'
+    digitos = base + Cliente.digitos_verificadores(base)
+    return f'{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}'
+
+
+def cnpj(id_fornecedor):
+    """CNPJ válido (matriz /0001) e único por id"""
+    digitos = [int(d) for d in f'{(id_fornecedor * 7919 + 1234567) % 10 ** 8:08d}0001']
+    for pesos in ((5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2), (6, 5, 4, 3, 2, 9, 8, 7, 6, 5, 4, 3, 2)):
+        resto = sum(d * p for d, p in zip(digitos, pesos)) % 11
+        digitos.append(0 if resto < 2 else 11 - resto)
+    texto = ''.join(map(str, digitos))
+    return f'{texto[:2]}.{texto[2:5]}.{texto[5:8]}/{texto[8:12]}-{texto[12:]}'
+
+
+# ============================================
+# PARÂMETROS
+# ============================================
+
+def _maximo(cursor, coluna, tabela):
+    cursor.execute(f'SELECT COALESCE(MAX({coluna}), 0) FROM {tabela}')
+    return cursor.fetchone()[0]
+
+
+def _faixas(cursor, coluna, tabela):
+    """
+    Ids existentes como faixas contíguas [(primeiro, último)]: compacto
+    mesmo em tabelas grandes, desde que tenham poucos buracos
+    """
+    cursor.execute(f'SELECT {coluna} FROM {tabela} ORDER BY {coluna}')
+    faixas = []
+    for linhas in iter(lambda: cursor.fetchmany(10_000), []):
+        for (id_linha,) in linhas:
+            if faixas and id_linha == faixas[-1][1] + 1:
+                faixas[-1][1] = id_linha
+            else:
+                faixas.append([id_linha, id_linha])
+    return [tuple(faixa) for faixa in faixas]
+
+
+def _sortear_id(faixas, acumulado, posicao):
+    """Id na posição dada (0 a acumulado[-1] - 1) da sequência de faixas"""
+    indice = bisect.bisect_right(acumulado, posicao)
+    return faixas[indice][0] + posicao - (acumulado[indice - 1] if indice else 0)
+
+
+def preparar(semente, categorias, fornecedores, produtos, clientes, vendas, dias=730, data_fim=None):
+    """
+    Lê os maiores ids atuais e monta os parâmetros da geração. As linhas
+    novas entram depois das existentes; categorias e fornecedores já
+    cadastrados também são usados pelos produtos gerados, e os clientes
+    existentes (com os buracos deixados por exclusões) pelas vendas.
+    """
+    with connection.cursor() as cursor:
+        bases = {
+            tabela: _maximo(cursor, coluna, tabela)
+            for tabela, coluna in (('categorias', 'id_categoria'), ('fornecedores', 'id_fornecedor'),
+                                   ('produtos', 'id_produto'), ('estoque', 'id_estoque'),
+                                   ('clientes', 'id_cliente'), ('vendas', 'id_venda'))
+        }
+        cursor.execute('SELECT id_categoria, nome_categoria FROM categorias ORDER BY id_categoria')
+        categorias_existentes = [tuple(row) for row in cursor.fetchall()]
+        cursor.execute('SELECT id_fornecedor, nome_fornecedor FROM fornecedores ORDER BY id_fornecedor')
+        fornecedores_existentes = [row[0] for row in cursor.fetchall()]
+        clientes_existentes = _faixas(cursor, 'id_cliente', 'clientes')
+    return {
+        'semente': semente,
+        'quantidades': {'categorias': categorias, 'fornecedores': fornecedores, 'produtos': produtos,
+                        'clientes': clientes, 'vendas': vendas},
+        'bases': bases,
+        'categorias_existentes': categorias_existentes,
+        'fornecedores_existentes': fornecedores_existentes,
+        'clientes_existentes': clientes_existentes,
+        'dias': dias,
+        'data_fim': (data_fim or date.today()).isoformat(),
+    }
+
+
+def _sorteio(parametros, tabela, bloco):
+    return random.Random(f"{parametros['semente']}:{tabela}:{bloco}")
+
+
+def _novas_categorias(parametros):
+    base = parametros['bases']['categorias']
+    linhas = []
+    for i in range(parametros['quantidades']['categorias']):
+        nome, _ = CATEGORIAS[i % len(CATEGORIAS)]
+        if i >= len(CATEGORIAS):
+            nome = f'{nome} {i // len(CATEGORIAS) + 1}'
+        linhas.append((base + i + 1, nome, f'{nome} da coleção gerada'))
+    return linhas
+
+
+def _novos_fornecedores(parametros):
+    sorteio = _sorteio(parametros, 'fornecedores', 0)
+    base = parametros['bases']['fornecedores']
+    linhas = []
+    for i in range(parametros['quantidades']['fornecedores']):
+        id_fornecedor = base + i + 1
+        marca = MARCAS[i % len(MARCAS)]
+        cidade, estado, _ = sorteio.choice(CIDADES)
+        linhas.append((id_fornecedor, f'{marca} Distribuidora {id_fornecedor}', cnpj(id_fornecedor),
+                       f'contato{id_fornecedor}@fornecedor.com.br',
+                       f'(11) 3{sorteio.randint(0, 999):03d}-{sorteio.randint(0, 9999):04d}', cidade, estado))
+    return linhas
+
+
+def todas_categorias(parametros):
+    return parametros['categorias_existentes'] + [(linha[0], linha[1]) for linha in _novas_categorias(parametros)]
+
+
+def todos_fornecedores(parametros):
+    return parametros['fornecedores_existentes'] + [linha[0] for linha in _novos_fornecedores(parametros)]
+
+
+# ============================================
+# GERAÇÃO POR BLOCO
+# ============================================
+
+def _singular(nome_categoria):
+    for plural, singular in CATEGORIAS:
+        if nome_categoria.startswith(plural):
+            return singular
+    return nome_categoria.rstrip('s')
+
+
+def _bloco_produtos(parametros, bloco):
+    """Produtos do bloco e as suas grades de estoque (ids de estoque em faixas de MAX_GRADE)"""
+    sorteio = _sorteio(parametros, 'produtos', bloco)
+    categorias = todas_categorias(parametros)
+    fornecedores = todos_fornecedores(parametros)
+    # Poucas categorias concentram a maior parte do catálogo
+    pesos_categorias = [1 / (posicao + 1) for posicao in range(len(categorias))]
+    base_produto = parametros['bases']['produtos']
+    base_estoque = parametros['bases']['estoque']
+    inicio = bloco * TAMANHO_BLOCO
+    fim = min(parametros['quantidades']['produtos'], inicio + TAMANHO_BLOCO)
+    produtos, estoque = [], []
+    for i in range(inicio, fim):
+        id_produto = base_produto + i + 1
+        id_categoria, nome_categoria = sorteio.choices(categorias, pesos_categorias)[0]
+        marca = sorteio.choice(MARCAS)
+        estilo = sorteio.choice(ESTILOS)
+        preco_venda = Decimal(str(round(min(max(sorteio.lognormvariate(4.5, 0.45), 19.9), 599.9), 1))) \
+            + Decimal('0.09') - Decimal('0.10') * (sorteio.random() < 0.5)
+        preco_custo = (preco_venda / Decimal(str(round(sorteio.uniform(1.8, 3.0), 2)))).quantize(Decimal('0.01'))
+        produtos.append((
+            id_produto, id_categoria, sorteio.choice(fornecedores),
+            f'{_singular(nome_categoria)} {estilo} {marca} {id_produto}',
+            f'{_singular(nome_categoria)} {estilo.lower()} da linha {marca}',
+            marca, preco_custo, preco_venda, sorteio.random() >= 0.05,
+        ))
+        escala = TAMANHOS_NUMERICOS if nome_categoria.startswith(('Sutiã', 'Conjunto')) else TAMANHOS_LETRAS
+        primeiro = sorteio.randint(0, 2)
+        tamanhos = escala[primeiro:primeiro + sorteio.randint(3, len(escala) - primeiro)]
+        cores = sorteio.sample(CORES, sorteio.randint(1, MAX_CORES))
+        posicao = 0
+        for cor in cores:
+            for tamanho in tamanhos:
+                posicao += 1
+                # Maioria com estoque razoável, alguns zerados ou abaixo do mínimo
+                quantidade = 0 if sorteio.random() < 0.08 else int(sorteio.expovariate(1 / 25))
+                estoque.append((base_estoque + (i * MAX_GRADE) + posicao, id_produto, tamanho, cor,
+                                quantidade, 5))
+    return produtos, estoque
+
+
+def _bloco_clientes(parametros, bloco):
+    sorteio = _sorteio(parametros, 'clientes', bloco)
+    base = parametros['bases']['clientes']
+    pesos_cidades = [peso for _, _, peso in CIDADES]
+    inicio = bloco * TAMANHO_BLOCO
+    fim = min(parametros['quantidades']['clientes'], inicio + TAMANHO_BLOCO)
+    clientes = []
+    for i in range(inicio, fim):
+        id_cliente = base + i + 1
+        nome = f'{sorteio.choice(NOMES)} {sorteio.choice(SOBRENOMES)} {sorteio.choice(SOBRENOMES)}'
+        documento = cpf(id_cliente)
+        cidade, estado, _ = sorteio.choices(CIDADES, pesos_cidades)[0]
+        nascimento = date(1950, 1, 1) + timedelta(days=sorteio.randint(0, 365 * 55))
+        clientes.append((
+            id_cliente, nome, documento, Cliente.normalizar_cpf(documento),
+            f"{nome.split()[0].lower()}.{id_cliente}@email.com",
+            f'(11) 9{sorteio.randint(0, 9999):04d}-{sorteio.randint(0, 9999):04d}',
+            nascimento, cidade, estado, sorteio.random() >= 0.03,
+        ))
+    return clientes
+
+
+def catalogo(parametros):
+    """
+    Variações de estoque dos produtos gerados (ativos) em ordem de
+    popularidade, com o preço em centavos. Calculado uma vez por processo
+    refazendo os blocos de produtos em memória, sem consultar o banco.
+    """
+    global _catalogo
+    if _catalogo is not None and _catalogo[0] == parametros:
+        return _catalogo[1], _catalogo[2]
+    ids, precos = array('q'), array('q')
+    blocos = -(-parametros['quantidades']['produtos'] // TAMANHO_BLOCO)
+    for bloco in range(blocos):
+        produtos, estoque = _bloco_produtos(parametros, bloco)
+        ativos = {produto[0]: int(produto[7] * 100) for produto in produtos if produto[8]}
+        for linha in estoque:
+            if linha[1] in ativos:
+                ids.append(linha[0])
+                precos.append(ativos[linha[1]])
+    ordem = list(range(len(ids)))
+    random.Random(f"{parametros['semente']}:popularidade").shuffle(ordem)
+    ids = array('q', (ids[i] for i in ordem))
+    precos = array('q', (precos[i] for i in ordem))
+    _catalogo = (parametros, ids, precos)
+    return ids, precos
+
+
+def _pesos_dias(parametros):
+    """Peso acumulado de cada dia do período: crescimento, fim de semana e datas comerciais"""
+    fim = date.fromisoformat(parametros['data_fim'])
+    dias = parametros['dias']
+    acumulado, total = [], 0.0
+    for n in range(dias):
+        dia = fim - timedelta(days=dias - 1 - n)
+        peso = 1 + 0.6 * n / max(dias - 1, 1)
+        peso *= {4: 1.3, 5: 1.4, 6: 0.7}.get(dia.weekday(), 1.0)
+        if dia.month == 12:
+            peso *= 1.8
+        elif dia.month == 6 and dia.day <= 12:
+            peso *= 1.6
+        total += peso
+        acumulado.append(total)
+    return fim - timedelta(days=dias - 1), acumulado
+
+
+def _bloco_vendas(parametros, bloco):
+    sorteio = _sorteio(parametros, 'vendas', bloco)
+    ids_estoque, precos = catalogo(parametros)
+    if not ids_estoque:
+        return [], []
+    primeiro_dia, pesos_dias = _pesos_dias(parametros)
+    # Clientes que já existiam seguidos dos gerados (ids contíguos depois do maior)
+    faixas_clientes = list(parametros['clientes_existentes'])
+    if parametros['quantidades']['clientes']:
+        base_clientes = parametros['bases']['clientes']
+        faixas_clientes.append((base_clientes + 1, base_clientes + parametros['quantidades']['clientes']))
+    acumulado_clientes = list(itertools.accumulate(ultimo - primeiro + 1 for primeiro, ultimo in faixas_clientes))
+    formas = [forma for forma, _ in FORMAS_PAGAMENTO]
+    pesos_formas = [peso for _, peso in FORMAS_PAGAMENTO]
+    base = parametros['bases']['vendas']
+    inicio = bloco * TAMANHO_BLOCO
+    fim = min(parametros['quantidades']['vendas'], inicio + TAMANHO_BLOCO)
+    vendas, itens = [], []
+    for i in range(inicio, fim):
+        id_venda = base + i + 1
+        dia = primeiro_dia + timedelta(days=bisect.bisect(pesos_dias, sorteio.random() * pesos_dias[-1]))
+        data_venda = datetime(dia.year, dia.month, dia.day, sorteio.choices(HORAS, PESOS_HORAS)[0],
+                              sorteio.randint(0, 59), sorteio.randint(0, 59))
+        # 10% sem cliente identificado; os demais com poucos clientes frequentes
+        id_cliente = None
+        if acumulado_clientes and sorteio.random() >= 0.10:
+            id_cliente = _sortear_id(faixas_clientes, acumulado_clientes,
+                                     int(acumulado_clientes[-1] * sorteio.random() ** 2))
+        subtotal = 0
+        escolhidos = set()
+        for _ in range(sorteio.choices((1, 2, 3, 4), (50, 30, 15, 5))[0]):
+            posicao = int(len(ids_estoque) * sorteio.random() ** 2)
+            if posicao in escolhidos:
+                continue
+            escolhidos.add(posicao)
+            quantidade = sorteio.choices((1, 2, 3), (80, 15, 5))[0]
+            itens.append((id_venda, ids_estoque[posicao], quantidade, Decimal(precos[posicao]) / 100))
+            subtotal += precos[posicao] * quantidade
+        desconto = 0 if sorteio.random() < 0.7 else subtotal * sorteio.choice((5, 10, 15)) // 100
+        vendas.append((
+            id_venda, id_cliente, data_venda, Decimal(subtotal) / 100, Decimal(desconto) / 100,
+            Decimal(subtotal - desconto) / 100, sorteio.choices(formas, pesos_formas)[0],
+            'Cancelada' if sorteio.random() < 0.03 else 'Concluída',
+        ))
+    return vendas, itens
+
+
+# ============================================
+# GRAVAÇÃO
+# ============================================
+
+def _inserir(cursor, tabela, linhas, lote):
+    colunas = COLUNAS[tabela]
+    # Só marcadores no VALUES: o driver junta o lote num único INSERT multi-linha
+    sql = f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES ({', '.join(['%s'] * len(colunas))})"
+    for inicio in range(0, len(linhas), lote):
+        cursor.executemany(sql, linhas[inicio:inicio + lote])
+
+
+def _valor_tsv(valor):
+    if valor is None:
+        return '\\N'
+    if isinstance(valor, bool):
+        return '1' if valor else '0'
+    if isinstance(valor, datetime):
+        return valor.strftime('%Y-%m-%d %H:%M:%S')
+    return str(valor).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+def _escrever(diretorio, tabela, bloco, linhas):
+    pasta = os.path.join(diretorio, tabela)
+    os.makedirs(pasta, exist_ok=True)
+    with open(os.path.join(pasta, f'{bloco:06d}.tsv'), 'w', encoding='utf-8', newline='\n') as arquivo:
+        arquivo.writelines('\t'.join(map(_valor_tsv, linha)) + '\n' for linha in linhas)
+
+
+GERADORES = {
+    'produtos': (_bloco_produtos, ('produtos', 'estoque')),
+    'clientes': (_bloco_clientes, ('clientes',)),
+    'vendas': (_bloco_vendas, ('vendas', 'itens_venda')),
+}
+
+# Fases gravadas sem as checagens do InnoDB: produtos e estoque só apontam
+# para ids lidos do banco ou gerados no mesmo bloco. Clientes (CPF único) e
+# vendas (clientes e estoque de outros blocos) ficam com elas ligadas.
+FASES_SEM_CHECAGENS = {'produtos'}
+
+
+def _cpfs_livres(clientes):
+    """
+    Tira o CPF dos clientes gerados cujo CPF já está cadastrado: cpf(id) só
+    é único entre os ids gerados, não contra os CPFs digitados na loja
+    """
+    ocupados = set()
+    numericos = [cliente[3] for cliente in clientes]
+    with connection.cursor() as cursor:
+        for inicio in range(0, len(numericos), 1000):
+            parte = numericos[inicio:inicio + 1000]
+            cursor.execute(
+                f"SELECT cpf_numerico FROM clientes WHERE cpf_numerico IN ({', '.join(['%s'] * len(parte))})",
+                parte
+            )
+            ocupados.update(row[0] for row in cursor.fetchall())
+    if not ocupados:
+        return clientes
+    return [cliente[:2] + (None, None) + cliente[4:] if cliente[3] in ocupados else cliente
+            for cliente in clientes]
+
+
+def gravar_bloco(parametros, fase, bloco, lote=1000, diretorio=None):
+    """Gera um bloco da fase e grava no banco (ou em TSV). Retorna o número de linhas"""
+    funcao, tabelas = GERADORES[fase]
+    resultado = funcao(parametros, bloco)
+    if fase == 'clientes':
+        resultado = _cpfs_livres(resultado)
+    if len(tabelas) == 1:
+        resultado = (resultado,)
+    if diretorio:
+        for tabela, linhas in zip(tabelas, resultado):
+            _escrever(diretorio, tabela, bloco, linhas)
+    else:
+        sem_checagens = fase in FASES_SEM_CHECAGENS and connection.vendor == 'mysql'
+        with transaction.atomic(), connection.cursor() as cursor:
+            if sem_checagens:
+                # Consistentes por construção; sem as checagens a carga é bem mais rápida
+                cursor.execute('SET SESSION foreign_key_checks = 0, unique_checks = 0')
+            try:
+                for tabela, linhas in zip(tabelas, resultado):
+                    _inserir(cursor, tabela, linhas, lote)
+            finally:
+                # A conexão pode ser reaproveitada: as checagens voltam mesmo se a carga falhar
+                if sem_checagens:
+                    cursor.execute('SET SESSION foreign_key_checks = 1, unique_checks = 1')
+    return sum(len(linhas) for linhas in resultado)
+
+
+def blocos(parametros, fase):
+    return -(-parametros['quantidades'][fase] // TAMANHO_BLOCO)
+
+
+def gravar_cadastros(parametros, lote=1000, diretorio=None):
+    """Categorias e fornecedores novos (poucas linhas, gravados pelo processo principal)"""
+    linhas = {'categorias': _novas_categorias(parametros), 'fornecedores': _novos_fornecedores(parametros)}
+    if diretorio:
+        for tabela, dados in linhas.items():
+            _escrever(diretorio, tabela, 0, dados)
+    else:
+        with transaction.atomic(), connection.cursor() as cursor:
+            for tabela, dados in linhas.items():
+                _inserir(cursor, tabela, dados, lote)
+    return sum(len(dados) for dados in linhas.values())
+
+
+def _inicializar_processo():
+    django.setup()
+
+
+def _executar_tarefa(tarefa):
+    return tarefa[1], gravar_bloco(*tarefa)
+
+
+def executar_fases(parametros, fases, processos=1, lote=1000, diretorio=None, ao_concluir=None):
+    """
+    Executa os blocos das fases (na ordem dada; as fases de uma mesma tupla
+    rodam juntas). ao_concluir(fase, linhas) é chamado a cada bloco gravado.
+    """
+    if 'vendas' in [fase for grupo in fases for fase in grupo]:
+        # Calculado antes de criar os processos: com fork eles herdam o catálogo pronto
+        catalogo(parametros)
+    if processos > 1:
+        # Conexões abertas não podem ser herdadas pelos processos filhos
+        connections.close_all()
+        contexto = get_context()
+        with contexto.Pool(processos, initializer=_inicializar_processo) as pool:
+            for grupo in fases:
+                tarefas = [(parametros, fase, bloco, lote, diretorio)
+                           for fase in grupo for bloco in range(blocos(parametros, fase))]
+                for fase, linhas in pool.imap_unordered(_executar_tarefa, tarefas):
+                    if ao_concluir:
+                        ao_concluir(fase, linhas)
+    else:
+        for grupo in fases:
+            for fase in grupo:
+                for bloco in range(blocos(parametros, fase)):
+                    linhas = gravar_bloco(parametros, fase, bloco, lote, diretorio)
+                    if ao_concluir:
+                        ao_concluir(fase, linhas)
+
+
+def finalizar():
+    """Recalcula os resumos e invalida os caches depois de uma carga feita fora das DAOs"""
+    ResumoDAO.reconstruir()
+    ResumoDiarioDAO.reconstruir()
+    for tabela in ('categorias', 'produtos', 'clientes', 'estoque', 'vendas'):
+        versoes.incrementar(tabela)
+    CategoriaDAO.cache.invalidar()
+
+
+def script_carga(diretorio):
+    """Script SQL com um LOAD DATA LOCAL INFILE por arquivo gerado, na ordem das chaves estrangeiras"""
+    comandos = ['USE loja_lingerie;', 'SET foreign_key_checks = 0;', 'SET unique_checks = 0;']
+    for tabela in ('categorias', 'fornecedores', 'produtos', 'estoque', 'clientes', 'vendas', 'itens_venda'):
+        pasta = os.path.join(diretorio, tabela)
+        if not os.path.isdir(pasta):
+            continue
+        for nome in sorted(os.listdir(pasta)):
+            caminho = os.path.abspath(os.path.join(pasta, nome)).replace('\\', '/')
+            comandos.append(
+                f"LOAD DATA LOCAL INFILE '{caminho}' INTO TABLE {tabela} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(COLUNAS[tabela])});"
+            )
+    comandos += ['SET unique_checks = 1;', 'SET foreign_key_checks = 1;']
+    return '\n'.join(comandos) + '\n'
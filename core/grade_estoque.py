@@ -0,0 +1,57 @@
+"""
+Grade de estoque (tamanho × cor) dos produtos de uma página.
+
+As variações de todos os produtos vêm de uma única consulta
+(EstoqueDAO.listar_por_produtos) e são distribuídas aqui, em memória, numa
+matriz por produto: uma linha por cor e uma coluna por tamanho.
+"""
+from .dao import EstoqueDAO
+
+# Ordem das colunas; tamanhos fora da lista vêm depois, em ordem alfabética
+ORDEM_TAMANHOS = {
+    tamanho: posicao for posicao, tamanho in enumerate(
+        ('PP', 'P', 'M', 'G', 'GG', 'XG', '36', '38', '40', '42', '44', '46', '48', '50')
+    )
+}
+
+
+def _chave_tamanho(tamanho):
+    return ORDEM_TAMANHOS.get(tamanho, len(ORDEM_TAMANHOS)), tamanho
+
+
+class Grade:
+    """
+    Estoque de um produto: `tamanhos` são as colunas e `linhas` os pares
+    (cor, células), com a variação de cada tamanho ou None se ela não existir
+    """
+
+    def __init__(self, produto, tamanhos, linhas, total):
+        self.produto = produto
+        self.tamanhos = tamanhos
+        self.linhas = linhas
+        self.total = total
+
+
+def montar(produtos, variacoes):
+    """Uma Grade por produto, na ordem de `produtos` (sem variações, a grade fica vazia)"""
+    por_produto = {}
+    for variacao in variacoes:
+        por_produto.setdefault(variacao.id_produto, []).append(variacao)
+
+    grades = []
+    for produto in produtos:
+        itens = por_produto.get(produto.id_produto, ())
+        tamanhos = sorted({variacao.tamanho for variacao in itens}, key=_chave_tamanho)
+        coluna = {tamanho: i for i, tamanho in enumerate(tamanhos)}
+        celulas = {}
+        for variacao in itens:
+            celulas.setdefault(variacao.cor, [None] * len(tamanhos))[coluna[variacao.tamanho]] = variacao
+        total = sum(variacao.quantidade for variacao in itens)
+        grades.append(Grade(produto, tamanhos, sorted(celulas.items()), total))
+    return grades
+
+
+def grades_da_pagina(pagina):
+    """Grades dos produtos de uma página de ProdutoDAO.listar_pagina"""
+    variacoes = EstoqueDAO.listar_por_produtos([produto.id_produto for produto in pagina.itens])
+    return montar(pagina.itens, variacoes)
@@ -0,0 +1,187 @@
+"""
+Importação em massa de produtos e clientes a partir de arquivos CSV.
+
+As linhas são validadas e agrupadas em lotes; cada lote é gravado com um
+único INSERT multi-linha dentro de uma transação; se o lote falhar, as
+linhas são gravadas uma a uma para que só as ruins sejam rejeitadas. Para
+clientes, os CPFs do lote são conferidos no banco com uma só consulta (em
+vez de um buscar_por_cpf por linha).
+"""
+import csv
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+
+from .dao import ProdutoDAO, ClienteDAO
+from .models import Cliente
+
+VALORES_VERDADEIROS = {'1', 'true', 'sim', 's', 'ativo', 'ativa', 'x'}
+
+# Tamanho das colunas VARCHAR em loja_lingerie.sql
+TAMANHOS = {'nome_produto': 100, 'marca': 50, 'nome_cliente': 100, 'email': 100, 'telefone': 20}
+
+# DECIMAL(10,2) dos preços
+PRECO_MAXIMO = Decimal('99999999.99')
+
+
+class RelatorioImportacao:
+    """
+    Resultado de uma importação: quantas linhas entraram e o erro de cada linha rejeitada
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.inseridos = 0
+        self.erros = []
+
+    def erro(self, linha, mensagem):
+        self.erros.append({'linha': linha, 'erro': mensagem})
+
+
+def ler_csv(arquivo):
+    """Lê um CSV (separado por vírgula ou ponto e vírgula) como dicionários"""
+    amostra = arquivo.read(4096)
+    arquivo.seek(0)
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=',;')
+    except csv.Error:
+        dialeto = csv.excel
+    return csv.DictReader(arquivo, dialect=dialeto)
+
+
+def _texto(linha, campo):
+    valor = (linha.get(campo) or '').strip()
+    if campo in TAMANHOS and len(valor) > TAMANHOS[campo]:
+        raise ValueError(f'{campo} maior que {TAMANHOS[campo]} caracteres')
+    return valor
+
+
+def _ativo(linha):
+    valor = _texto(linha, 'ativo').lower()
+    return valor in VALORES_VERDADEIROS if valor else True
+
+
+def _preco(linha, campo):
+    try:
+        valor = Decimal(_texto(linha, campo).replace(',', '.'))
+    except InvalidOperation:
+        raise ValueError(f'{campo} inválido')
+    if not valor.is_finite():
+        raise ValueError(f'{campo} inválido')
+    if valor < 0:
+        raise ValueError(f'{campo} não pode ser negativo')
+    if valor > PRECO_MAXIMO:
+        raise ValueError(f'{campo} maior que {PRECO_MAXIMO}')
+    return valor
+
+
+def _validar_produto(linha):
+    nome = _texto(linha, 'nome_produto')
+    if not nome:
+        raise ValueError('nome_produto é obrigatório')
+    return {
+        'nome_produto': nome,
+        'marca': _texto(linha, 'marca'),
+        'preco_custo': _preco(linha, 'preco_custo'),
+        'preco_venda': _preco(linha, 'preco_venda'),
+        'ativo': _ativo(linha),
+    }
+
+
+def _validar_cliente(linha):
+    nome = _texto(linha, 'nome_cliente')
+    if not nome:
+        raise ValueError('nome_cliente é obrigatório')
+    cpf = _texto(linha, 'cpf')
+    if not Cliente.validar_cpf(cpf):
+        raise ValueError('CPF inválido')
+    return {
+        'nome_cliente': nome,
+        'cpf': cpf,
+        'email': _texto(linha, 'email'),
+        'telefone': _texto(linha, 'telefone'),
+        'ativo': _ativo(linha),
+    }
+
+
+def _gravar_lote(lote, inserir, relatorio):
+    """
+    Grava o lote numa transação; se falhar, grava linha a linha e rejeita
+    só as que o banco recusar
+    """
+    if not lote:
+        return
+    try:
+        _inserir_atomico(inserir, [registro for _, registro in lote])
+    except Exception:
+        for numero, registro in lote:
+            try:
+                _inserir_atomico(inserir, [registro])
+            except Exception as e:
+                relatorio.erro(numero, f'Erro ao gravar: {e}')
+            else:
+                relatorio.inseridos += 1
+    else:
+        relatorio.inseridos += len(lote)
+
+
+def _inserir_atomico(inserir, registros):
+    with transaction.atomic():
+        inserir(registros)
+
+
+def _importar(linhas, validar, gravar, tamanho_lote):
+    if tamanho_lote is None:
+        tamanho_lote = getattr(settings, 'IMPORTACAO_TAMANHO_LOTE', 500)
+    relatorio = RelatorioImportacao()
+    lote = []
+    # Linha 1 é o cabeçalho do CSV
+    for numero, linha in enumerate(linhas, start=2):
+        relatorio.total += 1
+        try:
+            lote.append((numero, validar(linha)))
+        except ValueError as e:
+            relatorio.erro(numero, str(e))
+            continue
+        if len(lote) >= tamanho_lote:
+            gravar(lote, relatorio)
+            lote = []
+    gravar(lote, relatorio)
+    relatorio.erros.sort(key=lambda erro: erro['linha'])
+    return relatorio
+
+
+def importar_produtos(linhas, tamanho_lote=None):
+    """Importa produtos a partir de dicionários (ex.: um csv.DictReader)"""
+    def gravar(lote, relatorio):
+        _gravar_lote(lote, ProdutoDAO.criar_em_lote, relatorio)
+
+    return _importar(linhas, _validar_produto, gravar, tamanho_lote)
+
+
+def importar_clientes(linhas, tamanho_lote=None):
+    """Importa clientes a partir de dicionários, rejeitando CPFs repetidos"""
+    vistos = set()
+
+    def gravar(lote, relatorio):
+        existentes = ClienteDAO.buscar_por_cpfs(registro['cpf'] for _, registro in lote)
+        novos = []
+        for numero, registro in lote:
+            cpf = Cliente.normalizar_cpf(registro['cpf'])
+            if cpf in existentes:
+                relatorio.erro(numero, 'CPF já cadastrado')
+            elif cpf in vistos:
+                relatorio.erro(numero, 'CPF repetido no arquivo')
+            else:
+                vistos.add(cpf)
+                novos.append((numero, registro))
+        _gravar_lote(novos, ClienteDAO.criar_em_lote, relatorio)
+
+    return _importar(linhas, _validar_cliente, gravar, tamanho_lote)
+
+
+IMPORTADORES = {
+    'produtos': importar_produtos,
+    'clientes': importar_clientes,
+}
@@ -0,0 +1,107 @@
+import random
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.dao import ResumoDiarioDAO, VendaDAO
+from core.relatorios import AGRUPAMENTOS, fim_periodo, inicio_periodo, receita
+
+
+class Command(BaseCommand):
+    help = 'Atualiza o resumo diário de faturamento (por padrão só os dias alterados desde a última execução)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--completo', action='store_true',
+                            help='Recalcula todos os dias a partir de vendas')
+        parser.add_argument('--desde', type=date.fromisoformat, default=None,
+                            help='Recalcula todos os dias a partir de AAAA-MM-DD (ex.: após carga externa de vendas)')
+        parser.add_argument('--verificar', type=int, default=0, metavar='N',
+                            help='Depois de atualizar, confere N intervalos aleatórios contra a soma direta em vendas')
+        parser.add_argument('--semente', type=int, default=None,
+                            help='Semente dos intervalos aleatórios da verificação')
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        if options['completo'] or options['desde']:
+            ResumoDiarioDAO.reconstruir(options['desde'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Resumo diário recalculado em {time.perf_counter() - inicio:.2f}s'
+            ))
+        else:
+            dias = ResumoDiarioDAO.atualizar_pendentes()
+            self.stdout.write(self.style.SUCCESS(
+                f'{len(dias)} dia(s) atualizado(s) em {time.perf_counter() - inicio:.2f}s'
+            ))
+
+        if options['verificar']:
+            self._verificar(options['verificar'], random.Random(options['semente']))
+
+    def _verificar(self, quantidade, sorteio):
+        """Compara relatorios.receita com SUMs feitos direto em vendas, período a período"""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT MIN(data_venda), MAX(data_venda) FROM vendas")
+            minimo, maximo = cursor.fetchone()
+        if minimo is None:
+            self.stdout.write('Sem vendas para verificar')
+            return
+        if isinstance(minimo, str):
+            minimo, maximo = datetime.fromisoformat(minimo), datetime.fromisoformat(maximo)
+        minimo = datetime.combine(minimo.date() - timedelta(days=1), datetime.min.time())
+        segundos = int((maximo - minimo).total_seconds()) + 2 * 86400
+
+        erros = []
+        for _ in range(quantidade):
+            a, b = sorted(sorteio.randrange(segundos) for _ in range(2))
+            b += 1
+            if sorteio.random() < 0.3:
+                # Também intervalos alinhados à meia-noite (só dias inteiros)
+                a, b = a - a % 86400, b - b % 86400 + 86400
+            inicio, fim = minimo + timedelta(seconds=a), minimo + timedelta(seconds=b)
+            agrupamento = sorteio.choice(AGRUPAMENTOS)
+            forma = sorteio.choice((None,) + VendaDAO.FORMAS_PAGAMENTO)
+
+            obtido = {periodo['periodo']: periodo for periodo in receita(inicio, fim, agrupamento, forma)}
+            esperado = self._esperado(inicio, fim, agrupamento, forma)
+            if set(obtido) != set(esperado):
+                erros.append(f'{inicio} a {fim} ({agrupamento}, {forma}): períodos diferentes')
+                continue
+            for periodo, valores in esperado.items():
+                atual = tuple(obtido[periodo][campo] for campo in ('num_vendas', 'valor_subtotal', 'desconto', 'valor_total'))
+                if atual != valores:
+                    erros.append(f'{inicio} a {fim} ({agrupamento}, {forma}) {periodo}: {atual} != {valores}')
+
+        if erros:
+            raise CommandError('Resumo diário divergente:\n' + '\n'.join(erros))
+        self.stdout.write(self.style.SUCCESS(f'{quantidade} intervalos conferidos com vendas'))
+
+    @staticmethod
+    def _esperado(inicio, fim, agrupamento, forma):
+        """Totais por período somados direto em vendas, sem passar pelo resumo"""
+        esperado = {}
+        periodo = inicio_periodo(inicio.date(), agrupamento)
+        with connection.cursor() as cursor:
+            while datetime.combine(periodo, datetime.min.time()) < fim:
+                proximo = fim_periodo(periodo, agrupamento)
+                sql = """
+                    SELECT COUNT(*), SUM(valor_subtotal), SUM(desconto), SUM(valor_total)
+                    FROM vendas
+                    WHERE status_venda = 'Concluída' AND data_venda >= %s AND data_venda < %s
+                """
+                params = [
+                    max(inicio, datetime.combine(periodo, datetime.min.time())),
+                    min(fim, datetime.combine(proximo, datetime.min.time())),
+                ]
+                if forma:
+                    sql += " AND forma_pagamento = %s"
+                    params.append(forma)
+                cursor.execute(sql, params)
+                num_vendas, subtotal, desconto, total = cursor.fetchone()
+                if num_vendas:
+                    esperado[periodo] = (num_vendas,) + tuple(
+                        Decimal(str(valor)).quantize(Decimal('0.01')) for valor in (subtotal, desconto, total)
+                    )
+                periodo = proximo
+        return esperado
@@ -0,0 +1,111 @@
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from core.dao import VendaDAO, EstoqueInsuficiente
+
+
+class Command(BaseCommand):
+    help = (
+        'Dispara vendas concorrentes contra poucos itens de estoque, mede vendas/s '
+        'e confere que nenhum item foi vendido além do disponível'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clientes', type=int, default=8, help='Threads vendendo em paralelo')
+        parser.add_argument('--vendas', type=int, default=50, help='Vendas tentadas por thread')
+        parser.add_argument('--itens', type=int, default=5, help='Quantos itens de estoque disputar')
+        parser.add_argument('--estoque', type=int, default=100, help='Quantidade inicial de cada item')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--manter', action='store_true',
+                            help='Mantém as vendas geradas (por padrão vendas e estoque são restaurados)')
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT id_estoque, quantidade FROM estoque ORDER BY id_estoque LIMIT %s',
+                           [options['itens']])
+            originais = dict(cursor.fetchall())
+            if not originais:
+                raise CommandError('Nenhum item de estoque cadastrado')
+            ids = sorted(originais)
+            cursor.execute(
+                f"UPDATE estoque SET quantidade = %s WHERE id_estoque IN ({', '.join(['%s'] * len(ids))})",
+                [options['estoque']] + ids
+            )
+
+        vendas = []
+        recusadas = []
+        lock = threading.Lock()
+        largada = threading.Barrier(options['clientes'])
+
+        def cliente(numero):
+            rng = random.Random(options['seed'] + numero)
+            try:
+                largada.wait()
+                for _ in range(options['vendas']):
+                    carrinho = [(i, rng.randint(1, 3)) for i in rng.sample(ids, rng.randint(1, len(ids)))]
+                    try:
+                        id_venda = VendaDAO.criar(None, carrinho, 'PIX')
+                    except EstoqueInsuficiente:
+                        with lock:
+                            recusadas.append(numero)
+                    else:
+                        with lock:
+                            vendas.append(id_venda)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=cliente, args=(n,)) for n in range(options['clientes'])]
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duracao = time.perf_counter() - inicio
+
+        marcadores = ', '.join(['%s'] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT id_estoque, quantidade FROM estoque WHERE id_estoque IN ({marcadores})', ids)
+            finais = dict(cursor.fetchall())
+            vendido = dict.fromkeys(ids, 0)
+            if vendas:
+                cursor.execute(
+                    f"""
+                    SELECT id_estoque, SUM(quantidade) FROM itens_venda
+                    WHERE id_venda IN ({', '.join(['%s'] * len(vendas))})
+                    GROUP BY id_estoque
+                    """,
+                    vendas
+                )
+                vendido.update((id_estoque, int(total)) for id_estoque, total in cursor.fetchall())
+
+            if not options['manter']:
+                if vendas:
+                    # Cancelar antes de apagar tira as vendas dos resumos
+                    for id_venda in vendas:
+                        VendaDAO.cancelar(id_venda)
+                    cursor.execute(
+                        f"DELETE FROM itens_venda WHERE id_venda IN ({', '.join(['%s'] * len(vendas))})", vendas
+                    )
+                    cursor.execute(
+                        f"DELETE FROM vendas WHERE id_venda IN ({', '.join(['%s'] * len(vendas))})", vendas
+                    )
+                for id_estoque, quantidade in originais.items():
+                    cursor.execute('UPDATE estoque SET quantidade = %s WHERE id_estoque = %s',
+                                   [quantidade, id_estoque])
+
+        self.stdout.write(
+            f"{len(vendas)} vendas concluídas e {len(recusadas)} recusadas por falta de estoque "
+            f"em {duracao:.2f}s com {options['clientes']} clientes: {len(vendas) / duracao:.1f} vendas/s"
+        )
+        erros = [
+            f'item {i}: estoque final {finais[i]}, vendido {vendido[i]} de {options["estoque"]}'
+            for i in ids
+            if finais[i] < 0 or options['estoque'] - finais[i] != vendido[i]
+        ]
+        if erros:
+            raise CommandError('Overselling detectado: ' + '; '.join(erros))
+        self.stdout.write(self.style.SUCCESS('Sem overselling: estoque final confere com os itens vendidos'))
@@ -0,0 +1,77 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.importacao import IMPORTADORES
+from core.models import Cliente
+
+
+def _cpf_valido(numero):
+    """Gera um CPF formatado com dígitos verificadores corretos a partir de um número"""
+    base = f'{numero % 10 ** 9:09d}'
+    digitos = base + Cliente.digitos_verificadores(base)
+    return f'{digitos[:3]}.{digitos[3:6]}.{digitos[6:9]}-{digitos[9:]}'
+
+
+def _linhas_produtos(quantidade, rng):
+    for i in range(quantidade):
+        custo = rng.randint(1000, 9000) / 100
+        yield {
+            'nome_produto': f'Produto Benchmark {i}',
+            'marca': rng.choice(['Hope', 'Valisere', 'Triumph', 'Lupo']),
+            'preco_custo': str(custo),
+            'preco_venda': str(round(custo * 2.5, 2)),
+            'ativo': '1',
+        }
+
+
+def _linhas_clientes(quantidade, rng):
+    inicio = rng.randint(10 ** 8, 9 * 10 ** 8)
+    for i in range(quantidade):
+        yield {
+            'nome_cliente': f'Cliente Benchmark {i}',
+            'cpf': _cpf_valido(inicio + i),
+            'email': f'cliente{i}@exemplo.com',
+            'telefone': '(11) 99999-0000',
+            'ativo': '1',
+        }
+
+
+GERADORES = {
+    'produtos': _linhas_produtos,
+    'clientes': _linhas_clientes,
+}
+
+
+class Command(BaseCommand):
+    help = 'Mede a vazão (linhas/s) da importação em massa para diferentes tamanhos de lote'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entidade', choices=sorted(IMPORTADORES), default='clientes')
+        parser.add_argument('--linhas', type=int, default=10000)
+        parser.add_argument('--lotes', default='1,100,500,1000',
+                            help='Tamanhos de lote separados por vírgula')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--manter', action='store_true',
+                            help='Mantém as linhas inseridas (por padrão tudo é desfeito)')
+
+    def handle(self, *args, **options):
+        importar = IMPORTADORES[options['entidade']]
+        gerar = GERADORES[options['entidade']]
+        linhas = options['linhas']
+
+        self.stdout.write(f"{'lote':>8} {'inseridas':>10} {'segundos':>10} {'linhas/s':>12}")
+        for tamanho_lote in [int(t) for t in options['lotes'].split(',')]:
+            dados = list(gerar(linhas, random.Random(options['seed'])))
+            with transaction.atomic():
+                inicio = time.perf_counter()
+                relatorio = importar(dados, tamanho_lote)
+                duracao = time.perf_counter() - inicio
+                if not options['manter']:
+                    transaction.set_rollback(True)
+            self.stdout.write(
+                f'{tamanho_lote:>8} {relatorio.inseridos:>10} {duracao:>10.3f} '
+                f'{relatorio.inseridos / duracao:>12.0f}'
+            )
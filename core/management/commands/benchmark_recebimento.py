@@ -0,0 +1,122 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.dao import CompraDAO
+
+
+class Command(BaseCommand):
+    help = (
+        'Cria compras com milhares de itens, mede o recebimento (entrada no estoque em um único '
+        'upsert) e confere o estoque final e que receber de novo não soma duas vezes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--compras', type=int, default=3, help='Compras recebidas')
+        parser.add_argument('--linhas', type=int, default=10000, help='Itens por compra')
+        parser.add_argument('--novas', type=float, default=0.1,
+                            help='Fração dos itens em variações que ainda não existem no estoque')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--manter', action='store_true',
+                            help='Mantém compras e estoque (por padrão o estoque é restaurado)')
+
+    def handle(self, *args, **options):
+        if options['compras'] < 1 or options['linhas'] < 1:
+            raise CommandError('--compras e --linhas devem ser positivos')
+        rng = random.Random(options['seed'])
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT MIN(id_fornecedor) FROM fornecedores')
+            id_fornecedor = cursor.fetchone()[0]
+            cursor.execute('SELECT id_produto, tamanho, cor FROM estoque ORDER BY id_estoque LIMIT %s',
+                           [options['linhas']])
+            variacoes = cursor.fetchall()
+        if id_fornecedor is None or not variacoes:
+            raise CommandError('Cadastre fornecedores e estoque antes (ex.: manage.py gerar_dados)')
+
+        compras, esperado = [], {}
+        inicio = time.perf_counter()
+        for numero in range(options['compras']):
+            itens = []
+            for linha in range(options['linhas']):
+                if rng.random() < options['novas']:
+                    id_produto, tamanho = rng.choice(variacoes)[:2]
+                    cor = f'Benchmark {numero}-{linha % 50}'
+                else:
+                    id_produto, tamanho, cor = rng.choice(variacoes)
+                quantidade = rng.randint(1, 20)
+                itens.append((id_produto, tamanho, cor, quantidade, '10.00'))
+                chave = (id_produto, tamanho, cor)
+                esperado[chave] = esperado.get(chave, 0) + quantidade
+            compras.append(CompraDAO.criar(id_fornecedor, itens, 'benchmark_recebimento'))
+        criacao = time.perf_counter() - inicio
+
+        antes = self._quantidades(esperado)
+
+        duracoes = []
+        for id_compra in compras:
+            t0 = time.perf_counter()
+            if CompraDAO.receber(id_compra) is not True:
+                raise CommandError(f'A compra {id_compra} não foi recebida')
+            duracoes.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        repetidas = [CompraDAO.receber(id_compra) for id_compra in compras]
+        repeticao = time.perf_counter() - t0
+
+        depois = self._quantidades(esperado)
+        erros = [
+            f'{chave}: antes {antes.get(chave, 0)}, recebido {quantidade}, final {depois.get(chave)}'
+            for chave, quantidade in esperado.items()
+            if depois.get(chave) != antes.get(chave, 0) + quantidade
+        ]
+
+        if not options['manter']:
+            with connection.cursor() as cursor:
+                for chave in esperado:
+                    if chave in antes:
+                        cursor.execute(
+                            'UPDATE estoque SET quantidade = %s WHERE id_produto = %s AND tamanho = %s AND cor = %s',
+                            [antes[chave], *chave]
+                        )
+                    else:
+                        cursor.execute('DELETE FROM estoque WHERE id_produto = %s AND tamanho = %s AND cor = %s',
+                                       list(chave))
+                marcadores = ', '.join(['%s'] * len(compras))
+                cursor.execute(f'DELETE FROM itens_compra WHERE id_compra IN ({marcadores})', compras)
+                cursor.execute(f'DELETE FROM compras WHERE id_compra IN ({marcadores})', compras)
+
+        linhas = options['linhas']
+        total = sum(duracoes)
+        self.stdout.write(
+            f"{len(compras)} compras de {linhas} itens ({len(esperado)} variações, "
+            f"{len(esperado) - len(antes)} novas) criadas em {criacao:.2f}s"
+        )
+        self.stdout.write(
+            f"Recebimento: {total / len(compras) * 1000:.1f} ms por compra, "
+            f"{linhas * len(compras) / total:,.0f} itens/s; receber de novo: "
+            f"{repeticao / len(compras) * 1000:.2f} ms por compra"
+        )
+        if any(repetidas):
+            erros.append('receber de novo atualizou o estoque')
+        if erros:
+            raise CommandError('Estoque divergente: ' + '; '.join(erros[:10]))
+        self.stdout.write(self.style.SUCCESS('Estoque final confere com os itens recebidos, sem soma duplicada'))
+
+    @staticmethod
+    def _quantidades(chaves):
+        """Quantidade atual de cada (id_produto, tamanho, cor) que existe no estoque"""
+        quantidades = {}
+        ids = sorted({chave[0] for chave in chaves})
+        with connection.cursor() as cursor:
+            for inicio in range(0, len(ids), 1000):
+                lote = ids[inicio:inicio + 1000]
+                cursor.execute(
+                    f"SELECT id_produto, tamanho, cor, quantidade FROM estoque "
+                    f"WHERE id_produto IN ({', '.join(['%s'] * len(lote))})",
+                    lote
+                )
+                for id_produto, tamanho, cor, quantidade in cursor.fetchall():
+                    if (id_produto, tamanho, cor) in chaves:
+                        quantidades[(id_produto, tamanho, cor)] = quantidade
+        return quantidades
@@ -0,0 +1,72 @@
+import gc
+import time
+import tracemalloc
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+
+from core.registros import mapear_linhas
+
+COLUNAS = ('id_produto', 'nome_produto', 'marca', 'preco_custo', 'preco_venda', 'ativo', 'margem_lucro')
+
+
+class _CursorFalso:
+    """Imita o cursor.description de um SELECT de produtos"""
+    description = [(coluna,) for coluna in COLUNAS]
+
+
+def _linhas(quantidade):
+    return [
+        (i, f'Produto {i}', 'Hope', Decimal('35.00'), Decimal('89.90'), 1, Decimal('156.86'))
+        for i in range(quantidade)
+    ]
+
+
+def _por_dict(cursor, linhas):
+    columns = [col[0] for col in cursor.description]
+    return [dict(zip(columns, row)) for row in linhas]
+
+
+def _por_registro(cursor, linhas):
+    return mapear_linhas(cursor, linhas)
+
+
+def _medir(funcao, linhas):
+    gc.collect()
+    inicio = time.perf_counter()
+    resultado = funcao(_CursorFalso, linhas)
+    duracao = time.perf_counter() - inicio
+    # Acesso por atributo/chave, como fazem os templates
+    inicio = time.perf_counter()
+    for item in resultado:
+        item['nome_produto']
+    acesso = time.perf_counter() - inicio
+    del resultado
+    gc.collect()
+
+    tracemalloc.start()
+    resultado = funcao(_CursorFalso, linhas)
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del resultado
+    return duracao, acesso, memoria
+
+
+class Command(BaseCommand):
+    help = 'Compara dict(zip(columns, row)) com os registros de core.registros'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', default='10000,100000,1000000',
+                            help='Quantidades de linhas separadas por vírgula')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'linhas':>9} {'método':>9} {'montagem (s)':>13} {'acesso (s)':>11} {'memória (MB)':>13}"
+        )
+        for quantidade in [int(q) for q in options['linhas'].split(',')]:
+            linhas = _linhas(quantidade)
+            for nome, funcao in (('dict', _por_dict), ('registro', _por_registro)):
+                duracao, acesso, memoria = _medir(funcao, linhas)
+                self.stdout.write(
+                    f'{quantidade:>9} {nome:>9} {duracao:>13.3f} {acesso:>11.3f} {memoria / 2 ** 20:>13.1f}'
+                )
@@ -0,0 +1,153 @@
+import asyncio
+import io
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+
+# (rota síncrona, rota assíncrona equivalente)
+ROTAS = (
+    ('/', '/async/'),
+    ('/categorias/', '/async/categorias/'),
+    ('/produtos/', '/async/produtos/'),
+    ('/clientes/', '/async/clientes/'),
+)
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def _resultado(modo, rota, latencias, erros, duracao):
+    return {
+        'modo': modo,
+        'rota': rota,
+        'requisicoes': len(latencias),
+        'erros': erros,
+        'req_s': len(latencias) / duracao if duracao else 0.0,
+        'p50_ms': statistics.median(latencias) * 1000,
+        'p95_ms': _percentil(latencias, 0.95) * 1000,
+        'p99_ms': _percentil(latencias, 0.99) * 1000,
+    }
+
+
+class Command(BaseCommand):
+    help = ('Compara a vazão das views síncronas sob WSGI (servidor com N threads) '
+            'com as views async sob ASGI (N requisições simultâneas no event loop)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requisicoes', type=int, default=500, help='Requisições por rota e modo')
+        parser.add_argument('--concorrencia', type=int, default=64, help='Requisições simultâneas')
+        parser.add_argument('--json', dest='arquivo_json', default=None,
+                            help='Grava os resultados neste arquivo JSON')
+
+    def handle(self, *args, **options):
+        if options['requisicoes'] < 1 or options['concorrencia'] < 1:
+            raise CommandError('--requisicoes e --concorrencia devem ser positivos')
+        wsgi, asgi = WSGIHandler(), ASGIHandler()
+
+        resultados = []
+        for rota_sincrona, rota_assincrona in ROTAS:
+            # Aquecimento: conexões, caches e templates carregados antes de medir
+            self._rodar_wsgi(wsgi, rota_sincrona, options['concorrencia'], options['concorrencia'])
+            asyncio.run(self._rodar_asgi(asgi, rota_assincrona, options['concorrencia'], options['concorrencia']))
+
+            resultados.append(self._rodar_wsgi(wsgi, rota_sincrona, options['requisicoes'], options['concorrencia']))
+            resultados.append(asyncio.run(
+                self._rodar_asgi(asgi, rota_assincrona, options['requisicoes'], options['concorrencia'])
+            ))
+
+        self.stdout.write(
+            f"{options['requisicoes']} requisições por rota, concorrência {options['concorrencia']}, "
+            f"DAO_ASYNC_THREADS={getattr(settings, 'DAO_ASYNC_THREADS', 8)}"
+        )
+        self.stdout.write(f"{'modo':<5} {'rota':<22} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'erros':>6}")
+        for r in resultados:
+            self.stdout.write(
+                f"{r['modo']:<5} {r['rota']:<22} {r['req_s']:>9.1f} {r['p50_ms']:>9.2f} "
+                f"{r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['erros']:>6}"
+            )
+        if options['arquivo_json']:
+            with open(options['arquivo_json'], 'w', encoding='utf-8') as arquivo:
+                json.dump(resultados, arquivo, indent=2)
+        if any(r['erros'] for r in resultados):
+            raise CommandError('Houve respostas com erro')
+
+    @staticmethod
+    def _rodar_wsgi(aplicacao, rota, quantidade, concorrencia):
+        """Simula um servidor WSGI com um pool de `concorrencia` threads"""
+        def requisicao(_):
+            environ = {
+                'REQUEST_METHOD': 'GET', 'PATH_INFO': rota, 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+                'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': 'localhost', 'wsgi.url_scheme': 'http', 'wsgi.input': io.BytesIO(),
+                'wsgi.errors': io.StringIO(), 'wsgi.multithread': True, 'wsgi.multiprocess': False,
+                'wsgi.run_once': False, 'wsgi.version': (1, 0),
+            }
+            status = []
+            inicio = time.perf_counter()
+            resposta = aplicacao(environ, lambda s, cabecalhos, exc_info=None: status.append(s))
+            try:
+                for _ in resposta:
+                    pass
+            finally:
+                resposta.close()
+            return time.perf_counter() - inicio, not status[0].startswith('200')
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concorrencia) as pool:
+            medidas = list(pool.map(requisicao, range(quantidade)))
+        duracao = time.perf_counter() - inicio
+        return _resultado('wsgi', rota, [m[0] for m in medidas], sum(m[1] for m in medidas), duracao)
+
+    @staticmethod
+    async def _rodar_asgi(aplicacao, rota, quantidade, concorrencia):
+        """Mantém `concorrencia` requisições em andamento no event loop"""
+        escopo = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+            'scheme': 'http', 'path': rota, 'raw_path': rota.encode(), 'query_string': b'',
+            'root_path': '', 'headers': [(b'host', b'localhost')],
+            'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+        }
+        fila = asyncio.Queue()
+        for numero in range(quantidade):
+            fila.put_nowait(numero)
+        medidas = []
+
+        async def requisicao():
+            corpo_enviado = False
+            desconectar = asyncio.Event()
+            status = []
+
+            async def receive():
+                nonlocal corpo_enviado
+                if not corpo_enviado:
+                    corpo_enviado = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                await desconectar.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(mensagem):
+                if mensagem['type'] == 'http.response.start':
+                    status.append(mensagem['status'])
+
+            inicio = time.perf_counter()
+            await aplicacao(dict(escopo), receive, send)
+            desconectar.set()
+            medidas.append((time.perf_counter() - inicio, status[0] != 200))
+
+        async def trabalhador():
+            while not fila.empty():
+                fila.get_nowait()
+                await requisicao()
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+        duracao = time.perf_counter() - inicio
+        return _resultado('asgi', rota, [m[0] for m in medidas], sum(m[1] for m in medidas), duracao)
@@ -0,0 +1,43 @@
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import tarefas
+
+
+class Command(BaseCommand):
+    help = (
+        'Trabalhador da fila de tarefas em segundo plano (exportações e relatórios pesados): '
+        'reserva as pendentes e as executa num pool de threads. Vários processos podem rodar juntos.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concorrencia', type=int, default=None,
+                            help='Tarefas simultâneas neste processo (padrão: TAREFAS_CONCORRENCIA)')
+        parser.add_argument('--tipos', nargs='*', default=None,
+                            help=f"Só estes tipos ({', '.join(sorted(tarefas.TIPOS))})")
+        parser.add_argument('--intervalo', type=float, default=1.0,
+                            help='Segundos entre as consultas à fila e os sinais de progresso')
+        parser.add_argument('--ate-esvaziar', action='store_true',
+                            help='Sai quando não houver tarefa pronta para rodar (ex.: cron)')
+
+    def handle(self, *args, **options):
+        if options['concorrencia'] is not None and options['concorrencia'] < 1:
+            raise CommandError('--concorrencia deve ser positivo')
+        if options['intervalo'] <= 0:
+            raise CommandError('--intervalo deve ser positivo')
+        if not logging.getLogger('core.tarefas').hasHandlers():
+            logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+        try:
+            trabalhador = tarefas.Trabalhador(options['concorrencia'], options['tipos'], options['intervalo'])
+        except ValueError as erro:
+            raise CommandError(str(erro))
+        self.stdout.write(
+            f'Trabalhador {trabalhador.nome}: {trabalhador.concorrencia} tarefa(s) simultânea(s), '
+            f"tipos {', '.join(trabalhador.tipos)}"
+        )
+        try:
+            executadas = trabalhador.rodar(options['ate_esvaziar'])
+        except KeyboardInterrupt:
+            executadas = trabalhador.executadas
+        self.stdout.write(self.style.SUCCESS(f'{executadas} tarefa(s) executada(s)'))
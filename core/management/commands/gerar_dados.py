@@ -0,0 +1,73 @@
+import os
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import gerador
+
+
+class Command(BaseCommand):
+    help = ('Gera dados sintéticos realistas (categorias, fornecedores, produtos com grade de estoque, '
+            'clientes com CPF válido e vendas com itens), de forma determinística pela semente')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--categorias', type=int, default=0)
+        parser.add_argument('--fornecedores', type=int, default=0)
+        parser.add_argument('--produtos', type=int, default=1000)
+        parser.add_argument('--clientes', type=int, default=10000)
+        parser.add_argument('--vendas', type=int, default=100000)
+        parser.add_argument('--dias', type=int, default=730, help='Período das vendas, terminando em --data-fim')
+        parser.add_argument('--data-fim', type=date.fromisoformat, default=None,
+                            help='Último dia das vendas (AAAA-MM-DD, padrão: hoje)')
+        parser.add_argument('--semente', type=int, default=42)
+        parser.add_argument('--processos', type=int, default=os.cpu_count() or 1,
+                            help='Processos gerando blocos em paralelo (não altera os dados gerados)')
+        parser.add_argument('--lote', type=int, default=1000, help='Linhas por INSERT multi-linha')
+        parser.add_argument('--arquivos', default=None, metavar='DIR',
+                            help='Grava TSVs e DIR/carregar.sql (LOAD DATA LOCAL INFILE) em vez de inserir')
+
+    def handle(self, *args, **options):
+        quantidades = [options[chave] for chave in ('categorias', 'fornecedores', 'produtos', 'clientes', 'vendas')]
+        if min(quantidades) < 0 or options['dias'] < 1 or options['processos'] < 1 or options['lote'] < 1:
+            raise CommandError('Quantidades não podem ser negativas; --dias, --processos e --lote devem ser positivos')
+        parametros = gerador.preparar(options['semente'], *quantidades, dias=options['dias'],
+                                      data_fim=options['data_fim'])
+        if options['produtos'] and not gerador.todas_categorias(parametros):
+            raise CommandError('Não há categorias: use --categorias')
+        if options['produtos'] and not gerador.todos_fornecedores(parametros):
+            raise CommandError('Não há fornecedores: use --fornecedores')
+
+        inicio = time.perf_counter()
+        totais = {}
+
+        def ao_concluir(fase, linhas):
+            totais[fase] = totais.get(fase, 0) + linhas
+            self.stdout.write(f'  {fase}: {totais[fase]} linhas', ending='\r')
+            self.stdout.flush()
+
+        diretorio = options['arquivos']
+        totais['cadastros'] = gerador.gravar_cadastros(parametros, options['lote'], diretorio)
+        # Produtos e clientes não dependem entre si; as vendas precisam dos dois
+        gerador.executar_fases(parametros, (('produtos', 'clientes'), ('vendas',)), options['processos'],
+                               options['lote'], diretorio, ao_concluir)
+        self.stdout.write('')
+        geracao = time.perf_counter() - inicio
+        total = sum(totais.values())
+
+        if diretorio:
+            caminho = os.path.join(diretorio, 'carregar.sql')
+            with open(caminho, 'w', encoding='utf-8') as arquivo:
+                arquivo.write(gerador.script_carga(diretorio))
+            self.stdout.write(self.style.SUCCESS(
+                f'{total} linhas gravadas em {diretorio} em {geracao:.1f}s ({total / geracao:,.0f} linhas/s). '
+                f'Carregue com: mysql --local-infile=1 < {caminho} e depois rode '
+                f'reconstruir_resumos e atualizar_resumo_diario --completo'
+            ))
+            return
+
+        gerador.finalizar()
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} linhas inseridas em {geracao:.1f}s ({total / geracao:,.0f} linhas/s), '
+            f'resumos recalculados em {time.perf_counter() - inicio - geracao:.1f}s'
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.importacao import IMPORTADORES, ler_csv
+
+
+class Command(BaseCommand):
+    help = 'Importa produtos ou clientes em massa a partir de um arquivo CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('entidade', choices=sorted(IMPORTADORES))
+        parser.add_argument('arquivo', help='Caminho do arquivo CSV')
+        parser.add_argument('--lote', type=int, default=None,
+                            help='Linhas por INSERT (padrão: IMPORTACAO_TAMANHO_LOTE)')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['arquivo'], encoding='utf-8-sig', newline='') as arquivo:
+                relatorio = IMPORTADORES[options['entidade']](ler_csv(arquivo), options['lote'])
+        except OSError as e:
+            raise CommandError(f'Erro ao abrir arquivo: {e}')
+
+        for erro in relatorio.erros:
+            self.stderr.write(f"Linha {erro['linha']}: {erro['erro']}")
+        self.stdout.write(self.style.SUCCESS(
+            f'{relatorio.inseridos} de {relatorio.total} linhas importadas '
+            f'({len(relatorio.erros)} rejeitadas)'
+        ))
@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.dao import ResumoDAO
+
+
+class Command(BaseCommand):
+    help = 'Recalcula as tabelas de resumo de vendas a partir do histórico de vendas concluídas'
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        ResumoDAO.reconstruir()
+        self.stdout.write(self.style.SUCCESS(
+            f'Resumos de vendas reconstruídos em {time.perf_counter() - inicio:.2f}s'
+        ))
@@ -0,0 +1,79 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+from core import roteamento
+from core.dao import CategoriaDAO, ProdutoDAO
+
+
+class Command(BaseCommand):
+    help = ('Confere o roteamento das DAOs com a réplica de settings.BANCO_LEITURA: leituras na réplica, '
+            'leia o que escreveu no principal e volta ao principal com a réplica fora do ar. '
+            'Cria e remove uma categoria de teste no banco principal.')
+
+    def handle(self, *args, **options):
+        replica = getattr(settings, 'BANCO_LEITURA', None)
+        if not replica or replica == DEFAULT_DB_ALIAS:
+            raise CommandError('Configure BANCO_LEITURA com o alias da réplica em DATABASES')
+        if not roteamento.saudavel(replica):
+            raise CommandError(f'A réplica {replica!r} não respondeu')
+        self.falhas = 0
+
+        token = roteamento.iniciar_requisicao()
+        try:
+            self._conferir('leitura sem escrita vai para a réplica', replica, ProdutoDAO.listar_pagina)
+            id_categoria = CategoriaDAO.criar('Verificação de roteamento', 'Criada por verificar_roteamento')
+            try:
+                self._conferir('leitura depois de escrita fica no principal', DEFAULT_DB_ALIAS,
+                               lambda: CategoriaDAO.buscar(id_categoria))
+                if not CategoriaDAO.buscar(id_categoria):
+                    self._falhou('a categoria recém-criada não foi lida')
+            finally:
+                CategoriaDAO.deletar(id_categoria)
+        finally:
+            gravou = roteamento.encerrar_requisicao(token)
+        if not gravou:
+            self._falhou('a escrita não marcou a requisição')
+
+        token = roteamento.iniciar_requisicao()
+        try:
+            self._conferir('nova requisição volta para a réplica', replica, ProdutoDAO.listar_pagina)
+        finally:
+            roteamento.encerrar_requisicao(token)
+
+        token = roteamento.iniciar_requisicao(fixar=True)
+        try:
+            self._conferir('requisição com o cookie de escrita recente lê do principal', DEFAULT_DB_ALIAS,
+                           ProdutoDAO.listar_pagina)
+        finally:
+            roteamento.encerrar_requisicao(token)
+
+        roteamento.marcar_indisponivel(replica)
+        try:
+            self._conferir('réplica indisponível: leitura no principal', DEFAULT_DB_ALIAS, ProdutoDAO.listar_pagina)
+        finally:
+            roteamento._saude.pop(replica, None)
+
+        if self.falhas:
+            raise CommandError(f'{self.falhas} verificação(ões) falharam')
+        self.stdout.write(self.style.SUCCESS('Roteamento conferido'))
+
+    def _conferir(self, descricao, esperado, consulta):
+        with ExitStack() as pilha:
+            capturas = {
+                alias: pilha.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in (DEFAULT_DB_ALIAS, settings.BANCO_LEITURA)
+            }
+            consulta()
+        usados = sorted(alias for alias, captura in capturas.items() if len(captura))
+        if usados == [esperado]:
+            self.stdout.write(f'OK     {descricao} ({esperado})')
+        else:
+            self._falhou(f'{descricao}: esperado {esperado}, usou {usados}')
+
+    def _falhou(self, mensagem):
+        self.falhas += 1
+        self.stdout.write(self.style.ERROR(f'FALHOU {mensagem}'))
@@ -0,0 +1,266 @@
+"""
+Métricas de SQL e de latência das views, no formato texto do Prometheus.
+
+Cada conexão recebe um execute_wrapper que cronometra as consultas da
+requisição em andamento (quando ela foi sorteada pela amostragem), e as
+DAOs marcadas com @rotular_dao informam o nome do método por uma
+ContextVar. Fora de uma requisição amostrada o wrapper só repassa a
+chamada. Os contadores são por processo: com vários workers, cada um
+expõe os seus em /metrics.
+"""
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from types import GeneratorType
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# Limites dos buckets do histograma de consultas por requisição
+BUCKETS_CONSULTAS = (1, 2, 5, 10, 20, 50, 100)
+
+FORA_DAO = 'fora_dao'
+
+_metodo_dao = ContextVar('metodo_dao', default=None)
+_coletor = ContextVar('coletor_sql', default=None)
+
+
+# ============================================
+# ROTULAGEM DAS DAOS
+# ============================================
+
+def _percorrer_rotulado(nome, gerador):
+    # Gerador consumido depois que o método retornou (ex.: iterar numa
+    # StreamingHttpResponse): o rótulo vale durante cada passo.
+    while True:
+        token = _metodo_dao.set(nome)
+        try:
+            item = next(gerador)
+        except StopIteration:
+            return
+        finally:
+            _metodo_dao.reset(token)
+        yield item
+
+
+def _rotular(nome, funcao):
+    @wraps(funcao)
+    def rotulada(*args, **kwargs):
+        token = _metodo_dao.set(nome)
+        try:
+            resultado = funcao(*args, **kwargs)
+        finally:
+            _metodo_dao.reset(token)
+        if isinstance(resultado, GeneratorType):
+            return _percorrer_rotulado(nome, resultado)
+        return resultado
+    return rotulada
+
+
+def rotular_dao(classe):
+    """Decorador de classe: as consultas de cada método estático levam o nome Classe.metodo"""
+    for nome, atributo in list(vars(classe).items()):
+        if isinstance(atributo, staticmethod):
+            setattr(classe, nome, staticmethod(_rotular(f'{classe.__name__}.{nome}', atributo.__func__)))
+    return classe
+
+
+# ============================================
+# COLETA POR REQUISIÇÃO
+# ============================================
+
+class ColetorSQL:
+    """Consultas, tempo e linhas de uma requisição, agrupados por método da DAO"""
+
+    def __init__(self):
+        self.consultas = 0
+        self.segundos = 0.0
+        self.linhas = 0
+        self.por_metodo = {}
+        # Views async disparam consultas de várias threads do pool ao mesmo tempo
+        self._trava = threading.Lock()
+
+    def registrar_consulta(self, metodo, duracao):
+        with self._trava:
+            self.consultas += 1
+            self.segundos += duracao
+            acumulado = self.por_metodo.get(metodo)
+            if acumulado is None:
+                self.por_metodo[metodo] = [1, duracao]
+            else:
+                acumulado[0] += 1
+                acumulado[1] += duracao
+
+    def registrar_linhas(self, quantidade):
+        with self._trava:
+            self.linhas += quantidade
+
+
+def iniciar_coleta():
+    """Ativa a coleta no contexto atual; devolve o coletor e o token para encerrar_coleta"""
+    coletor = ColetorSQL()
+    return coletor, _coletor.set(coletor)
+
+
+def encerrar_coleta(token):
+    _coletor.reset(token)
+
+
+def medir(executar, *args):
+    """Executa uma consulta cronometrando-a na coleta em andamento (se houver)"""
+    coletor = _coletor.get()
+    if coletor is None:
+        return executar(*args)
+    inicio = time.perf_counter()
+    try:
+        return executar(*args)
+    finally:
+        coletor.registrar_consulta(_metodo_dao.get() or FORA_DAO, time.perf_counter() - inicio)
+
+
+def metodo_atual():
+    """Nome Classe.metodo da DAO em execução, ou FORA_DAO"""
+    return _metodo_dao.get() or FORA_DAO
+
+
+def contar_linhas(quantidade):
+    """Soma linhas lidas pelas DAOs na coleta em andamento (se houver)"""
+    coletor = _coletor.get()
+    if coletor is not None:
+        coletor.registrar_linhas(quantidade)
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    return medir(execute, sql, params, many, context)
+
+
+def instalar_wrapper(sender, connection, **kwargs):
+    """Receptor de connection_created: instala o cronômetro nas consultas da conexão"""
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+# ============================================
+# REGISTRO DO PROCESSO E EXPOSIÇÃO
+# ============================================
+
+class _Histograma:
+    __slots__ = ('limites', 'contagens', 'soma', 'total')
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.contagens = [0] * len(limites)
+        self.soma = 0
+        self.total = 0
+
+    def observar(self, valor):
+        for i, limite in enumerate(self.limites):
+            if valor <= limite:
+                self.contagens[i] += 1
+                break
+        self.soma += valor
+        self.total += 1
+
+    def linhas(self, nome, rotulos):
+        acumulado = 0
+        for limite, contagem in zip(self.limites, self.contagens):
+            acumulado += contagem
+            yield f'{nome}_bucket{{{rotulos},le="{limite}"}} {acumulado}'
+        yield f'{nome}_bucket{{{rotulos},le="+Inf"}} {self.total}'
+        yield f'{nome}_sum{{{rotulos}}} {self.soma}'
+        yield f'{nome}_count{{{rotulos}}} {self.total}'
+
+
+class Registro:
+    """Acumula as métricas do processo"""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.limpar()
+
+    def limpar(self):
+        with self._trava:
+            self.requisicoes = {}
+            self.latencias = {}
+            self.consultas_por_requisicao = {}
+            self.sql_segundos = {}
+            self.sql_linhas = {}
+            self.dao_consultas = {}
+            self.dao_segundos = {}
+
+    def observar(self, view, status, duracao, coletor=None):
+        with self._trava:
+            chave = (view, status)
+            self.requisicoes[chave] = self.requisicoes.get(chave, 0) + 1
+            if view not in self.latencias:
+                self.latencias[view] = _Histograma(BUCKETS_SEGUNDOS)
+            self.latencias[view].observar(duracao)
+            if coletor is None:
+                return
+            if view not in self.consultas_por_requisicao:
+                self.consultas_por_requisicao[view] = _Histograma(BUCKETS_CONSULTAS)
+            self.consultas_por_requisicao[view].observar(coletor.consultas)
+            self.sql_segundos[view] = self.sql_segundos.get(view, 0.0) + coletor.segundos
+            self.sql_linhas[view] = self.sql_linhas.get(view, 0) + coletor.linhas
+            for metodo, (consultas, segundos) in coletor.por_metodo.items():
+                self.dao_consultas[metodo] = self.dao_consultas.get(metodo, 0) + consultas
+                self.dao_segundos[metodo] = self.dao_segundos.get(metodo, 0.0) + segundos
+
+    def exportar(self):
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)"""
+        with self._trava:
+            saida = [
+                '# HELP loja_requisicoes_total Requisições atendidas por view e status.',
+                '# TYPE loja_requisicoes_total counter',
+            ]
+            saida += [
+                f'loja_requisicoes_total{{view="{view}",status="{status}"}} {total}'
+                for (view, status), total in sorted(self.requisicoes.items())
+            ]
+            saida += [
+                '# HELP loja_requisicao_segundos Latência das requisições por view.',
+                '# TYPE loja_requisicao_segundos histogram',
+            ]
+            for view, histograma in sorted(self.latencias.items()):
+                saida += histograma.linhas('loja_requisicao_segundos', f'view="{view}"')
+            saida += [
+                '# HELP loja_sql_consultas_por_requisicao Consultas SQL por requisição amostrada.',
+                '# TYPE loja_sql_consultas_por_requisicao histogram',
+            ]
+            for view, histograma in sorted(self.consultas_por_requisicao.items()):
+                saida += histograma.linhas('loja_sql_consultas_por_requisicao', f'view="{view}"')
+            saida += [
+                '# HELP loja_sql_segundos_total Tempo em SQL nas requisições amostradas, por view.',
+                '# TYPE loja_sql_segundos_total counter',
+            ]
+            saida += [f'loja_sql_segundos_total{{view="{v}"}} {s}' for v, s in sorted(self.sql_segundos.items())]
+            saida += [
+                '# HELP loja_sql_linhas_total Linhas lidas pelas DAOs nas requisições amostradas, por view.',
+                '# TYPE loja_sql_linhas_total counter',
+            ]
+            saida += [f'loja_sql_linhas_total{{view="{v}"}} {n}' for v, n in sorted(self.sql_linhas.items())]
+            saida += [
+                '# HELP loja_dao_consultas_total Consultas SQL por método da DAO (requisições amostradas).',
+                '# TYPE loja_dao_consultas_total counter',
+            ]
+            saida += [f'loja_dao_consultas_total{{metodo="{m}"}} {n}' for m, n in sorted(self.dao_consultas.items())]
+            saida += [
+                '# HELP loja_dao_segundos_total Tempo em SQL por método da DAO (requisições amostradas).',
+                '# TYPE loja_dao_segundos_total counter',
+            ]
+            saida += [f'loja_dao_segundos_total{{metodo="{m}"}} {s}' for m, s in sorted(self.dao_segundos.items())]
+        return '\n'.join(saida) + '\n'
+
+
+registro = Registro()
+
+
+def server_timing(coletor, duracao):
+    """Valor do cabeçalho Server-Timing: total, SQL e cada método da DAO"""
+    partes = [
+        f'total;dur={duracao * 1000:.2f}',
+        f'db;dur={coletor.segundos * 1000:.2f};desc="{coletor.consultas} consultas, {coletor.linhas} linhas"',
+    ]
+    for metodo, (consultas, segundos) in sorted(coletor.por_metodo.items(), key=lambda item: -item[1][1]):
+        partes.append(f'{metodo};dur={segundos * 1000:.2f};desc="{consultas}x"')
+    return ', '.join(partes)
@@ -0,0 +1,164 @@
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import metricas, orcamento, roteamento
+
+
+class MetricasSQLMiddleware:
+    """
+    Mede a latência de cada view e, nas requisições sorteadas por
+    METRICAS_AMOSTRAGEM, as consultas SQL feitas pelas DAOs. As medidas vão
+    para /metrics e, se METRICAS_SERVER_TIMING estiver ligado, para o
+    cabeçalho Server-Timing da resposta.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.amostragem = getattr(settings, 'METRICAS_AMOSTRAGEM', 1.0)
+        self.server_timing = getattr(settings, 'METRICAS_SERVER_TIMING', True)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _sortear(self):
+        return self.amostragem >= 1 or random.random() < self.amostragem
+
+    def _finalizar(self, request, response, inicio, coletor):
+        duracao = time.perf_counter() - inicio
+        if response.streaming:
+            # As consultas de uma resposta em streaming rodam depois daqui
+            coletor = None
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'nao_encontrada'
+        metricas.registro.observar(view, response.status_code, duracao, coletor)
+        if coletor is not None and self.server_timing:
+            response['Server-Timing'] = metricas.server_timing(coletor, duracao)
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        inicio = time.perf_counter()
+        if not self._sortear():
+            return self._finalizar(request, self.get_response(request), inicio, None)
+        coletor, token = metricas.iniciar_coleta()
+        try:
+            response = self.get_response(request)
+        finally:
+            metricas.encerrar_coleta(token)
+        return self._finalizar(request, response, inicio, coletor)
+
+    async def __acall__(self, request):
+        inicio = time.perf_counter()
+        if not self._sortear():
+            return self._finalizar(request, await self.get_response(request), inicio, None)
+        coletor, token = metricas.iniciar_coleta()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metricas.encerrar_coleta(token)
+        return self._finalizar(request, response, inicio, coletor)
+
+
+class OrcamentoConsultasMiddleware:
+    """
+    Grava as consultas de cada requisição e confere com o @orcamento da view
+    e a detecção de N+1 (core.orcamento). ORCAMENTO_CONSULTAS 'avisar' só
+    registra no log; 'falhar' lança OrcamentoExcedido, o que derruba o teste
+    que fez a requisição. Desligado (None), sai da pilha de middlewares.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.modo = getattr(settings, 'ORCAMENTO_CONSULTAS', None)
+        if self.modo not in ('avisar', 'falhar'):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _conferir(self, request, gravacao):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return
+        encontrados = orcamento.problemas(match.func, gravacao)
+        if not encontrados:
+            return
+        mensagem = f"{match.view_name}: {'; '.join(encontrados)}"
+        if self.modo == 'falhar':
+            raise orcamento.OrcamentoExcedido(mensagem)
+        orcamento.logger.warning(mensagem)
+
+    def _acompanhar(self, request, response, gravacao):
+        if not response.streaming or response.is_async:
+            self._conferir(request, gravacao)
+            return response
+        # As consultas de uma resposta em streaming rodam enquanto ela é lida
+        response.streaming_content = self._percorrer(request, response.streaming_content, gravacao)
+        return response
+
+    def _percorrer(self, request, partes, gravacao):
+        yield from orcamento.continuar(partes, gravacao)
+        self._conferir(request, gravacao)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with orcamento.gravar() as gravacao:
+            response = self.get_response(request)
+        return self._acompanhar(request, response, gravacao)
+
+    async def __acall__(self, request):
+        with orcamento.gravar() as gravacao:
+            response = await self.get_response(request)
+        return self._acompanhar(request, response, gravacao)
+
+
+class RoteamentoBancoMiddleware:
+    """
+    Leia o que escreveu: depois de uma escrita no banco principal, as
+    leituras das DAOs ficam nele até o fim da requisição e, pelo cookie
+    roteamento.COOKIE_PRIMARIO, durante BANCO_LEITURA_FIXAR_SEGUNDOS nas
+    requisições seguintes do mesmo navegador (ex.: o redirect após um POST).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.fixar_segundos = getattr(settings, 'BANCO_LEITURA_FIXAR_SEGUNDOS', 5)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _finalizar(self, response, gravou):
+        if gravou and self.fixar_segundos and getattr(settings, 'BANCO_LEITURA', None):
+            response.set_cookie(roteamento.COOKIE_PRIMARIO, '1', max_age=self.fixar_segundos,
+                                httponly=True, samesite='Lax')
+        return response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = roteamento.iniciar_requisicao(roteamento.COOKIE_PRIMARIO in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            gravou = roteamento.encerrar_requisicao(token)
+        return self._finalizar(response, gravou)
+
+    async def __acall__(self, request):
+        token = roteamento.iniciar_requisicao(roteamento.COOKIE_PRIMARIO in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            gravou = roteamento.encerrar_requisicao(token)
+        return self._finalizar(response, gravou)
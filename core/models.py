@@ -1,5 +1,9 @@
+import re
+
 from django.db import models
 
+_NAO_DIGITOS = re.compile(r'\D')
+
 class Categoria(models.Model):
     """
     Model para representar as categorias de produtos da loja
@@ -55,6 +59,7 @@ class Cliente(models.Model):
     id_cliente = models.AutoField(primary_key=True)
     nome_cliente = models.CharField(max_length=100, verbose_name='Nome Completo')
     cpf = models.CharField(max_length=14, unique=True, verbose_name='CPF')
+    cpf_numerico = models.CharField(max_length=11, unique=True, editable=False, verbose_name='CPF (somente dígitos)')
     email = models.EmailField(max_length=100, blank=True, null=True, verbose_name='E-mail')
     telefone = models.CharField(max_length=20, blank=True, null=True, verbose_name='Telefone')
     ativo = models.BooleanField(default=True, verbose_name='Ativo')
@@ -68,14 +73,30 @@ class Cliente(models.Model):
     def __str__(self):
         return self.nome_cliente
     
+    @staticmethod
+    def normalizar_cpf(cpf):
+        """
+        Mantém apenas os dígitos do CPF ('123.456.789-09' -> '12345678909')
+        """
+        return _NAO_DIGITOS.sub('', cpf or '')
+    
+    @staticmethod
+    def digitos_verificadores(base):
+        """
+        Calcula os dois dígitos verificadores para os 9 primeiros dígitos do CPF
+        """
+        digitos = [int(d) for d in base]
+        for peso_inicial in (10, 11):
+            soma = sum(d * (peso_inicial - i) for i, d in enumerate(digitos))
+            digitos.append(soma * 10 % 11 % 10)
+        return f'{digitos[9]}{digitos[10]}'
+    
     @staticmethod
     def validar_cpf(cpf):
         """
-        Valida o formato do CPF (XXX.XXX.XXX-XX)
+        Valida o CPF (XXX.XXX.XXX-XX ou só dígitos), incluindo os dígitos verificadores
         """
-        import re
-        # Remove caracteres não numéricos
-        cpf_numeros = re.sub(r'\D', '', cpf)
+        cpf_numeros = Cliente.normalizar_cpf(cpf)
         
         # Verifica se tem 11 dígitos
         if len(cpf_numeros) != 11:
@@ -85,4 +106,5 @@ class Cliente(models.Model):
         if cpf_numeros == cpf_numeros[0] * 11:
             return False
         
-        return True
+        # Verifica os dígitos verificadores
+        return cpf_numeros[9:] == Cliente.digitos_verificadores(cpf_numeros[:9])
@@ -0,0 +1,159 @@
+"""
+Orçamento de consultas SQL por view e detecção de N+1.
+
+Cada view declara com @orcamento(n) quantas consultas pode fazer numa
+requisição. Durante uma gravação (gravar), o execute_wrapper de cada conexão
+guarda as consultas e o método da DAO que as fez; como a gravação fica numa
+ContextVar, as consultas das views async feitas no pool de dao_async também
+entram. A mesma consulta (mesma forma, parâmetros à parte) repetida
+ORCAMENTO_REPETICOES vezes ou mais numa requisição é o sinal de uma DAO
+chamada dentro de um laço.
+
+O OrcamentoConsultasMiddleware aplica isso a toda requisição conforme
+ORCAMENTO_CONSULTAS, e `python -m benchmark orcamentos` confere todas as
+rotas de core/urls.py.
+"""
+import logging
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+from . import metricas
+
+logger = logging.getLogger(__name__)
+
+_gravacao = ContextVar('gravacao_consultas', default=None)
+
+_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTA = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_LISTAS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+# Controle de transação não conta: depende do backend (o SQLite emite BEGIN)
+_CONTROLE = ('BEGIN', 'SAVEPOINT', 'RELEASE', 'ROLLBACK', 'COMMIT')
+
+
+class OrcamentoExcedido(AssertionError):
+    """A view passou do orçamento de consultas ou repetiu uma consulta (N+1)"""
+
+
+def orcamento(consultas, repeticoes=None):
+    """
+    Declara o máximo de consultas SQL de uma requisição à view e, se
+    preciso, quantas vezes a mesma consulta pode aparecer (padrão:
+    ORCAMENTO_REPETICOES). consultas=None declara uma view que consulta por
+    lote, proporcional à entrada (ex.: importação): sem máximo nem N+1.
+    Só marca a view: quem confere é a gravação.
+    """
+    def decorador(view):
+        view.orcamento_consultas = consultas
+        view.orcamento_repeticoes = repeticoes
+        return view
+    return decorador
+
+
+def forma(sql):
+    """SQL sem valores literais, com listas de %s (IN e VALUES multi-linha) reduzidas a (...)"""
+    sql = _LITERAIS.sub('?', sql.replace('%s', '?'))
+    sql = _LISTAS.sub('(...)', _LISTA.sub('(...)', sql))
+    return ' '.join(sql.split())
+
+
+class Gravacao:
+    """
+    Consultas de uma requisição: (sql, método da DAO) na ordem em que
+    rodaram e, com guardar_parametros, os parâmetros de cada uma na mesma
+    ordem em `parametros`. Uma gravação aberta dentro de outra repassa as
+    suas à de fora.
+    """
+
+    def __init__(self, externa=None, guardar_parametros=False):
+        self.consultas = []
+        self.parametros = []
+        self.externa = externa
+        self.guardar_parametros = guardar_parametros
+        # Views async disparam consultas de várias threads do pool ao mesmo tempo
+        self._trava = threading.Lock()
+
+    def __len__(self):
+        return len(self.consultas)
+
+    def registrar(self, sql, metodo, params=None):
+        with self._trava:
+            self.consultas.append((sql, metodo))
+            if self.guardar_parametros:
+                self.parametros.append(params)
+        if self.externa is not None:
+            self.externa.registrar(sql, metodo, params)
+
+    def repetidas(self, limite):
+        """[(vezes, método, forma)] das consultas que aparecem `limite` vezes ou mais"""
+        contagens = {}
+        for sql, metodo in self.consultas:
+            chave = (metodo, forma(sql))
+            contagens[chave] = contagens.get(chave, 0) + 1
+        return sorted(
+            ((vezes, metodo, texto) for (metodo, texto), vezes in contagens.items() if vezes >= limite),
+            reverse=True
+        )
+
+
+@contextmanager
+def gravar(guardar_parametros=False):
+    """Grava as consultas feitas no contexto atual (inclusive pelo pool das views async)"""
+    gravacao = Gravacao(_gravacao.get(), guardar_parametros)
+    token = _gravacao.set(gravacao)
+    try:
+        yield gravacao
+    finally:
+        _gravacao.reset(token)
+
+
+def continuar(partes, gravacao):
+    """
+    Gerador que repassa `partes` gravando em `gravacao` as consultas feitas
+    a cada passo (ex.: a leitura de uma StreamingHttpResponse)
+    """
+    partes = iter(partes)
+    while True:
+        token = _gravacao.set(gravacao)
+        try:
+            parte = next(partes)
+        except StopIteration:
+            return
+        finally:
+            _gravacao.reset(token)
+        yield parte
+
+
+def problemas(view, gravacao, exigir=False):
+    """
+    Violações das consultas gravadas: acima do orçamento da view ou
+    repetidas (N+1). Com `exigir`, a view sem @orcamento também é violação.
+    """
+    encontrados = []
+    if not hasattr(view, 'orcamento_consultas'):
+        if exigir:
+            encontrados.append('view sem @orcamento')
+    elif view.orcamento_consultas is None:
+        return encontrados
+    elif len(gravacao) > view.orcamento_consultas:
+        encontrados.append(f'{len(gravacao)} consultas, orçamento de {view.orcamento_consultas}')
+    limite = getattr(view, 'orcamento_repeticoes', None) or getattr(settings, 'ORCAMENTO_REPETICOES', 3)
+    for vezes, metodo, texto in gravacao.repetidas(limite):
+        encontrados.append(f'N+1: {vezes}x em {metodo}: {texto[:150]}')
+    return encontrados
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    gravacao = _gravacao.get()
+    if gravacao is not None and not sql.lstrip()[:9].upper().startswith(_CONTROLE):
+        gravacao.registrar(sql, metricas.metodo_atual(), params)
+    return execute(sql, params, many, context)
+
+
+def instalar_wrapper(sender, connection, **kwargs):
+    """Receptor de connection_created: grava as consultas da conexão durante uma gravação"""
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
@@ -0,0 +1,69 @@
+"""
+Paginação por cursor (keyset) usada pelas listagens das DAOs.
+
+O cursor guarda a chave de ordenação (nome, id) do último/primeiro registro
+da página, de forma que a próxima consulta parte direto dessa posição do
+índice em vez de usar OFFSET.
+"""
+import base64
+import json
+
+from django.conf import settings
+
+
+def tamanho_padrao():
+    return getattr(settings, 'PAGINACAO_TAMANHO_PADRAO', 50)
+
+
+def tamanho_maximo():
+    return getattr(settings, 'PAGINACAO_TAMANHO_MAXIMO', 200)
+
+
+def contar_total_padrao():
+    return getattr(settings, 'PAGINACAO_CONTAR_TOTAL', True)
+
+
+def normalizar_limite(limite):
+    """Converte o limite informado para um inteiro entre 1 e o máximo permitido"""
+    try:
+        limite = int(limite)
+    except (TypeError, ValueError):
+        return tamanho_padrao()
+    return max(1, min(limite, tamanho_maximo()))
+
+
+def codificar_cursor(nome, id_registro):
+    """Gera o cursor opaco a partir da chave (nome, id)"""
+    dados = json.dumps([nome, id_registro], ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(dados).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    """Recupera a chave (nome, id) de um cursor. Lança ValueError se for inválido"""
+    try:
+        dados = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        nome, id_registro = json.loads(dados.decode('utf-8'))
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError('Cursor de paginação inválido')
+    if not isinstance(nome, str) or not isinstance(id_registro, int):
+        raise ValueError('Cursor de paginação inválido')
+    return nome, id_registro
+
+
+class Pagina:
+    """
+    Uma página de resultados com os cursores para navegar entre páginas
+    """
+
+    def __init__(self, itens, limite, proximo=None, anterior=None, total=None):
+        self.itens = itens
+        self.limite = limite
+        self.proximo = proximo
+        self.anterior = anterior
+        self.total = total
+
+    def __iter__(self):
+        return iter(self.itens)
+
+    def __len__(self):
+        return len(self.itens)
@@ -0,0 +1,113 @@
+"""
+Representação compacta das linhas retornadas pelas DAOs.
+
+Em vez de um dict por linha, cada formato de consulta (a tupla de nomes de
+colunas) ganha uma única classe de registro baseada em tupla, criada uma vez
+e reaproveitada. O registro ocupa bem menos memória que um dict e continua
+aceitando tanto registro.nome_produto (templates) quanto
+registro['nome_produto'] (código que já tratava as linhas como dicionário).
+"""
+import gc
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache, partial
+
+from . import metricas
+
+# Acima disso o coletor de lixo é pausado durante a conversão: os registros
+# são rastreados pelo GC (os dicts de valores simples não são) e as coletas
+# disparadas a cada 700 alocações dominariam o tempo em resultados grandes.
+LIMITE_PAUSA_GC = 1000
+
+# O gc.disable() vale para o processo todo: com várias threads convertendo ao
+# mesmo tempo (pool das views async), só a última a sair religa o coletor.
+_pausas_gc = 0
+_religar_gc = False
+_trava_gc = threading.Lock()
+
+
+class _RegistroBase(tuple):
+    __slots__ = ()
+
+    def __getitem__(self, chave, _item=tuple.__getitem__):
+        if chave.__class__ is str:
+            return _item(self, self._indices[chave])
+        return _item(self, chave)
+
+    def __contains__(self, chave):
+        return chave in self._indices
+
+    def __reduce__(self):
+        return _reconstruir, (self._colunas, tuple(self))
+
+    def get(self, chave, padrao=None):
+        indice = self._indices.get(chave)
+        return padrao if indice is None else tuple.__getitem__(self, indice)
+
+    def keys(self):
+        return self._colunas
+
+    def values(self):
+        return tuple(self)
+
+    def items(self):
+        return zip(self._colunas, self)
+
+
+@lru_cache(maxsize=256)
+def classe_registro(colunas):
+    """
+    Retorna a classe de registro para a tupla de colunas (criada uma única
+    vez). Colunas que não são identificadores válidos (ex.: COUNT(*)) ou
+    repetidas só ficam acessíveis por registro['nome'].
+    """
+    base = namedtuple('Registro', colunas, rename=True)
+    indices = {coluna: i for i, coluna in enumerate(colunas)}
+    return type('Registro', (_RegistroBase, base),
+                {'__slots__': (), '_indices': indices, '_colunas': tuple(colunas)})
+
+
+def _reconstruir(colunas, valores):
+    return tuple.__new__(classe_registro(colunas), valores)
+
+
+@contextmanager
+def _gc_pausado():
+    global _pausas_gc, _religar_gc
+    with _trava_gc:
+        if _pausas_gc == 0:
+            _religar_gc = gc.isenabled()
+            gc.disable()
+        _pausas_gc += 1
+    try:
+        yield
+    finally:
+        with _trava_gc:
+            _pausas_gc -= 1
+            if _pausas_gc == 0 and _religar_gc:
+                gc.enable()
+
+
+def colunas_do_cursor(cursor):
+    return tuple(col[0] for col in cursor.description)
+
+
+def mapear_linhas(cursor, linhas=None):
+    """Converte o resultado do cursor (ou as linhas dadas) em registros"""
+    classe = classe_registro(colunas_do_cursor(cursor))
+    if linhas is None:
+        linhas = cursor.fetchall()
+    metricas.contar_linhas(len(linhas))
+    if len(linhas) < LIMITE_PAUSA_GC:
+        return list(map(partial(tuple.__new__, classe), linhas))
+    with _gc_pausado():
+        return list(map(partial(tuple.__new__, classe), linhas))
+
+
+def mapear_linha(cursor, linha):
+    """Converte uma única linha (ex.: de fetchone) em registro, ou None"""
+    if linha is None:
+        return None
+    metricas.contar_linhas(1)
+    return tuple.__new__(classe_registro(colunas_do_cursor(cursor)), linha)
@@ -0,0 +1,136 @@
+"""
+Relatórios de faturamento por período (dia, semana ou mês).
+
+Os dias inteiros do intervalo vêm de resumo_diario; só as pontas parciais
+(o começo e o fim do intervalo quando não caem à meia-noite) e os dias ainda
+pendentes de recálculo são somados direto de vendas, numa única consulta.
+Assim o custo depende do tamanho do intervalo em dias, não da quantidade de
+vendas.
+"""
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from .dao import ResumoDiarioDAO, VendaDAO
+
+AGRUPAMENTOS = ('dia', 'semana', 'mes')
+
+CENTAVOS = Decimal('0.01')
+
+
+def _decimal(valor):
+    return Decimal(str(valor or 0))
+
+
+def _como_datetime(valor):
+    if isinstance(valor, datetime):
+        return valor
+    return datetime.combine(valor, time.min)
+
+
+def inicio_periodo(dia, agrupamento):
+    """Primeiro dia do período (semanas começam na segunda-feira)"""
+    if agrupamento == 'semana':
+        return dia - timedelta(days=dia.weekday())
+    if agrupamento == 'mes':
+        return dia.replace(day=1)
+    return dia
+
+
+def fim_periodo(inicio, agrupamento):
+    """Dia seguinte ao último dia do período que começa em inicio"""
+    if agrupamento == 'semana':
+        return inicio + timedelta(days=7)
+    if agrupamento == 'mes':
+        return (inicio.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return inicio + timedelta(days=1)
+
+
+def _linhas(inicio, fim, forma_pagamento):
+    """Linhas (dia, forma, num_vendas, subtotal, desconto, total) cobrindo [inicio, fim)"""
+    primeiro_cheio = inicio.date() if inicio.time() == time.min else inicio.date() + timedelta(days=1)
+    ultimo_cheio = fim.date()
+    if primeiro_cheio >= ultimo_cheio:
+        return ResumoDiarioDAO.linhas_de_vendas([(inicio, fim)], forma_pagamento)
+
+    pendentes = set(ResumoDiarioDAO.dias_pendentes(primeiro_cheio, ultimo_cheio))
+    intervalos = [
+        (_como_datetime(dia), _como_datetime(dia + timedelta(days=1)))
+        for dia in sorted(pendentes)
+    ]
+    if inicio < _como_datetime(primeiro_cheio):
+        intervalos.append((inicio, _como_datetime(primeiro_cheio)))
+    if _como_datetime(ultimo_cheio) < fim:
+        intervalos.append((_como_datetime(ultimo_cheio), fim))
+
+    linhas = [
+        linha for linha in ResumoDiarioDAO.linhas(primeiro_cheio, ultimo_cheio, forma_pagamento)
+        if linha[0] not in pendentes
+    ]
+    return linhas + ResumoDiarioDAO.linhas_de_vendas(intervalos, forma_pagamento)
+
+
+def receita(inicio, fim, agrupamento='dia', forma_pagamento=None):
+    """
+    Faturamento das vendas concluídas em [inicio, fim), agrupado por período.
+
+    inicio e fim podem ser date ou datetime. Retorna uma lista ordenada de
+    dicionários com periodo (primeiro dia), num_vendas, valor_subtotal,
+    desconto, valor_total e ticket_medio. Lança ValueError para agrupamento,
+    forma de pagamento ou intervalo inválidos.
+    """
+    if agrupamento not in AGRUPAMENTOS:
+        raise ValueError('Agrupamento inválido')
+    if forma_pagamento is not None and forma_pagamento not in VendaDAO.FORMAS_PAGAMENTO:
+        raise ValueError('Forma de pagamento inválida')
+    inicio, fim = _como_datetime(inicio), _como_datetime(fim)
+    if fim <= inicio:
+        raise ValueError('O fim do intervalo deve ser posterior ao início')
+
+    periodos = {}
+    for dia, _, num_vendas, subtotal, desconto, total in _linhas(inicio, fim, forma_pagamento):
+        chave = inicio_periodo(dia, agrupamento)
+        acumulado = periodos.setdefault(chave, [0, Decimal(0), Decimal(0), Decimal(0)])
+        acumulado[0] += int(num_vendas)
+        acumulado[1] += _decimal(subtotal)
+        acumulado[2] += _decimal(desconto)
+        acumulado[3] += _decimal(total)
+
+    return [
+        {
+            'periodo': periodo,
+            'num_vendas': num_vendas,
+            'valor_subtotal': subtotal.quantize(CENTAVOS),
+            'desconto': desconto.quantize(CENTAVOS),
+            'valor_total': total.quantize(CENTAVOS),
+            'ticket_medio': (total / num_vendas).quantize(CENTAVOS) if num_vendas else Decimal('0.00'),
+        }
+        for periodo, (num_vendas, subtotal, desconto, total) in sorted(periodos.items())
+        if num_vendas
+    ]
+
+
+def totalizar(periodos):
+    """Soma uma lista de períodos devolvida por receita()"""
+    num_vendas = sum(periodo['num_vendas'] for periodo in periodos)
+    total = sum((periodo['valor_total'] for periodo in periodos), Decimal('0.00'))
+    return {
+        'num_vendas': num_vendas,
+        'valor_subtotal': sum((periodo['valor_subtotal'] for periodo in periodos), Decimal('0.00')),
+        'desconto': sum((periodo['desconto'] for periodo in periodos), Decimal('0.00')),
+        'valor_total': total,
+        'ticket_medio': (total / num_vendas).quantize(CENTAVOS) if num_vendas else Decimal('0.00'),
+    }
+
+
+def ler_data(texto, fim=False):
+    """
+    Converte 'AAAA-MM-DD' ou 'AAAA-MM-DDTHH:MM[:SS]' em datetime. Uma data
+    sem hora usada como fim inclui o dia inteiro. Lança ValueError se inválida.
+    """
+    try:
+        valor = datetime.fromisoformat(texto)
+    except (TypeError, ValueError):
+        raise ValueError(f'Data inválida: {texto!r}')
+    if fim and len(texto) == 10:
+        valor += timedelta(days=1)
+    return valor.replace(tzinfo=None)
@@ -0,0 +1,170 @@
+"""
+Roteamento das consultas das DAOs entre o banco principal e uma réplica.
+
+Os métodos marcados com @leitura rodam em settings.BANCO_LEITURA (um alias
+de DATABASES); todo o resto, inclusive qualquer escrita, fica no 'default'.
+A leitura volta para o principal quando:
+
+- a requisição já gravou algo (lê o que acabou de escrever até o fim dela
+  e, pelo cookie de BANCO_LEITURA_FIXAR_SEGUNDOS, nas seguintes, cobrindo
+  o redirect depois de um POST);
+- há uma transação aberta no principal;
+- o resultado vai para um cache versionado (no_principal): lido de uma
+  réplica atrasada logo depois de uma escrita, o dado velho ficaria
+  guardado sob a versão nova até o TTL, para todos os leitores;
+- a réplica falhou na última verificação (refeita a cada
+  BANCO_LEITURA_VERIFICAR_SEGUNDOS) ou numa consulta, que então é
+  repetida no principal.
+
+As DAOs usam `conexao` no lugar de django.db.connection: ela aponta para a
+conexão escolhida pelo método em andamento.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from types import GeneratorType
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, InterfaceError, OperationalError, connections
+
+COOKIE_PRIMARIO = 'ler_primario'
+
+_alias = ContextVar('alias_dao', default=None)
+_gravou = ContextVar('gravou_no_primario', default=False)
+_forcar_principal = ContextVar('forcar_principal', default=False)
+
+_saude = {}
+_trava = threading.Lock()
+
+
+class _ConexaoRoteada:
+    """Encaminha os atributos para a conexão escolhida pelo método da DAO em andamento"""
+
+    def __getattr__(self, nome):
+        return getattr(connections[_alias.get() or DEFAULT_DB_ALIAS], nome)
+
+
+conexao = _ConexaoRoteada()
+
+
+# ============================================
+# ESCOLHA DO BANCO
+# ============================================
+
+def _verificar(alias):
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute('SELECT 1')
+        return True
+    except (OperationalError, InterfaceError):
+        connections[alias].close()
+        return False
+
+
+def saudavel(alias):
+    """Estado da réplica, verificado no máximo a cada BANCO_LEITURA_VERIFICAR_SEGUNDOS"""
+    agora = time.monotonic()
+    estado = _saude.get(alias)
+    if estado and agora - estado[1] < getattr(settings, 'BANCO_LEITURA_VERIFICAR_SEGUNDOS', 10):
+        return estado[0]
+    ok = _verificar(alias)
+    with _trava:
+        _saude[alias] = (ok, agora)
+    return ok
+
+
+def marcar_indisponivel(alias):
+    with _trava:
+        _saude[alias] = (False, time.monotonic())
+
+
+def alias_leitura():
+    """Alias em que uma leitura deve rodar agora"""
+    replica = getattr(settings, 'BANCO_LEITURA', None)
+    if (not replica or replica == DEFAULT_DB_ALIAS or _gravou.get() or _forcar_principal.get()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block or not saudavel(replica)):
+        return DEFAULT_DB_ALIAS
+    return replica
+
+
+@contextmanager
+def no_principal():
+    """Leituras do bloco no banco principal, mesmo dentro de um método @leitura"""
+    forcar, alias = _forcar_principal.set(True), _alias.set(DEFAULT_DB_ALIAS)
+    try:
+        yield
+    finally:
+        _alias.reset(alias)
+        _forcar_principal.reset(forcar)
+
+
+def _percorrer_roteado(alias, gerador):
+    # Gerador consumido depois que o método retornou (ex.: exportação em
+    # streaming): cada passo roda no banco escolhido na chamada.
+    while True:
+        token = _alias.set(alias)
+        try:
+            item = next(gerador)
+        except StopIteration:
+            return
+        finally:
+            _alias.reset(token)
+        yield item
+
+
+def leitura(funcao):
+    """Marca um método de DAO como leitura, que pode rodar na réplica"""
+    @wraps(funcao)
+    def roteada(*args, **kwargs):
+        alias = alias_leitura()
+        token = _alias.set(alias)
+        try:
+            resultado = funcao(*args, **kwargs)
+        except (OperationalError, InterfaceError):
+            if alias == DEFAULT_DB_ALIAS:
+                raise
+            # Leituras podem ser repetidas: a réplica sai de uso até a próxima verificação
+            marcar_indisponivel(alias)
+            connections[alias].close()
+            alias = DEFAULT_DB_ALIAS
+            _alias.set(alias)
+            resultado = funcao(*args, **kwargs)
+        finally:
+            _alias.reset(token)
+        if isinstance(resultado, GeneratorType):
+            return _percorrer_roteado(alias, resultado)
+        return resultado
+    return roteada
+
+
+# ============================================
+# LEIA O QUE ESCREVEU
+# ============================================
+
+_COMANDOS_ESCRITA = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    if sql.lstrip()[:7].upper().startswith(_COMANDOS_ESCRITA):
+        _gravou.set(True)
+    return execute(sql, params, many, context)
+
+
+def instalar_wrapper(sender, connection, **kwargs):
+    """Receptor de connection_created: marca a requisição ao gravar no banco principal"""
+    if connection.alias == DEFAULT_DB_ALIAS and _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+def iniciar_requisicao(fixar=False):
+    """Começa uma requisição; com fixar=True as leituras já começam no principal"""
+    return _gravou.set(fixar)
+
+
+def encerrar_requisicao(token):
+    """Encerra a requisição e informa se ela gravou no banco principal"""
+    gravou = _gravou.get()
+    _gravou.reset(token)
+    return gravou
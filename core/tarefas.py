@@ -0,0 +1,270 @@
+"""
+Tarefas em segundo plano: exportações e relatórios pesados fora da requisição.
+
+A view só enfileira (enfileirar) e responde na hora com o id; o comando
+executar_tarefas roda um Trabalhador, que reserva as pendentes com um
+UPDATE condicional (vários processos podem rodar ao mesmo tempo sem pegar a
+mesma tarefa) e as executa num pool de TAREFAS_CONCORRENCIA threads, com
+limites por tipo em TAREFAS_CONCORRENCIA_POR_TIPO. Cada tipo grava um
+arquivo em TAREFAS_DIRETORIO/<id_tarefa>/, baixado depois pela view de
+download.
+
+As threads do pool só guardam o progresso na memória: quem grava é a
+thread principal do trabalhador, junto com o sinal de vida de todas as
+tarefas em andamento, a cada volta do laço. Assim nenhuma consulta extra
+disputa a conexão de uma exportação em streaming (no MySQL o SSCursor
+ocupa a conexão até o fim da leitura).
+
+Uma falha volta para a fila com espera de TAREFAS_ESPERA_SEGUNDOS, dobrada
+a cada tentativa, até TAREFAS_TENTATIVAS; parâmetros inválidos (ValueError)
+falham de vez. Uma tarefa em execução sem sinal por
+TAREFAS_ABANDONO_SEGUNDOS (trabalhador morto) volta para a fila.
+"""
+import json
+import logging
+import os
+import socket
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, connections
+
+from . import exportacao, relatorios
+from .dao import ClienteDAO, ProdutoDAO, TarefaDAO, VendaDAO
+
+logger = logging.getLogger(__name__)
+
+# tipo -> (validar(parametros) -> parâmetros normalizados, executar(execucao))
+TIPOS = {}
+
+
+def tipo(nome, validar):
+    """Registra a função que executa as tarefas do tipo `nome`"""
+    def registrar(funcao):
+        TIPOS[nome] = (validar, funcao)
+        return funcao
+    return registrar
+
+
+def diretorio():
+    return Path(getattr(settings, 'TAREFAS_DIRETORIO', Path(settings.BASE_DIR) / 'arquivos_tarefas'))
+
+
+def enfileirar(nome_tipo, parametros=None):
+    """Valida os parâmetros e enfileira a tarefa. Retorna o id; ValueError se inválida"""
+    if nome_tipo not in TIPOS:
+        raise ValueError(f"Tipo de tarefa inválido: {nome_tipo!r} (use {', '.join(sorted(TIPOS))})")
+    if parametros is not None and not isinstance(parametros, dict):
+        raise ValueError('Os parâmetros da tarefa devem ser um objeto JSON')
+    validar, _ = TIPOS[nome_tipo]
+    parametros = validar(parametros or {})
+    return TarefaDAO.criar(nome_tipo, json.dumps(parametros), getattr(settings, 'TAREFAS_TENTATIVAS', 3))
+
+
+class Execucao:
+    """Tarefa reservada em andamento: parâmetros, progresso e arquivo gerado"""
+
+    def __init__(self, tarefa):
+        self.tarefa = tarefa
+        self.parametros = json.loads(tarefa.parametros)
+        self.percentual = 0
+        self.arquivo = None
+
+    def progresso(self, feitos, total):
+        """Informa o avanço (gravado pelo trabalhador no próximo sinal de vida)"""
+        # 100 só quando o arquivo estiver pronto (concluir)
+        self.percentual = min(99, feitos * 100 // total) if total else 0
+
+    @contextmanager
+    def abrir(self, nome, modo='w'):
+        """
+        Arquivo de saída da tarefa. Grava num .parcial e só o renomeia no
+        fim sem erro: uma tentativa que falhou não deixa arquivo pela metade.
+        """
+        pasta = diretorio() / str(self.tarefa.id_tarefa)
+        pasta.mkdir(parents=True, exist_ok=True)
+        parcial = pasta / f'{nome}.parcial'
+        try:
+            with open(parcial, modo, encoding=None if 'b' in modo else 'utf-8', newline='') as saida:
+                yield saida
+            os.replace(parcial, pasta / nome)
+        finally:
+            parcial.unlink(missing_ok=True)
+        self.arquivo = f'{self.tarefa.id_tarefa}/{nome}'
+
+
+def _espera(tentativa):
+    return timedelta(seconds=getattr(settings, 'TAREFAS_ESPERA_SEGUNDOS', 30) * 2 ** (tentativa - 1))
+
+
+def executar(execucao, trabalhador):
+    """Roda uma tarefa reservada (numa thread do pool) e grava o resultado"""
+    tarefa = execucao.tarefa
+    try:
+        if tarefa.tipo not in TIPOS:
+            raise ValueError(f'Tipo de tarefa inválido: {tarefa.tipo!r}')
+        TIPOS[tarefa.tipo][1](execucao)
+        if execucao.arquivo is None:
+            raise RuntimeError('A tarefa terminou sem gerar arquivo')
+        TarefaDAO.concluir(tarefa.id_tarefa, trabalhador, execucao.arquivo)
+    except Exception as erro:
+        repetir = not isinstance(erro, ValueError) and tarefa.tentativas < tarefa.max_tentativas
+        logger.exception('Tarefa %s (%s) falhou na tentativa %s', tarefa.id_tarefa, tarefa.tipo,
+                         tarefa.tentativas)
+        TarefaDAO.falhar(tarefa.id_tarefa, trabalhador, f'{type(erro).__name__}: {erro}',
+                         datetime.now() + _espera(tarefa.tentativas) if repetir else None)
+    finally:
+        # A conexão é da thread do pool: fecha para não ficar aberta entre tarefas
+        connections.close_all()
+
+
+class Trabalhador:
+    """
+    Laço que reserva e executa tarefas. Por volta: recupera as abandonadas
+    (de tempos em tempos), reserva até encher as vagas, grava progresso e
+    sinal de vida das que estão rodando e espera uma terminar ou `intervalo`.
+    """
+
+    def __init__(self, concorrencia=None, tipos=None, intervalo=1.0):
+        self.concorrencia = concorrencia or getattr(settings, 'TAREFAS_CONCORRENCIA', 4)
+        self.tipos = list(tipos or TIPOS)
+        self.intervalo = intervalo
+        self.limites = getattr(settings, 'TAREFAS_CONCORRENCIA_POR_TIPO', {})
+        self.abandono = getattr(settings, 'TAREFAS_ABANDONO_SEGUNDOS', 300)
+        self.nome = f'{socket.gethostname()}:{os.getpid()}'
+        self.executadas = 0
+        desconhecidos = set(self.tipos) - set(TIPOS)
+        if desconhecidos:
+            raise ValueError(f"Tipos de tarefa inválidos: {', '.join(sorted(desconhecidos))}")
+
+    def _vagas(self, em_andamento):
+        rodando = {}
+        for execucao in em_andamento.values():
+            rodando[execucao.tarefa.tipo] = rodando.get(execucao.tarefa.tipo, 0) + 1
+        return {
+            nome: self.limites.get(nome, self.concorrencia) - rodando.get(nome, 0)
+            for nome in self.tipos
+        }
+
+    def rodar(self, ate_esvaziar=False):
+        """
+        Executa tarefas até ser interrompido (Ctrl+C termina as que estão
+        rodando e sai) ou, com ate_esvaziar, até não haver nada pronto para rodar
+        """
+        em_andamento = {}
+        proxima_recuperacao = 0.0
+        encerrando = False
+        with ThreadPoolExecutor(max_workers=self.concorrencia, thread_name_prefix='tarefa') as pool:
+            while True:
+                close_old_connections()
+                if not encerrando and time.monotonic() >= proxima_recuperacao:
+                    recuperadas = TarefaDAO.recuperar_abandonadas(
+                        datetime.now() - timedelta(seconds=self.abandono)
+                    )
+                    if recuperadas:
+                        logger.warning('%s tarefa(s) abandonada(s) voltaram para a fila', recuperadas)
+                    proxima_recuperacao = time.monotonic() + self.abandono / 4
+
+                if not encerrando and len(em_andamento) < self.concorrencia:
+                    vagas = self._vagas(em_andamento)
+                    for tarefa in TarefaDAO.reservar(self.nome, vagas, self.concorrencia - len(em_andamento)):
+                        execucao = Execucao(tarefa)
+                        em_andamento[pool.submit(executar, execucao, self.nome)] = execucao
+
+                if not em_andamento:
+                    if ate_esvaziar or encerrando:
+                        return self.executadas
+                    time.sleep(self.intervalo)
+                    continue
+
+                TarefaDAO.sinalizar(self.nome, {
+                    execucao.tarefa.id_tarefa: execucao.percentual for execucao in em_andamento.values()
+                })
+                try:
+                    prontas, _ = wait(em_andamento, timeout=self.intervalo, return_when=FIRST_COMPLETED)
+                except KeyboardInterrupt:
+                    if encerrando:
+                        raise
+                    logger.warning('Encerrando: aguardando %s tarefa(s) em andamento', len(em_andamento))
+                    encerrando = True
+                    continue
+                for futuro in prontas:
+                    del em_andamento[futuro]
+                    self.executadas += 1
+
+
+# ============================================
+# TIPOS DE TAREFA
+# ============================================
+
+def _validar_exportacao(parametros):
+    formato = parametros.get('formato', 'csv')
+    if formato not in exportacao.FORMATOS:
+        raise ValueError(f"Formato de exportação inválido: {formato!r} (use {', '.join(exportacao.FORMATOS)})")
+    return {'formato': formato}
+
+
+def _exportar(execucao, nome, dao):
+    """Mesmo arquivo da exportação em streaming, gravado em disco com o progresso por linha"""
+    gerador, _, extensao = exportacao.FORMATOS[execucao.parametros['formato']]
+    total = dao.contar()
+    feitos = 0
+
+    def lotes():
+        nonlocal feitos
+        for lote in dao.iterar():
+            yield lote
+            feitos += len(lote)
+            execucao.progresso(feitos, total)
+
+    with execucao.abrir(f'{nome}.{extensao}') as saida:
+        for parte in gerador(dao.COLUNAS_EXPORTACAO, lotes()):
+            saida.write(parte)
+
+
+@tipo('exportar_produtos', _validar_exportacao)
+def exportar_produtos(execucao):
+    _exportar(execucao, 'produtos', ProdutoDAO)
+
+
+@tipo('exportar_clientes', _validar_exportacao)
+def exportar_clientes(execucao):
+    _exportar(execucao, 'clientes', ClienteDAO)
+
+
+@tipo('exportar_vendas', _validar_exportacao)
+def exportar_vendas(execucao):
+    _exportar(execucao, 'vendas', VendaDAO)
+
+
+def _validar_receita(parametros):
+    inicio, fim = parametros.get('inicio', ''), parametros.get('fim', '')
+    if relatorios.ler_data(fim, fim=True) <= relatorios.ler_data(inicio):
+        raise ValueError('O fim do intervalo deve ser posterior ao início')
+    agrupamento = parametros.get('agrupamento', 'dia')
+    if agrupamento not in relatorios.AGRUPAMENTOS:
+        raise ValueError('Agrupamento inválido')
+    forma_pagamento = parametros.get('forma_pagamento') or None
+    if forma_pagamento is not None and forma_pagamento not in VendaDAO.FORMAS_PAGAMENTO:
+        raise ValueError(f"Forma de pagamento inválida (use {', '.join(VendaDAO.FORMAS_PAGAMENTO)})")
+    return {'inicio': inicio, 'fim': fim, 'agrupamento': agrupamento, 'forma_pagamento': forma_pagamento}
+
+
+@tipo('relatorio_receita', _validar_receita)
+def relatorio_receita(execucao):
+    """O JSON da view relatorio_receita, para intervalos longos"""
+    parametros = execucao.parametros
+    periodos = relatorios.receita(
+        relatorios.ler_data(parametros['inicio']),
+        relatorios.ler_data(parametros['fim'], fim=True),
+        parametros['agrupamento'],
+        parametros['forma_pagamento'],
+    )
+    with execucao.abrir('receita.json') as saida:
+        json.dump({'periodos': periodos, 'total': relatorios.totalizar(periodos)}, saida,
+                  cls=DjangoJSONEncoder, ensure_ascii=False)
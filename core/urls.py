@@ -8,18 +8,71 @@ urlpatterns = [
     # Rotas de Categoria
     path('categorias/', views.categoria_lista, name='categoria_lista'),
     path('categorias/criar/', views.categoria_criar, name='categoria_criar'),
+    path('categorias/acao-em-lote/', views.categoria_acao_lote, name='categoria_acao_lote'),
     path('categorias/<int:id>/editar/', views.categoria_editar, name='categoria_editar'),
     path('categorias/<int:id>/deletar/', views.categoria_deletar, name='categoria_deletar'),
     
     # Rotas de Produto
     path('produtos/', views.produto_lista, name='produto_lista'),
     path('produtos/criar/', views.produto_criar, name='produto_criar'),
+    path('produtos/buscar/', views.produto_busca, name='produto_busca'),
+    path('produtos/acao-em-lote/', views.produto_acao_lote, name='produto_acao_lote'),
+    path('produtos/reajustar/', views.produto_reajustar, name='produto_reajustar'),
     path('produtos/<int:id>/editar/', views.produto_editar, name='produto_editar'),
     path('produtos/<int:id>/deletar/', views.produto_deletar, name='produto_deletar'),
+    path('produtos/exportar/<str:formato>/', views.produto_exportar, name='produto_exportar'),
+    path('produtos/importar/', views.produto_importar, name='produto_importar'),
     
     # Rotas de Cliente
     path('clientes/', views.cliente_lista, name='cliente_lista'),
     path('clientes/criar/', views.cliente_criar, name='cliente_criar'),
+    path('clientes/autocompletar/', views.cliente_autocompletar, name='cliente_autocompletar'),
+    path('clientes/acao-em-lote/', views.cliente_acao_lote, name='cliente_acao_lote'),
     path('clientes/<int:id>/editar/', views.cliente_editar, name='cliente_editar'),
     path('clientes/<int:id>/deletar/', views.cliente_deletar, name='cliente_deletar'),
+    path('clientes/exportar/<str:formato>/', views.cliente_exportar, name='cliente_exportar'),
+    path('clientes/importar/', views.cliente_importar, name='cliente_importar'),
+    
+    # Rotas de Estoque
+    path('estoque/', views.estoque_grade, name='estoque_grade'),
+    path('estoque/baixo/', views.estoque_baixo, name='estoque_baixo'),
+    
+    # Rotas de Compra
+    path('compras/', views.compra_criar, name='compra_criar'),
+    path('compras/<int:id>/receber/', views.compra_receber, name='compra_receber'),
+    
+    # Rotas de Venda
+    path('vendas/checkout/', views.venda_checkout, name='venda_checkout'),
+    path('vendas/exportar/<str:formato>/', views.venda_exportar, name='venda_exportar'),
+    
+    # Rotas de Relatórios
+    path('relatorios/receita/', views.relatorio_receita, name='relatorio_receita'),
+    
+    # Tarefas em segundo plano (exportações e relatórios pesados)
+    path('tarefas/', views.tarefa_criar, name='tarefa_criar'),
+    path('tarefas/<int:id>/', views.tarefa_status, name='tarefa_status'),
+    path('tarefas/<int:id>/download/', views.tarefa_download, name='tarefa_download'),
+    
+    # API JSON (listagem por cursor, detalhe e busca em lote)
+    path('api/categorias/', views.api_categoria_lista, name='api_categoria_lista'),
+    path('api/categorias/lote/', views.api_categoria_lote, name='api_categoria_lote'),
+    path('api/categorias/<int:id>/', views.api_categoria_detalhe, name='api_categoria_detalhe'),
+    path('api/produtos/', views.api_produto_lista, name='api_produto_lista'),
+    path('api/produtos/lote/', views.api_produto_lote, name='api_produto_lote'),
+    path('api/produtos/<int:id>/', views.api_produto_detalhe, name='api_produto_detalhe'),
+    path('api/clientes/', views.api_cliente_lista, name='api_cliente_lista'),
+    path('api/clientes/lote/', views.api_cliente_lote, name='api_cliente_lote'),
+    path('api/clientes/<int:id>/', views.api_cliente_detalhe, name='api_cliente_detalhe'),
+    
+    # Métricas (Prometheus)
+    path('metrics', views.metricas_prometheus, name='metricas'),
+    
+    # Rotas assíncronas (mesmas páginas servidas por views async)
+    path('async/', views.index_async, name='index_async'),
+    path('async/categorias/', views.categoria_lista_async, name='categoria_lista_async'),
+    path('async/categorias/<int:id>/', views.categoria_detalhe_async, name='categoria_detalhe_async'),
+    path('async/produtos/', views.produto_lista_async, name='produto_lista_async'),
+    path('async/produtos/<int:id>/', views.produto_detalhe_async, name='produto_detalhe_async'),
+    path('async/clientes/', views.cliente_lista_async, name='cliente_lista_async'),
+    path('async/clientes/<int:id>/', views.cliente_detalhe_async, name='cliente_detalhe_async'),
 ]
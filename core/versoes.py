@@ -0,0 +1,104 @@
+"""
+Contadores de versão por tabela, usados para invalidar caches.
+
+Cada escrita numa tabela incrementa sua versão e as chaves de cache incluem a
+versão atual, então dados antigos simplesmente deixam de ser encontrados. Os
+contadores ficam no framework de cache do Django (compartilhado entre os
+workers quando CACHES aponta para Redis/Memcached). Cada processo guarda a
+versão lida por até VERSOES_TTL_LOCAL segundos, o que limita por quanto tempo
+um worker pode enxergar uma versão antiga.
+
+Num backend local (LocMem, o padrão sem CACHES) o worker que não fez a
+escrita nunca vê a versão nova: compartilhadas() é False e quem depende das
+versões (caches versionados, ETag das listas) se desliga, a menos que
+VERSOES_PROCESSO_UNICO diga que há um só processo.
+"""
+import threading
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+_local = {}
+_lock = threading.Lock()
+
+# Backends cujo conteúdo é só do processo
+BACKENDS_LOCAIS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def _cache():
+    return caches[getattr(settings, 'VERSOES_CACHE_ALIAS', 'default')]
+
+
+def compartilhadas():
+    """As versões valem para todos os workers (backend compartilhado ou processo único)?"""
+    if getattr(settings, 'VERSOES_PROCESSO_UNICO', False):
+        return True
+    alias = getattr(settings, 'VERSOES_CACHE_ALIAS', 'default')
+    return settings.CACHES[alias]['BACKEND'] not in BACKENDS_LOCAIS
+
+
+def _chave(tabela):
+    return f'versao:{tabela}'
+
+
+def _chave_alteracao(tabela):
+    return f'alteracao:{tabela}'
+
+
+def _valor_inicial():
+    # Baseado no relógio: se o contador for despejado do cache, a nova versão
+    # não repete um número antigo que ainda possa estar em algum cache local.
+    return int(time.time() * 1000)
+
+
+def versao(tabela):
+    """Retorna a versão atual da tabela"""
+    agora = time.monotonic()
+    memo = _local.get(tabela)
+    if memo and agora - memo[1] < getattr(settings, 'VERSOES_TTL_LOCAL', 2):
+        return memo[0]
+
+    cache = _cache()
+    valor = cache.get(_chave(tabela))
+    if valor is None:
+        cache.add(_chave(tabela), _valor_inicial(), timeout=None)
+        valor = cache.get(_chave(tabela), _valor_inicial())
+    with _lock:
+        _local[tabela] = (valor, agora)
+    return valor
+
+
+def incrementar(tabela):
+    """Marca a tabela como alterada, invalidando tudo que foi guardado com a versão anterior"""
+    cache = _cache()
+    try:
+        valor = cache.incr(_chave(tabela))
+    except ValueError:
+        valor = _valor_inicial()
+        cache.set(_chave(tabela), valor, timeout=None)
+    cache.set(_chave_alteracao(tabela), time.time(), timeout=None)
+    with _lock:
+        _local[tabela] = (valor, time.monotonic())
+    return valor
+
+
+def ultima_alteracao(tabela):
+    """Data e hora (UTC) da última escrita na tabela, para o cabeçalho Last-Modified"""
+    cache = _cache()
+    instante = cache.get(_chave_alteracao(tabela))
+    if instante is None:
+        # Sem registro (cache reiniciado): assume agora, que nunca é anterior à escrita real
+        cache.add(_chave_alteracao(tabela), time.time(), timeout=None)
+        instante = cache.get(_chave_alteracao(tabela), time.time())
+    return datetime.fromtimestamp(instante, timezone.utc)
+
+
+def incrementar_no_commit(tabela):
+    """Incrementa a versão somente quando a transação atual for confirmada"""
+    transaction.on_commit(lambda: incrementar(tabela))
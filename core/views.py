@@ -1,24 +1,152 @@
+import asyncio
+import io
+import json
+from decimal import Decimal, InvalidOperation
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.http import FileResponse, HttpResponse, JsonResponse
 from django.shortcuts import render, redirect
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition, require_POST
 from django.contrib import messages
-from .dao import CategoriaDAO, ProdutoDAO, ClienteDAO
+from .dao import (
+    CategoriaDAO, ProdutoDAO, ClienteDAO, EstoqueDAO, VendaDAO, CompraDAO, ResumoDAO, TarefaDAO,
+    CompraInvalida, EstoqueInsuficiente, VendaInvalida,
+)
+from .exportacao import resposta_exportacao
+from .importacao import importar_clientes, importar_produtos, ler_csv
+from . import dao_async, grade_estoque, metricas, paginacao, relatorios, tarefas, versoes
+from .orcamento import orcamento
+from .cache import CacheVersionado
 from .models import Cliente
 
 
+def _parametros_paginacao(request):
+    """Extrai cursor e tamanho de página da query string"""
+    return {
+        'apos': request.GET.get('apos'),
+        'antes': request.GET.get('antes'),
+        'limite': request.GET.get('limite'),
+    }
+
+
+# Tabelas renderizadas das listas, uma entrada por versão da tabela e página
+FRAGMENTOS = {
+    tabela: CacheVersionado.configurar(tabela, 'CACHE_FRAGMENTOS')
+    for tabela in ('categorias', 'produtos', 'clientes')
+}
+
+
+def _lista_condicional(tabela):
+    """
+    GET condicional pela versão da tabela: enquanto não houver escrita, o
+    navegador recebe 304 sem consulta nem render. Com mensagens pendentes
+    ou sem versões compartilhadas entre os workers (versoes.compartilhadas)
+    a página é sempre gerada.
+    """
+    def sem_mensagens(request):
+        return versoes.compartilhadas() and not len(messages.get_messages(request))
+
+    def etag(request):
+        if sem_mensagens(request):
+            return f'W/"{tabela}-{versoes.versao(tabela)}"'
+        return None
+
+    def ultima_alteracao(request):
+        if sem_mensagens(request):
+            return versoes.ultima_alteracao(tabela)
+        return None
+
+    def decorador(view):
+        return cache_control(no_cache=True)(condition(etag, ultima_alteracao)(view))
+    return decorador
+
+
+def _lista(request, dao, tabela, rota):
+    """Renderiza a lista usando a tabela já renderizada desta página, se houver"""
+    parametros = _parametros_paginacao(request)
+
+    def renderizar():
+        pagina = dao.listar_pagina(**parametros)
+        return render_to_string(f'{tabela}/_tabela.html', {tabela: pagina.itens, 'pagina': pagina})
+
+    chave = f"fragmento:{parametros['apos']}:{parametros['antes']}:{parametros['limite']}"
+    try:
+        tabela_html = FRAGMENTOS[tabela].obter(chave, renderizar)
+    except ValueError:
+        messages.error(request, 'Página inválida!')
+        return redirect(rota)
+    return render(request, f'{tabela}/lista.html', {'tabela': tabela_html})
+
+
+def _acao_em_lote(request, dao, rota, nome_plural):
+    """Ativa, desativa ou deleta com um único comando os registros marcados na lista"""
+    acao = request.POST.get('acao')
+    try:
+        ids = [int(i) for i in request.POST.getlist('ids')]
+    except ValueError:
+        ids = []
+    if not ids:
+        messages.error(request, f'Nenhum registro de {nome_plural} selecionado!')
+    elif acao in ('ativar', 'desativar'):
+        alterados = dao.definir_ativo_em_lote(ids, acao == 'ativar')
+        estado = 'ativado(s)' if acao == 'ativar' else 'desativado(s)'
+        messages.success(request, f'{alterados} registro(s) de {nome_plural} {estado}!')
+    elif acao == 'deletar':
+        try:
+            removidos = dao.deletar_em_lote(ids)
+            messages.success(request, f'{removidos} registro(s) de {nome_plural} deletado(s)!')
+        except IntegrityError:
+            messages.error(request, f'Nenhum registro deletado: há {nome_plural} selecionados com registros vinculados.')
+    else:
+        messages.error(request, 'Ação inválida!')
+    return redirect(rota)
+
+
+# Consultas independentes do painel da página inicial: (variável do template, função da DAO)
+CONSULTAS_PAINEL = (
+    ('contagens', ResumoDAO.contagens),
+    ('faturamento', ResumoDAO.faturamento),
+    ('estoque_baixo', EstoqueDAO.contar_estoque_baixo),
+    ('top_produtos', ResumoDAO.top_produtos),
+    ('top_clientes', ResumoDAO.top_clientes),
+    ('vendas_por_categoria', ResumoDAO.por_categoria),
+    ('vendas_por_pagamento', ResumoDAO.por_forma_pagamento),
+)
+
+
+@orcamento(7)
 def index(request):
-    """Página inicial"""
-    return render(request, 'core/index.html')
+    """Página inicial com o painel de vendas (lido das tabelas de resumo)"""
+    context = {chave: consulta() for chave, consulta in CONSULTAS_PAINEL}
+    return render(request, 'core/index.html', context)
 
 
 # ============================================
 # VIEWS DE CATEGORIA
 # ============================================
 
+@orcamento(2)
+@_lista_condicional('categorias')
 def categoria_lista(request):
-    """Lista todas as categorias"""
-    categorias = CategoriaDAO.listar()
-    return render(request, 'categorias/lista.html', {'categorias': categorias})
+    """Lista as categorias paginadas por cursor"""
+    return _lista(request, CategoriaDAO, 'categorias', 'categoria_lista')
+
+
+@orcamento(1)
+@require_POST
+def categoria_acao_lote(request):
+    """Ativa, desativa ou deleta as categorias marcadas na lista"""
+    return _acao_em_lote(request, CategoriaDAO, 'categoria_lista', 'categorias')
 
 
+@orcamento(1)
 def categoria_criar(request):
     """Cria uma nova categoria"""
     if request.method == 'POST':
@@ -36,6 +164,7 @@ def categoria_criar(request):
     return render(request, 'categorias/form.html')
 
 
+@orcamento(2)
 def categoria_editar(request, id):
     """Edita uma categoria existente"""
     categoria = CategoriaDAO.buscar(id)
@@ -59,6 +188,7 @@ def categoria_editar(request, id):
     return render(request, 'categorias/form.html', {'categoria': categoria})
 
 
+@orcamento(1)
 def categoria_deletar(request, id):
     """Deleta uma categoria"""
     if request.method == 'POST':
@@ -77,12 +207,55 @@ def categoria_deletar(request, id):
 # VIEWS DE PRODUTO
 # ============================================
 
+@orcamento(2)
+@_lista_condicional('produtos')
 def produto_lista(request):
-    """Lista todos os produtos"""
-    produtos = ProdutoDAO.listar()
-    return render(request, 'produtos/lista.html', {'produtos': produtos})
+    """Lista os produtos paginados por cursor"""
+    return _lista(request, ProdutoDAO, 'produtos', 'produto_lista')
+
+
+@orcamento(1)
+@require_POST
+def produto_acao_lote(request):
+    """Ativa, desativa ou deleta os produtos marcados na lista"""
+    return _acao_em_lote(request, ProdutoDAO, 'produto_lista', 'produtos')
 
 
+@orcamento(2)
+def produto_reajustar(request):
+    """Reajusta em porcentagem o preço de venda dos produtos de uma marca e/ou categoria"""
+    if request.method == 'POST':
+        try:
+            percentual = Decimal(request.POST.get('percentual', '').replace(',', '.'))
+            alterados = ProdutoDAO.reajustar_precos(
+                percentual, request.POST.get('marca') or None, request.POST.get('id_categoria') or None
+            )
+            messages.success(request, f'{alterados} produto(s) reajustado(s) em {percentual}%!')
+            return redirect('produto_lista')
+        except InvalidOperation:
+            messages.error(request, 'Percentual inválido!')
+        except Exception as e:
+            messages.error(request, f'Erro ao reajustar preços: {str(e)}')
+    
+    return render(request, 'produtos/reajustar.html', {
+        'marcas': ProdutoDAO.listar_marcas(),
+        'categorias': CategoriaDAO.listar(),
+    })
+
+
+@orcamento(2)
+def produto_busca(request):
+    """Busca produtos por nome, marca ou descrição"""
+    termo = request.GET.get('q', '').strip()
+    try:
+        limite = int(request.GET.get('limite', 20))
+    except ValueError:
+        limite = 20
+    produtos = ProdutoDAO.buscar_texto(termo, limite) if termo else []
+    return render(request, 'produtos/lista.html', {'produtos': produtos, 'busca': termo})
+
+
+@orcamento(1)
 def produto_criar(request):
     """Cria um novo produto"""
     if request.method == 'POST':
@@ -102,6 +275,7 @@ def produto_criar(request):
     return render(request, 'produtos/form.html')
 
 
+@orcamento(2)
 def produto_editar(request, id):
     """Edita um produto existente"""
     produto = ProdutoDAO.buscar(id)
@@ -127,6 +301,7 @@ def produto_editar(request, id):
     return render(request, 'produtos/form.html', {'produto': produto})
 
 
+@orcamento(1)
 def produto_deletar(request, id):
     """Deleta um produto"""
     if request.method == 'POST':
@@ -145,12 +320,29 @@ def produto_deletar(request, id):
 # VIEWS DE CLIENTE
 # ============================================
 
+@orcamento(2)
+@_lista_condicional('clientes')
 def cliente_lista(request):
-    """Lista todos os clientes"""
-    clientes = ClienteDAO.listar()
-    return render(request, 'clientes/lista.html', {'clientes': clientes})
+    """Lista os clientes paginados por cursor"""
+    return _lista(request, ClienteDAO, 'clientes', 'cliente_lista')
+
 
+@orcamento(1)
+@require_POST
+def cliente_acao_lote(request):
+    """Ativa, desativa ou deleta os clientes marcados na lista"""
+    return _acao_em_lote(request, ClienteDAO, 'cliente_lista', 'clientes')
 
+
+@orcamento(1)
+def cliente_autocompletar(request):
+    """Sugestões de clientes pelo início do nome (JSON)"""
+    prefixo = request.GET.get('q', '').strip()
+    clientes = ClienteDAO.autocompletar(prefixo) if len(prefixo) >= 2 else []
+    return JsonResponse({'clientes': [dict(cliente) for cliente in clientes]})
+
+
+@orcamento(2)
 def cliente_criar(request):
     """Cria um novo cliente"""
     if request.method == 'POST':
@@ -184,6 +376,7 @@ def cliente_criar(request):
     return render(request, 'clientes/form.html')
 
 
+@orcamento(3)
 def cliente_editar(request, id):
     """Edita um cliente existente"""
     cliente = ClienteDAO.buscar(id)
@@ -220,6 +413,7 @@ def cliente_editar(request, id):
     return render(request, 'clientes/form.html', {'cliente': cliente})
 
 
+@orcamento(1)
 def cliente_deletar(request, id):
     """Deleta um cliente"""
     if request.method == 'POST':
@@ -232,3 +426,458 @@ def cliente_deletar(request, id):
     
     cliente = ClienteDAO.buscar(id)
     return render(request, 'clientes/deletar.html', {'cliente': cliente})
+
+
+# ============================================
+# VIEWS DE ESTOQUE
+# ============================================
+
+@orcamento(3)
+def estoque_grade(request):
+    """Grade tamanho × cor do estoque de uma página de produtos"""
+    try:
+        pagina = ProdutoDAO.listar_pagina(**_parametros_paginacao(request))
+    except ValueError:
+        messages.error(request, 'Página inválida!')
+        return redirect('estoque_grade')
+    return render(request, 'estoque/grade.html', {
+        'grades': grade_estoque.grades_da_pagina(pagina),
+        'pagina': pagina,
+    })
+
+
+@orcamento(2)
+def estoque_baixo(request):
+    """Variações no estoque mínimo ou abaixo dele, as mais críticas primeiro"""
+    return render(request, 'estoque/baixo.html', {
+        'variacoes': EstoqueDAO.listar_estoque_baixo(request.GET.get('limite')),
+        'total': EstoqueDAO.contar_estoque_baixo(),
+    })
+
+
+# ============================================
+# VIEWS DE VENDA
+# ============================================
+
+@orcamento(12)
+@require_POST
+def venda_checkout(request):
+    """
+    Registra uma venda a partir de um carrinho em JSON:
+    {"id_cliente": 1, "forma_pagamento": "PIX", "desconto": "0.00",
+     "itens": [{"id_estoque": 1, "quantidade": 2}, ...]}
+    """
+    try:
+        dados = json.loads(request.body)
+        itens = [(item['id_estoque'], item['quantidade']) for item in dados['itens']]
+        id_venda = VendaDAO.criar(
+            dados.get('id_cliente'),
+            itens,
+            dados.get('forma_pagamento'),
+            dados.get('desconto', 0),
+            dados.get('observacoes', ''),
+        )
+    except EstoqueInsuficiente as e:
+        return JsonResponse({'erro': str(e)}, status=409)
+    except (ValueError, KeyError, TypeError, IntegrityError) as e:
+        return JsonResponse({'erro': f'Carrinho inválido: {str(e)}'}, status=400)
+    return JsonResponse({'id_venda': id_venda}, status=201)
+
+
+# ============================================
+# VIEWS DE COMPRA
+# ============================================
+
+@orcamento(2)
+@require_POST
+def compra_criar(request):
+    """
+    Registra um pedido de compra pendente a partir de JSON:
+    {"id_fornecedor": 1, "observacoes": "",
+     "itens": [{"id_produto": 1, "tamanho": "M", "cor": "Preto",
+                "quantidade": 10, "preco_unitario": "25.00"}, ...]}
+    """
+    try:
+        dados = json.loads(request.body)
+        itens = [
+            (item['id_produto'], item['tamanho'], item['cor'], item['quantidade'], item['preco_unitario'])
+            for item in dados['itens']
+        ]
+        id_compra = CompraDAO.criar(dados['id_fornecedor'], itens, dados.get('observacoes', ''))
+    except (ValueError, KeyError, TypeError, IntegrityError) as e:
+        return JsonResponse({'erro': f'Compra inválida: {str(e)}'}, status=400)
+    return JsonResponse({'id_compra': id_compra}, status=201)
+
+
+@orcamento(2)
+@require_POST
+def compra_receber(request, id):
+    """Recebe a entrega da compra: soma os itens ao estoque (repetir não soma de novo)"""
+    try:
+        recebida = CompraDAO.receber(id)
+    except CompraInvalida as e:
+        return JsonResponse({'erro': str(e)}, status=409)
+    if recebida is None:
+        return JsonResponse({'erro': 'Compra não encontrada!'}, status=404)
+    return JsonResponse({'id_compra': id, 'status_compra': 'Recebida', 'estoque_atualizado': recebida})
+
+
+# ============================================
+# VIEWS DE EXPORTAÇÃO
+# ============================================
+
+@orcamento(1)
+def produto_exportar(request, formato):
+    """Exporta todos os produtos em CSV ou NDJSON (streaming)"""
+    return resposta_exportacao('produtos', ProdutoDAO.COLUNAS_EXPORTACAO, ProdutoDAO.iterar(), formato)
+
+
+@orcamento(1)
+def cliente_exportar(request, formato):
+    """Exporta todos os clientes em CSV ou NDJSON (streaming)"""
+    return resposta_exportacao('clientes', ClienteDAO.COLUNAS_EXPORTACAO, ClienteDAO.iterar(), formato)
+
+
+@orcamento(1)
+def venda_exportar(request, formato):
+    """Exporta todas as vendas em CSV ou NDJSON (streaming)"""
+    return resposta_exportacao('vendas', VendaDAO.COLUNAS_EXPORTACAO, VendaDAO.iterar(), formato)
+
+
+# ============================================
+# VIEWS DE IMPORTAÇÃO
+# ============================================
+
+def _importar_arquivo(request, importar, titulo, url_lista):
+    """Recebe o CSV enviado e mostra o relatório de importação"""
+    contexto = {'titulo': titulo, 'url_lista': url_lista}
+    if request.method == 'POST':
+        arquivo = request.FILES.get('arquivo')
+        if not arquivo:
+            messages.error(request, 'Selecione um arquivo CSV!')
+        else:
+            try:
+                texto = io.TextIOWrapper(arquivo.file, encoding='utf-8-sig', newline='')
+                relatorio = importar(ler_csv(texto))
+            except Exception as e:
+                messages.error(request, f'Erro ao importar arquivo: {str(e)}')
+            else:
+                messages.success(
+                    request,
+                    f'{relatorio.inseridos} de {relatorio.total} linhas importadas com sucesso!'
+                )
+                contexto['relatorio'] = relatorio
+    return render(request, 'core/importar.html', contexto)
+
+
+@orcamento(None)
+def produto_importar(request):
+    """Importa produtos em massa a partir de um CSV"""
+    return _importar_arquivo(request, importar_produtos, 'Importar Produtos', 'produto_lista')
+
+
+@orcamento(None)
+def cliente_importar(request):
+    """Importa clientes em massa a partir de um CSV"""
+    return _importar_arquivo(request, importar_clientes, 'Importar Clientes', 'cliente_lista')
+
+
+# ============================================
+# VIEWS DE RELATÓRIOS
+# ============================================
+
+@orcamento(3)
+def relatorio_receita(request):
+    """
+    Faturamento por dia, semana ou mês entre inicio e fim (JSON).
+    
+    Parâmetros: inicio e fim (AAAA-MM-DD ou AAAA-MM-DDTHH:MM), agrupamento
+    (dia, semana ou mes) e forma_pagamento (opcional). Uma data sem hora em
+    fim inclui o dia inteiro.
+    """
+    try:
+        inicio = relatorios.ler_data(request.GET.get('inicio', ''))
+        fim = relatorios.ler_data(request.GET.get('fim', ''), fim=True)
+        periodos = relatorios.receita(
+            inicio, fim,
+            agrupamento=request.GET.get('agrupamento', 'dia'),
+            forma_pagamento=request.GET.get('forma_pagamento') or None,
+        )
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+    return JsonResponse({
+        'periodos': periodos,
+        'total': relatorios.totalizar(periodos),
+    })
+
+
+# ============================================
+# VIEWS DE TAREFAS EM SEGUNDO PLANO
+# ============================================
+# Exportações e relatórios grandes rodam no comando executar_tarefas: a
+# view enfileira, o cliente acompanha o status e baixa o arquivo no fim.
+
+def _tarefa_json(tarefa):
+    dados = {
+        campo: tarefa[campo] for campo in (
+            'id_tarefa', 'tipo', 'status_tarefa', 'progresso', 'tentativas', 'max_tentativas',
+            'erro', 'data_criacao', 'data_inicio', 'data_fim',
+        )
+    }
+    dados['parametros'] = json.loads(tarefa.parametros)
+    dados['url_status'] = reverse('tarefa_status', args=[tarefa.id_tarefa])
+    if tarefa.status_tarefa == 'Concluída':
+        dados['url_download'] = reverse('tarefa_download', args=[tarefa.id_tarefa])
+    return dados
+
+
+@orcamento(2)
+@require_POST
+def tarefa_criar(request):
+    """
+    Enfileira uma tarefa a partir de JSON e responde 202 sem esperar:
+    {"tipo": "exportar_vendas", "parametros": {"formato": "csv"}}
+    """
+    try:
+        dados = json.loads(request.body)
+        id_tarefa = tarefas.enfileirar(dados['tipo'], dados.get('parametros'))
+    except (ValueError, KeyError, TypeError) as e:
+        return JsonResponse({'erro': f'Tarefa inválida: {str(e)}'}, status=400)
+    resposta = JsonResponse(_tarefa_json(TarefaDAO.buscar(id_tarefa)), status=202)
+    resposta['Location'] = reverse('tarefa_status', args=[id_tarefa])
+    return resposta
+
+
+@orcamento(1)
+def tarefa_status(request, id):
+    """Status e progresso de uma tarefa (JSON), para consulta periódica"""
+    tarefa = TarefaDAO.buscar(id)
+    if not tarefa:
+        return JsonResponse({'erro': 'Tarefa não encontrada!'}, status=404)
+    return JsonResponse(_tarefa_json(tarefa))
+
+
+@orcamento(1)
+def tarefa_download(request, id):
+    """Arquivo gerado por uma tarefa concluída"""
+    tarefa = TarefaDAO.buscar(id)
+    if not tarefa:
+        return JsonResponse({'erro': 'Tarefa não encontrada!'}, status=404)
+    if tarefa.status_tarefa != 'Concluída':
+        return JsonResponse(_tarefa_json(tarefa), status=409)
+    try:
+        arquivo = open(tarefas.diretorio() / tarefa.arquivo, 'rb')
+    except FileNotFoundError:
+        return JsonResponse({'erro': 'O arquivo da tarefa não existe mais'}, status=410)
+    return FileResponse(arquivo, as_attachment=True, filename=tarefa.arquivo.rsplit('/', 1)[-1])
+
+
+# ============================================
+# API JSON
+# ============================================
+# Listagem por cursor, detalhe e busca em lote de categorias, produtos e
+# clientes. ?campos=a,b limita as colunas consultadas e ?formato=linhas
+# responde {"campos": [...], "linhas": [[...], ...]}, sem repetir os nomes
+# das colunas em cada registro.
+
+def _campos_api(request):
+    campos = [campo.strip() for campo in request.GET.get('campos', '').split(',') if campo.strip()]
+    return campos or None
+
+
+def _resposta_api(request, itens, **extras):
+    """Registros em JSON como objetos ou, com ?formato=linhas, como listas de valores"""
+    campos = list(itens[0].keys()) if itens else []
+    if request.GET.get('formato') == 'linhas':
+        # Registros são tuplas: o encoder os grava direto como listas
+        dados = {'campos': campos, 'linhas': itens}
+    else:
+        dados = {'itens': [dict(zip(campos, item)) for item in itens]}
+    dados.update(extras)
+    return JsonResponse(dados, json_dumps_params={'separators': (',', ':')})
+
+
+def _api_lista(request, dao):
+    try:
+        pagina = dao.listar_pagina(**_parametros_paginacao(request), campos=_campos_api(request))
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+    return _resposta_api(request, pagina.itens, proximo=pagina.proximo, anterior=pagina.anterior,
+                         total=pagina.total)
+
+
+def _api_detalhe(request, dao, id, mensagem_nao_encontrado):
+    try:
+        itens = dao.buscar_muitos([id], _campos_api(request))
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+    if not itens:
+        return JsonResponse({'erro': mensagem_nao_encontrado}, status=404)
+    return JsonResponse(dict(itens[0].items()))
+
+
+def _api_lote(request, dao):
+    """
+    Vários registros numa ida ao banco: GET ?ids=3,1,2 ou POST {"ids": [3, 1, 2]}.
+    Os itens voltam na ordem pedida e os ids sem registro em "nao_encontrados".
+    """
+    try:
+        if request.method == 'POST':
+            ids = json.loads(request.body)['ids']
+        else:
+            ids = request.GET.get('ids', '').split(',')
+        ids = list(dict.fromkeys(int(i) for i in ids if str(i).strip()))
+    except (ValueError, KeyError, TypeError):
+        return JsonResponse({'erro': 'Informe os ids como ?ids=1,2,3 ou {"ids": [1, 2, 3]}'}, status=400)
+    maximo = getattr(settings, 'API_MAXIMO_IDS', 5000)
+    if len(ids) > maximo:
+        return JsonResponse({'erro': f'No máximo {maximo} ids por requisição'}, status=400)
+    try:
+        encontrados = dao.buscar_muitos(ids, _campos_api(request))
+    except ValueError as e:
+        return JsonResponse({'erro': str(e)}, status=400)
+    # O id é sempre a primeira coluna do registro
+    por_id = {item[0]: item for item in encontrados}
+    itens = [por_id[i] for i in ids if i in por_id]
+    return _resposta_api(request, itens, nao_encontrados=[i for i in ids if i not in por_id])
+
+
+@orcamento(2)
+def api_categoria_lista(request):
+    """Categorias paginadas por cursor (JSON)"""
+    return _api_lista(request, CategoriaDAO)
+
+
+@orcamento(1)
+def api_categoria_detalhe(request, id):
+    """Dados de uma categoria (JSON)"""
+    return _api_detalhe(request, CategoriaDAO, id, 'Categoria não encontrada!')
+
+
+@orcamento(1)
+@csrf_exempt
+def api_categoria_lote(request):
+    """Várias categorias por id (JSON)"""
+    return _api_lote(request, CategoriaDAO)
+
+
+@orcamento(2)
+def api_produto_lista(request):
+    """Produtos paginados por cursor (JSON)"""
+    return _api_lista(request, ProdutoDAO)
+
+
+@orcamento(1)
+def api_produto_detalhe(request, id):
+    """Dados de um produto (JSON)"""
+    return _api_detalhe(request, ProdutoDAO, id, 'Produto não encontrado!')
+
+
+@orcamento(1)
+@csrf_exempt
+def api_produto_lote(request):
+    """Vários produtos por id (JSON)"""
+    return _api_lote(request, ProdutoDAO)
+
+
+@orcamento(2)
+def api_cliente_lista(request):
+    """Clientes paginados por cursor (JSON)"""
+    return _api_lista(request, ClienteDAO)
+
+
+@orcamento(1)
+def api_cliente_detalhe(request, id):
+    """Dados de um cliente (JSON)"""
+    return _api_detalhe(request, ClienteDAO, id, 'Cliente não encontrado!')
+
+
+@orcamento(1)
+@csrf_exempt
+def api_cliente_lote(request):
+    """Vários clientes por id (JSON)"""
+    return _api_lote(request, ClienteDAO)
+
+
+# ============================================
+# VIEWS DE MÉTRICAS
+# ============================================
+
+@orcamento(0)
+def metricas_prometheus(request):
+    """Métricas do processo no formato texto do Prometheus"""
+    return HttpResponse(metricas.registro.exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+# ============================================
+# VIEWS ASSÍNCRONAS
+# ============================================
+# Servidas por loja_lingerie/asgi.py. As DAOs rodam no pool de
+# dao_async; o render fica na thread síncrona do Django porque as
+# mensagens e a sessão ainda acessam o banco de forma síncrona.
+
+_render_async = sync_to_async(render)
+
+
+@orcamento(7)
+async def index_async(request):
+    """Página inicial com as consultas do painel executadas em paralelo"""
+    resultados = await asyncio.gather(*(dao_async.executar(consulta) for _, consulta in CONSULTAS_PAINEL))
+    context = {chave: resultado for (chave, _), resultado in zip(CONSULTAS_PAINEL, resultados)}
+    return await _render_async(request, 'core/index.html', context)
+
+
+async def _lista_async(request, dao, template, nome_lista, rota):
+    try:
+        pagina = await dao.listar_pagina(**_parametros_paginacao(request))
+    except ValueError:
+        messages.error(request, 'Página inválida!')
+        return redirect(rota)
+    return await _render_async(request, template, {nome_lista: pagina.itens, 'pagina': pagina})
+
+
+async def _detalhe_async(dao, id, mensagem_nao_encontrado):
+    registro = await dao.buscar(id)
+    if not registro:
+        return JsonResponse({'erro': mensagem_nao_encontrado}, status=404)
+    return JsonResponse(dict(registro))
+
+
+@orcamento(2)
+async def categoria_lista_async(request):
+    """Lista as categorias paginadas por cursor (async)"""
+    return await _lista_async(request, dao_async.CategoriaDAO, 'categorias/lista.html',
+                              'categorias', 'categoria_lista_async')
+
+
+@orcamento(2)
+async def produto_lista_async(request):
+    """Lista os produtos paginados por cursor (async)"""
+    return await _lista_async(request, dao_async.ProdutoDAO, 'produtos/lista.html',
+                              'produtos', 'produto_lista_async')
+
+
+@orcamento(2)
+async def cliente_lista_async(request):
+    """Lista os clientes paginados por cursor (async)"""
+    return await _lista_async(request, dao_async.ClienteDAO, 'clientes/lista.html',
+                              'clientes', 'cliente_lista_async')
+
+
+@orcamento(1)
+async def categoria_detalhe_async(request, id):
+    """Dados de uma categoria (JSON, async)"""
+    return await _detalhe_async(dao_async.CategoriaDAO, id, 'Categoria não encontrada!')
+
+
+@orcamento(1)
+async def produto_detalhe_async(request, id):
+    """Dados de um produto (JSON, async)"""
+    return await _detalhe_async(dao_async.ProdutoDAO, id, 'Produto não encontrado!')
+
+
+@orcamento(1)
+async def cliente_detalhe_async(request, id):
+    """Dados de um cliente (JSON, async)"""
+    return await _detalhe_async(dao_async.ClienteDAO, id, 'Cliente não encontrado!')
+
@@ -16,7 +16,8 @@ CREATE TABLE categorias (
     nome_categoria VARCHAR(50) NOT NULL,
     descricao TEXT,
     ativo BOOLEAN DEFAULT TRUE,
-    data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_categorias_nome (nome_categoria, id_categoria)
 ) ENGINE=InnoDB;
 
 CREATE TABLE fornecedores (
@@ -46,7 +47,11 @@ CREATE TABLE produtos (
     ativo BOOLEAN DEFAULT TRUE,
     data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (id_categoria) REFERENCES categorias(id_categoria),
-    FOREIGN KEY (id_fornecedor) REFERENCES fornecedores(id_fornecedor)
+    FOREIGN KEY (id_fornecedor) REFERENCES fornecedores(id_fornecedor),
+    INDEX idx_produtos_nome (nome_produto, id_produto),
+    INDEX idx_produtos_marca (marca),
+    INDEX idx_produtos_ativo (ativo),
+    FULLTEXT INDEX ft_produtos_busca (nome_produto, marca, descricao)
 ) ENGINE=InnoDB;
 
 CREATE TABLE estoque (
@@ -56,15 +61,18 @@ CREATE TABLE estoque (
     cor VARCHAR(30) NOT NULL,
     quantidade INT NOT NULL DEFAULT 0,
     estoque_minimo INT DEFAULT 5,
+    estoque_baixo BOOLEAN GENERATED ALWAYS AS (quantidade <= estoque_minimo) STORED,
     data_atualizacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     FOREIGN KEY (id_produto) REFERENCES produtos(id_produto),
-    UNIQUE KEY unique_produto_tamanho_cor (id_produto, tamanho, cor)
+    UNIQUE KEY unique_produto_tamanho_cor (id_produto, tamanho, cor),
+    INDEX idx_estoque_baixo (estoque_baixo, quantidade)
 ) ENGINE=InnoDB;
 
 CREATE TABLE clientes (
     id_cliente INT AUTO_INCREMENT PRIMARY KEY,
     nome_cliente VARCHAR(100) NOT NULL,
     cpf VARCHAR(14) UNIQUE,
+    cpf_numerico CHAR(11),
     email VARCHAR(100),
     telefone VARCHAR(20),
     data_nascimento DATE,
@@ -73,7 +81,10 @@ CREATE TABLE clientes (
     estado CHAR(2),
     cep VARCHAR(10),
     ativo BOOLEAN DEFAULT TRUE,
-    data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    data_cadastro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE KEY uq_clientes_cpf_numerico (cpf_numerico),
+    INDEX idx_clientes_nome (nome_cliente, id_cliente),
+    INDEX idx_clientes_ativo (ativo)
 ) ENGINE=InnoDB;
 
 CREATE TABLE vendas (
@@ -86,6 +97,7 @@ CREATE TABLE vendas (
     forma_pagamento ENUM('Dinheiro', 'Débito', 'Crédito', 'PIX', 'Boleto') NOT NULL,
     status_venda ENUM('Concluída', 'Cancelada', 'Pendente') DEFAULT 'Concluída',
     observacoes TEXT,
+    INDEX idx_vendas_data (data_venda),
     FOREIGN KEY (id_cliente) REFERENCES clientes(id_cliente)
 ) ENGINE=InnoDB;
 
@@ -124,6 +136,76 @@ CREATE TABLE itens_compra (
     FOREIGN KEY (id_produto) REFERENCES produtos(id_produto)
 ) ENGINE=InnoDB;
 
+-- Resumos de vendas mantidos incrementalmente pela aplicação (ResumoDAO):
+-- cada venda concluída soma nas linhas e cada cancelamento subtrai.
+CREATE TABLE resumo_produtos (
+    id_produto INT PRIMARY KEY,
+    total_vendido INT NOT NULL DEFAULT 0,
+    receita_total DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    INDEX idx_resumo_produtos_vendido (total_vendido),
+    FOREIGN KEY (id_produto) REFERENCES produtos(id_produto) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE resumo_clientes (
+    id_cliente INT PRIMARY KEY,
+    total_compras INT NOT NULL DEFAULT 0,
+    total_gasto DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    INDEX idx_resumo_clientes_gasto (total_gasto),
+    FOREIGN KEY (id_cliente) REFERENCES clientes(id_cliente) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE resumo_categorias (
+    id_categoria INT PRIMARY KEY,
+    num_vendas INT NOT NULL DEFAULT 0,
+    receita_total DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    FOREIGN KEY (id_categoria) REFERENCES categorias(id_categoria) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE resumo_pagamentos (
+    forma_pagamento ENUM('Dinheiro', 'Débito', 'Crédito', 'PIX', 'Boleto') PRIMARY KEY,
+    quantidade_vendas INT NOT NULL DEFAULT 0,
+    total_faturado DECIMAL(12,2) NOT NULL DEFAULT 0.00
+) ENGINE=InnoDB;
+
+-- Faturamento por dia e forma de pagamento (ResumoDiarioDAO). Vendas criadas
+-- ou canceladas marcam o dia em resumo_diario_pendentes e o comando
+-- atualizar_resumo_diario recalcula só esses dias.
+CREATE TABLE resumo_diario (
+    dia DATE NOT NULL,
+    forma_pagamento ENUM('Dinheiro', 'Débito', 'Crédito', 'PIX', 'Boleto') NOT NULL,
+    num_vendas INT NOT NULL DEFAULT 0,
+    valor_subtotal DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    desconto DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    valor_total DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    PRIMARY KEY (dia, forma_pagamento)
+) ENGINE=InnoDB;
+
+CREATE TABLE resumo_diario_pendentes (
+    dia DATE PRIMARY KEY
+) ENGINE=InnoDB;
+
+-- Fila de tarefas em segundo plano (TarefaDAO): exportações e relatórios
+-- pesados rodam no comando executar_tarefas, fora da requisição, e o
+-- arquivo gerado fica em TAREFAS_DIRETORIO/<id_tarefa>/.
+CREATE TABLE tarefas (
+    id_tarefa INT AUTO_INCREMENT PRIMARY KEY,
+    tipo VARCHAR(50) NOT NULL,
+    parametros TEXT NOT NULL,
+    status_tarefa ENUM('Pendente', 'Executando', 'Concluída', 'Falhou') DEFAULT 'Pendente',
+    progresso INT NOT NULL DEFAULT 0,
+    tentativas INT NOT NULL DEFAULT 0,
+    max_tentativas INT NOT NULL DEFAULT 3,
+    executar_apos DATETIME NOT NULL,
+    trabalhador VARCHAR(100),
+    arquivo VARCHAR(255),
+    erro TEXT,
+    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    data_inicio DATETIME,
+    data_atualizacao DATETIME,
+    data_fim DATETIME,
+    INDEX idx_tarefas_fila (status_tarefa, tipo, id_tarefa)
+) ENGINE=InnoDB;
+
 -- ============================================
 -- PARTE 2: DML (Data Manipulation Language)
 -- População de Dados
@@ -213,17 +295,20 @@ INSERT INTO estoque (id_produto, tamanho, cor, quantidade, estoque_minimo) VALUE
 (15, 'M', 'Vermelho', 14, 4);
 
 INSERT INTO clientes (nome_cliente, cpf, email, telefone, data_nascimento, endereco, cidade, estado, cep) VALUES
-('Maria Silva Santos', '123.456.789-01', 'maria.silva@email.com', '(11) 98765-4321', '1990-05-15', 'Rua das Acácias, 123', 'São Paulo', 'SP', '01234-567'),
-('Ana Paula Oliveira', '234.567.890-12', 'ana.oliveira@email.com', '(11) 97654-3210', '1985-08-22', 'Av. Primavera, 456', 'São Paulo', 'SP', '02345-678'),
-('Juliana Costa Ferreira', '345.678.901-23', 'juliana.costa@email.com', '(11) 96543-2109', '1992-11-30', 'Rua Flores, 789', 'Guarulhos', 'SP', '03456-789'),
-('Carla Mendes Rodrigues', '456.789.012-34', 'carla.mendes@email.com', '(11) 95432-1098', '1988-03-18', 'Av. Brasil, 321', 'São Paulo', 'SP', '04567-890'),
-('Beatriz Lima Souza', '567.890.123-45', 'beatriz.lima@email.com', '(11) 94321-0987', '1995-07-25', 'Rua Esperança, 654', 'Osasco', 'SP', '05678-901'),
-('Fernanda Alves Martins', '678.901.234-56', 'fernanda.alves@email.com', '(11) 93210-9876', '1987-12-10', 'Av. Liberdade, 987', 'São Paulo', 'SP', '06789-012'),
-('Patricia Santos Cruz', '789.012.345-67', 'patricia.cruz@email.com', '(11) 92109-8765', '1991-04-05', 'Rua Alegria, 147', 'São Paulo', 'SP', '07890-123'),
-('Camila Rodrigues Dias', '890.123.456-78', NULL, '(11) 91098-7654', '1993-09-28', 'Av. Paulista, 258', 'São Paulo', 'SP', '08901-234'),
-('Renata Ferreira Gomes', '901.234.567-89', 'renata.gomes@email.com', '(11) 90987-6543', '1989-06-14', 'Rua Vitória, 369', 'São Caetano', 'SP', '09012-345'),
+('Maria Silva Santos', '123.456.789-09', 'maria.silva@email.com', '(11) 98765-4321', '1990-05-15', 'Rua das Acácias, 123', 'São Paulo', 'SP', '01234-567'),
+('Ana Paula Oliveira', '234.567.890-92', 'ana.oliveira@email.com', '(11) 97654-3210', '1985-08-22', 'Av. Primavera, 456', 'São Paulo', 'SP', '02345-678'),
+('Juliana Costa Ferreira', '345.678.901-75', 'juliana.costa@email.com', '(11) 96543-2109', '1992-11-30', 'Rua Flores, 789', 'Guarulhos', 'SP', '03456-789'),
+('Carla Mendes Rodrigues', '456.789.012-49', 'carla.mendes@email.com', '(11) 95432-1098', '1988-03-18', 'Av. Brasil, 321', 'São Paulo', 'SP', '04567-890'),
+('Beatriz Lima Souza', '567.890.123-03', 'beatriz.lima@email.com', '(11) 94321-0987', '1995-07-25', 'Rua Esperança, 654', 'Osasco', 'SP', '05678-901'),
+('Fernanda Alves Martins', '678.901.234-69', 'fernanda.alves@email.com', '(11) 93210-9876', '1987-12-10', 'Av. Liberdade, 987', 'São Paulo', 'SP', '06789-012'),
+('Patricia Santos Cruz', '789.012.345-05', 'patricia.cruz@email.com', '(11) 92109-8765', '1991-04-05', 'Rua Alegria, 147', 'São Paulo', 'SP', '07890-123'),
+('Camila Rodrigues Dias', '890.123.456-42', NULL, '(11) 91098-7654', '1993-09-28', 'Av. Paulista, 258', 'São Paulo', 'SP', '08901-234'),
+('Renata Ferreira Gomes', '901.234.567-70', 'renata.gomes@email.com', '(11) 90987-6543', '1989-06-14', 'Rua Vitória, 369', 'São Caetano', 'SP', '09012-345'),
 ('Luciana Pereira Silva', '012.345.678-90', 'luciana.pereira@email.com', '(11) 89876-5432', '1994-01-20', 'Av. dos Estados, 741', 'Santo André', 'SP', '09123-456');
 
+-- cpf_numerico é mantido pela aplicação (ClienteDAO); aqui é preenchido a partir do cpf
+UPDATE clientes SET cpf_numerico = REGEXP_REPLACE(cpf, '[^0-9]', '');
+
 INSERT INTO vendas (id_cliente, data_venda, valor_subtotal, desconto, valor_total, forma_pagamento, status_venda) VALUES
 (1, '2025-11-15 10:30:00', 179.80, 0.00, 179.80, 'Crédito', 'Concluída'),
 (2, '2025-11-16 14:20:00', 159.90, 15.99, 143.91, 'PIX', 'Concluída'),
@@ -294,6 +379,43 @@ INSERT INTO itens_compra (id_compra, id_produto, tamanho, cor, quantidade, preco
 (5, 12, 'M', 'Rosa', 30, 35.00),
 (5, 12, 'G', 'Rosa', 20, 35.00);
 
+-- Carga inicial dos resumos de vendas (o mesmo que ResumoDAO.reconstruir)
+INSERT INTO resumo_produtos (id_produto, total_vendido, receita_total)
+SELECT e.id_produto, SUM(iv.quantidade), SUM(iv.subtotal)
+FROM itens_venda iv
+INNER JOIN estoque e ON iv.id_estoque = e.id_estoque
+INNER JOIN vendas v ON iv.id_venda = v.id_venda
+WHERE v.status_venda = 'Concluída'
+GROUP BY e.id_produto;
+
+INSERT INTO resumo_categorias (id_categoria, num_vendas, receita_total)
+SELECT p.id_categoria, COUNT(DISTINCT iv.id_venda), SUM(iv.subtotal)
+FROM itens_venda iv
+INNER JOIN estoque e ON iv.id_estoque = e.id_estoque
+INNER JOIN produtos p ON e.id_produto = p.id_produto
+INNER JOIN vendas v ON iv.id_venda = v.id_venda
+WHERE v.status_venda = 'Concluída'
+GROUP BY p.id_categoria;
+
+INSERT INTO resumo_clientes (id_cliente, total_compras, total_gasto)
+SELECT id_cliente, COUNT(*), SUM(valor_total)
+FROM vendas
+WHERE status_venda = 'Concluída' AND id_cliente IS NOT NULL
+GROUP BY id_cliente;
+
+INSERT INTO resumo_pagamentos (forma_pagamento, quantidade_vendas, total_faturado)
+SELECT forma_pagamento, COUNT(*), SUM(valor_total)
+FROM vendas
+WHERE status_venda = 'Concluída'
+GROUP BY forma_pagamento;
+
+INSERT INTO resumo_diario (dia, forma_pagamento, num_vendas, valor_subtotal, desconto, valor_total)
+SELECT DATE(data_venda), forma_pagamento, COUNT(*),
+       SUM(valor_subtotal), SUM(desconto), SUM(valor_total)
+FROM vendas
+WHERE status_venda = 'Concluída'
+GROUP BY DATE(data_venda), forma_pagamento;
+
 -- ============================================
 -- PARTE 3: DQL (Data Query Language)
 -- Consultas para Visualização de Dados
@@ -337,7 +459,7 @@ SELECT
     e.estoque_minimo
 FROM estoque e
 INNER JOIN produtos p ON e.id_produto = p.id_produto
-WHERE e.quantidade <= e.estoque_minimo;
+WHERE e.estoque_baixo = TRUE;
 
 SELECT 'Listando todos os clientes' AS Consulta;
 SELECT * FROM clientes;
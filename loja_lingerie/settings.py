@@ -23,6 +23,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricasSQLMiddleware',
+    'core.middleware.OrcamentoConsultasMiddleware',
+    'core.middleware.RoteamentoBancoMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -32,6 +35,26 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Perfil de pouca E/S no banco: tira sessões e mensagens do MySQL.
+# 'cookie' guarda a sessão num cookie assinado (sem invalidação no servidor:
+# logout só apaga o cookie do navegador); 'cache' guarda no alias 'default'
+# de CACHES, que precisa ser compartilhado (Redis/Memcached) entre os
+# workers. Nos dois as mensagens ficam só em cookie, sem cair na sessão.
+# None mantém as sessões em django_session.
+PERFIL_BAIXO_IO = None
+PERFIS_BAIXO_IO = {
+    'cookie': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.signed_cookies',
+        'MESSAGE_STORAGE': 'django.contrib.messages.storage.cookie.CookieStorage',
+    },
+    'cache': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cache',
+        'MESSAGE_STORAGE': 'django.contrib.messages.storage.cookie.CookieStorage',
+    },
+}
+if PERFIL_BAIXO_IO:
+    globals().update(PERFIS_BAIXO_IO[PERFIL_BAIXO_IO])
+
 ROOT_URLCONF = 'loja_lingerie.urls'
 
 TEMPLATES = [
@@ -67,6 +90,95 @@ DATABASES = {
     }
 }
 
+# Réplica de leitura: alias de DATABASES (ex.: 'replica', com as mesmas
+# chaves do 'default') usado pelos métodos de leitura das DAOs. None deixa
+# tudo no 'default'. Depois de uma escrita o navegador lê do principal por
+# BANCO_LEITURA_FIXAR_SEGUNDOS; a réplica que falha sai de uso e é testada
+# de novo a cada BANCO_LEITURA_VERIFICAR_SEGUNDOS.
+BANCO_LEITURA = None
+BANCO_LEITURA_FIXAR_SEGUNDOS = 5
+BANCO_LEITURA_VERIFICAR_SEGUNDOS = 10
+
+# Paginação por cursor (keyset) das listagens
+PAGINACAO_TAMANHO_PADRAO = 50
+PAGINACAO_TAMANHO_MAXIMO = 200
+PAGINACAO_CONTAR_TOTAL = True  # False evita o COUNT(*) a cada página
+
+# Exportações em streaming: linhas lidas do banco por fetchmany
+EXPORTACAO_TAMANHO_LOTE = 1000
+
+# Importação em massa: linhas gravadas por INSERT multi-linha
+IMPORTACAO_TAMANHO_LOTE = 500
+
+# API JSON: ids aceitos por requisição na busca em lote e ids por consulta
+# IN (as listas maiores são divididas em várias consultas)
+API_MAXIMO_IDS = 5000
+BUSCA_LOTE_IDS = 1000
+
+# Tarefas em segundo plano (manage.py executar_tarefas): diretório dos
+# arquivos gerados, tarefas simultâneas por processo (e por tipo, abaixo
+# desse total), tentativas por tarefa, espera antes da 2ª tentativa (dobra
+# a cada falha) e segundos sem sinal do trabalhador para uma tarefa em
+# execução voltar para a fila
+TAREFAS_DIRETORIO = BASE_DIR / 'arquivos_tarefas'
+TAREFAS_CONCORRENCIA = 4
+TAREFAS_CONCORRENCIA_POR_TIPO = {'exportar_vendas': 1}
+TAREFAS_TENTATIVAS = 3
+TAREFAS_ESPERA_SEGUNDOS = 30
+TAREFAS_ABANDONO_SEGUNDOS = 300
+
+# Cache de leitura das categorias. BACKEND 'lru' guarda em memória do
+# processo; 'django' usa o alias ALIAS de CACHES. As versões das tabelas
+# ficam em CACHES[VERSOES_CACHE_ALIAS]: com vários workers, use um backend
+# compartilhado (Redis/Memcached) para que uma escrita invalide todos eles
+# em no máximo VERSOES_TTL_LOCAL segundos.
+CACHE_CATEGORIAS = {
+    'BACKEND': 'lru',
+    'ALIAS': 'default',
+    'TAMANHO': 256,
+    'TTL': 300,
+}
+VERSOES_CACHE_ALIAS = 'default'
+VERSOES_TTL_LOCAL = 2
+# Num cache local (LocMem, o padrão sem CACHES) as versões só valem para o
+# próprio processo: os caches versionados e o ETag das listas ficam
+# desligados (aviso core.W001), exceto com um único processo, como o
+# runserver do desenvolvimento.
+VERSOES_PROCESSO_UNICO = DEBUG
+
+# Busca de produtos sem FULLTEXT (bancos que não são MySQL): o índice de
+# trigramas em memória é refeito quando produtos muda e, sem versões
+# compartilhadas, também a cada BUSCA_INDICE_TTL segundos
+BUSCA_INDICE_TTL = 5
+
+# Tabelas já renderizadas das listas de categorias, produtos e clientes,
+# guardadas pela versão da tabela (mesmas opções de CACHE_CATEGORIAS).
+# As listas também respondem 304 pelo ETag/Last-Modified da versão.
+CACHE_FRAGMENTOS = {
+    'BACKEND': 'lru',
+    'ALIAS': 'default',
+    'TAMANHO': 512,
+    'TTL': 300,
+}
+
+# Views assíncronas: as chamadas às DAOs rodam num pool com este número de
+# threads (cada uma com a sua conexão). Com CONN_MAX_AGE > 0 as conexões do
+# pool são reaproveitadas entre requisições.
+DAO_ASYNC_THREADS = 8
+
+# Métricas (/metrics e Server-Timing): fração das requisições em que as
+# consultas SQL são cronometradas (0 a 1; a latência da view é sempre medida)
+METRICAS_AMOSTRAGEM = 1.0
+METRICAS_SERVER_TIMING = True
+
+# Orçamento de consultas das views (@orcamento em core/views.py). 'avisar'
+# registra no log as requisições acima do orçamento ou com a mesma consulta
+# repetida ORCAMENTO_REPETICOES vezes (N+1); 'falhar' lança
+# OrcamentoExcedido (testes); None desliga. Todas as rotas são conferidas
+# por: python -m benchmark orcamentos
+ORCAMENTO_CONSULTAS = 'avisar' if DEBUG else None
+ORCAMENTO_REPETICOES = 3
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
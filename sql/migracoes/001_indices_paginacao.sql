@@ -0,0 +1,12 @@
+-- ============================================
+-- MIGRAÇÃO 001: índices para paginação por cursor
+-- Aplicar em bancos criados antes desta versão do loja_lingerie.sql
+-- ============================================
+
+USE loja_lingerie;
+
+-- As listagens paginam por (nome, id); sem estes índices cada página
+-- faz um full scan seguido de filesort.
+CREATE INDEX idx_categorias_nome ON categorias (nome_categoria, id_categoria);
+CREATE INDEX idx_produtos_nome ON produtos (nome_produto, id_produto);
+CREATE INDEX idx_clientes_nome ON clientes (nome_cliente, id_cliente);
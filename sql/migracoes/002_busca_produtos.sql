@@ -0,0 +1,10 @@
+-- ============================================
+-- MIGRAÇÃO 002: índice FULLTEXT para a busca de produtos
+-- ============================================
+
+USE loja_lingerie;
+
+-- Usado por ProdutoDAO.buscar_texto (MATCH ... AGAINST em modo booleano).
+-- A collation utf8mb4_unicode_ci já torna a busca insensível a acentos
+-- e maiúsculas ('Sutia' encontra 'Sutiã').
+CREATE FULLTEXT INDEX ft_produtos_busca ON produtos (nome_produto, marca, descricao);
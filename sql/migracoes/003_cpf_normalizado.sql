@@ -0,0 +1,13 @@
+-- ============================================
+-- MIGRAÇÃO 003: CPF normalizado (somente dígitos) com índice único
+-- ============================================
+
+USE loja_lingerie;
+
+-- Com o CPF só com dígitos, '12345678909' e '123.456.789-09' são a mesma
+-- chave; ClienteDAO mantém a coluna a cada escrita.
+ALTER TABLE clientes ADD COLUMN cpf_numerico CHAR(11) AFTER cpf;
+UPDATE clientes SET cpf_numerico = REGEXP_REPLACE(cpf, '[^0-9]', '');
+ALTER TABLE clientes ADD UNIQUE KEY uq_clientes_cpf_numerico (cpf_numerico);
+
+-- O autocompletar por prefixo do nome usa idx_clientes_nome (migração 001).
@@ -0,0 +1,66 @@
+-- ============================================
+-- MIGRAÇÃO 004: Resumos de vendas mantidos incrementalmente
+-- ============================================
+
+USE loja_lingerie;
+
+-- Resumos de vendas mantidos incrementalmente pela aplicação (ResumoDAO):
+-- cada venda concluída soma nas linhas e cada cancelamento subtrai.
+CREATE TABLE resumo_produtos (
+    id_produto INT PRIMARY KEY,
+    total_vendido INT NOT NULL DEFAULT 0,
+    receita_total DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    INDEX idx_resumo_produtos_vendido (total_vendido),
+    FOREIGN KEY (id_produto) REFERENCES produtos(id_produto) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE resumo_clientes (
+    id_cliente INT PRIMARY KEY,
+    total_compras INT NOT NULL DEFAULT 0,
+    total_gasto DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    INDEX idx_resumo_clientes_gasto (total_gasto),
+    FOREIGN KEY (id_cliente) REFERENCES clientes(id_cliente) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE resumo_categorias (
+    id_categoria INT PRIMARY KEY,
+    num_vendas INT NOT NULL DEFAULT 0,
+    receita_total DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    FOREIGN KEY (id_categoria) REFERENCES categorias(id_categoria) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE resumo_pagamentos (
+    forma_pagamento ENUM('Dinheiro', 'Débito', 'Crédito', 'PIX', 'Boleto') PRIMARY KEY,
+    quantidade_vendas INT NOT NULL DEFAULT 0,
+    total_faturado DECIMAL(12,2) NOT NULL DEFAULT 0.00
+) ENGINE=InnoDB;
+
+-- Carga inicial a partir do histórico (equivale a manage.py reconstruir_resumos)
+INSERT INTO resumo_produtos (id_produto, total_vendido, receita_total)
+SELECT e.id_produto, SUM(iv.quantidade), SUM(iv.subtotal)
+FROM itens_venda iv
+INNER JOIN estoque e ON iv.id_estoque = e.id_estoque
+INNER JOIN vendas v ON iv.id_venda = v.id_venda
+WHERE v.status_venda = 'Concluída'
+GROUP BY e.id_produto;
+
+INSERT INTO resumo_categorias (id_categoria, num_vendas, receita_total)
+SELECT p.id_categoria, COUNT(DISTINCT iv.id_venda), SUM(iv.subtotal)
+FROM itens_venda iv
+INNER JOIN estoque e ON iv.id_estoque = e.id_estoque
+INNER JOIN produtos p ON e.id_produto = p.id_produto
+INNER JOIN vendas v ON iv.id_venda = v.id_venda
+WHERE v.status_venda = 'Concluída'
+GROUP BY p.id_categoria;
+
+INSERT INTO resumo_clientes (id_cliente, total_compras, total_gasto)
+SELECT id_cliente, COUNT(*), SUM(valor_total)
+FROM vendas
+WHERE status_venda = 'Concluída' AND id_cliente IS NOT NULL
+GROUP BY id_cliente;
+
+INSERT INTO resumo_pagamentos (forma_pagamento, quantidade_vendas, total_faturado)
+SELECT forma_pagamento, COUNT(*), SUM(valor_total)
+FROM vendas
+WHERE status_venda = 'Concluída'
+GROUP BY forma_pagamento;
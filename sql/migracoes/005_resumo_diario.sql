@@ -0,0 +1,33 @@
+-- ============================================
+-- MIGRAÇÃO 005: Resumo diário de faturamento
+-- ============================================
+
+USE loja_lingerie;
+
+-- Faturamento por dia e forma de pagamento (ResumoDiarioDAO). Vendas criadas
+-- ou canceladas marcam o dia em resumo_diario_pendentes e o comando
+-- atualizar_resumo_diario recalcula só esses dias.
+CREATE TABLE resumo_diario (
+    dia DATE NOT NULL,
+    forma_pagamento ENUM('Dinheiro', 'Débito', 'Crédito', 'PIX', 'Boleto') NOT NULL,
+    num_vendas INT NOT NULL DEFAULT 0,
+    valor_subtotal DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    desconto DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    valor_total DECIMAL(12,2) NOT NULL DEFAULT 0.00,
+    PRIMARY KEY (dia, forma_pagamento)
+) ENGINE=InnoDB;
+
+CREATE TABLE resumo_diario_pendentes (
+    dia DATE PRIMARY KEY
+) ENGINE=InnoDB;
+
+-- As pontas parciais dos intervalos dos relatórios são lidas direto de vendas
+ALTER TABLE vendas ADD INDEX idx_vendas_data (data_venda);
+
+-- Carga inicial (equivale a manage.py atualizar_resumo_diario --completo)
+INSERT INTO resumo_diario (dia, forma_pagamento, num_vendas, valor_subtotal, desconto, valor_total)
+SELECT DATE(data_venda), forma_pagamento, COUNT(*),
+       SUM(valor_subtotal), SUM(desconto), SUM(valor_total)
+FROM vendas
+WHERE status_venda = 'Concluída'
+GROUP BY DATE(data_venda), forma_pagamento;
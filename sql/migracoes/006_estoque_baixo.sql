@@ -0,0 +1,14 @@
+-- ============================================
+-- MIGRAÇÃO 006: Índice de estoque baixo
+-- ============================================
+
+USE loja_lingerie;
+
+-- "quantidade <= estoque_minimo" compara duas colunas da mesma linha e não
+-- usa índice: o relatório de estoque baixo lia a tabela inteira. A coluna
+-- gerada é mantida pelo próprio banco em qualquer UPDATE de quantidade ou
+-- mínimo, e o índice leva direto às variações críticas, já ordenadas pela
+-- quantidade (EstoqueDAO.listar_estoque_baixo).
+ALTER TABLE estoque
+    ADD COLUMN estoque_baixo BOOLEAN GENERATED ALWAYS AS (quantidade <= estoque_minimo) STORED AFTER estoque_minimo,
+    ADD INDEX idx_estoque_baixo (estoque_baixo, quantidade);
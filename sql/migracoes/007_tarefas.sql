@@ -0,0 +1,30 @@
+-- ============================================
+-- MIGRAÇÃO 007: Fila de tarefas em segundo plano
+-- ============================================
+
+USE loja_lingerie;
+
+-- Exportações e relatórios grandes passavam do timeout do proxy dentro da
+-- requisição. A view só enfileira a tarefa; o comando executar_tarefas
+-- reserva as pendentes com um UPDATE condicional (vários processos não
+-- pegam a mesma), grava o arquivo em TAREFAS_DIRETORIO/<id_tarefa>/ e
+-- atualiza o progresso. O índice serve a busca das pendentes de cada tipo
+-- em ordem de chegada e a recuperação das tarefas em execução abandonadas.
+CREATE TABLE tarefas (
+    id_tarefa INT AUTO_INCREMENT PRIMARY KEY,
+    tipo VARCHAR(50) NOT NULL,
+    parametros TEXT NOT NULL,
+    status_tarefa ENUM('Pendente', 'Executando', 'Concluída', 'Falhou') DEFAULT 'Pendente',
+    progresso INT NOT NULL DEFAULT 0,
+    tentativas INT NOT NULL DEFAULT 0,
+    max_tentativas INT NOT NULL DEFAULT 3,
+    executar_apos DATETIME NOT NULL,
+    trabalhador VARCHAR(100),
+    arquivo VARCHAR(255),
+    erro TEXT,
+    data_criacao TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    data_inicio DATETIME,
+    data_atualizacao DATETIME,
+    data_fim DATETIME,
+    INDEX idx_tarefas_fila (status_tarefa, tipo, id_tarefa)
+) ENGINE=InnoDB;
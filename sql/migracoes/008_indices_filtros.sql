@@ -0,0 +1,16 @@
+-- ============================================
+-- MIGRAÇÃO 008: índices dos filtros de marca e ativo
+-- Aplicar em bancos criados antes desta versão do loja_lingerie.sql
+-- ============================================
+
+USE loja_lingerie;
+
+-- Encontrados pela conferência dos planos (python -m benchmark planos):
+-- a lista de marcas (DISTINCT ... ORDER BY marca) e o reajuste por marca
+-- liam a tabela de produtos inteira, com filesort na lista; as contagens
+-- de ativos do painel liam produtos e clientes inteiros. Com os índices a
+-- lista de marcas sai já ordenada e as contagens só leem o índice.
+-- Os índices por nome das listagens já existem desde a migração 001.
+CREATE INDEX idx_produtos_marca ON produtos (marca);
+CREATE INDEX idx_produtos_ativo ON produtos (ativo);
+CREATE INDEX idx_clientes_ativo ON clientes (ativo);